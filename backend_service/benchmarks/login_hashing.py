@@ -0,0 +1,135 @@
+"""
+Login latency benchmark for inline and pooled password hashing.
+
+Serves a small app with uvicorn with the two ways a login can verify a
+password: bcrypt called inline in the async handler, as /auth/login did
+before, and bcrypt on the PasswordHasher pool. Concurrent clients log in
+over HTTP while a probe calls a cheap endpoint of the same server every
+10 ms. Inline hashing blocks the server's event loop, so logins and
+unrelated requests queue behind every hash.
+
+Usage:
+    python -m backend_service.benchmarks.login_hashing --clients 16 --logins 4
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import threading
+import time
+from typing import Any, Dict, List
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException
+
+from db_module import crud
+from backend_service.src.config import settings
+from backend_service.src.services.passwords import PasswordHasher
+
+PASSWORD = "Password123"
+
+def create_app(hasher: PasswordHasher) -> FastAPI:
+    """App with an inline and a pooled login, and a health probe."""
+    app = FastAPI()
+    hashed = crud.get_password_hash(PASSWORD)
+
+    @app.post("/login/inline")
+    async def login_inline(password: str = PASSWORD):
+        if not crud.verify_password(password, hashed):
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.post("/login/pooled")
+    async def login_pooled(password: str = PASSWORD):
+        valid, _ = await hasher.verify(password, hashed)
+        if not valid:
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    return app
+
+def percentile(values: List[float], pct: int) -> float:
+    if len(values) < 2:
+        return (values[0] if values else 0.0) * 1000
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1] * 1000
+
+def serve(app: FastAPI) -> uvicorn.Server:
+    """Serve app on a free local port from a thread of its own."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+async def run_mode(base_url: str, mode: str, clients: int, logins: int) -> Dict[str, Any]:
+    """Log in concurrently through one mode while probing the health endpoint."""
+    login_latencies: List[float] = []
+    probe_latencies: List[float] = []
+    limits = httpx.Limits(max_connections=clients + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+
+        async def login_client():
+            for _ in range(logins):
+                start = time.perf_counter()
+                response = await client.post(f"/login/{mode}")
+                response.raise_for_status()
+                login_latencies.append(time.perf_counter() - start)
+
+        async def probe(stop: asyncio.Event):
+            while not stop.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        stop = asyncio.Event()
+        probe_task = asyncio.ensure_future(probe(stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(login_client() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe_task
+
+    return {
+        "mode": mode,
+        "logins_per_s": len(login_latencies) / elapsed,
+        "login_p50_ms": percentile(login_latencies, 50),
+        "login_p99_ms": percentile(login_latencies, 99),
+        "probe_p99_ms": percentile(probe_latencies, 99),
+        "probe_max_ms": max(probe_latencies) * 1000,
+    }
+
+async def run(clients: int, logins: int, workers: int) -> None:
+    hasher = PasswordHasher(workers=workers, queue_size=clients * logins)
+    server = serve(create_app(hasher))
+    base_url = f"http://127.0.0.1:{server.config.port}"
+    print(f"bcrypt rounds {crud.BCRYPT_ROUNDS}, {clients} clients x {logins} logins, {workers} hash workers")
+    print(f"{'mode':<8}{'logins/s':>10}{'login p50':>12}{'login p99':>12}{'probe p99':>12}{'probe max':>12}")
+    for mode in ("inline", "pooled"):
+        r = await run_mode(base_url, mode, clients, logins)
+        print(
+            f"{r['mode']:<8}{r['logins_per_s']:>10.1f}{r['login_p50_ms']:>10.0f}ms"
+            f"{r['login_p99_ms']:>10.0f}ms{r['probe_p99_ms']:>10.1f}ms{r['probe_max_ms']:>10.1f}ms"
+        )
+    server.should_exit = True
+
+def main():
+    parser = argparse.ArgumentParser(description="Login latency with inline and pooled password hashing")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients logging in")
+    parser.add_argument("--logins", type=int, default=4, help="Logins per client")
+    parser.add_argument(
+        "--workers", type=int, default=settings.PASSWORD_HASH_WORKERS, help="Threads of the hashing pool"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.clients, args.logins, args.workers))
+
+if __name__ == "__main__":
+    main()
@@ -5,17 +5,27 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from typing import Any
 from datetime import timedelta
+import math
 from sqlalchemy.orm import Session
 
 from db_module import crud, models, schemas
 from db_module.database import get_db
-from ...auth.jwt import create_access_token, create_refresh_token_for_user
+from ...auth.jwt import access_token_claims, create_access_token, create_refresh_token_for_user
 from ...config import settings
 from ...logger_config import logger
 from ...middleware import auth_rate_limit
+from ...services.passwords import PasswordHasherBusyError, authenticate_user, password_hasher
 
 router = APIRouter()
 
+def busy_exception(error: PasswordHasherBusyError) -> HTTPException:
+    """503 response for a request turned away by the full password hashing queue."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": str(math.ceil(error.retry_after))}
+    )
+
 @router.post("/login", response_model=schemas.Token)
 @auth_rate_limit()
 async def login_access_token(
@@ -26,10 +36,11 @@ async def login_access_token(
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
-    # Try to authenticate with username/password
-    user = crud.authenticate_user(
-        db, form_data.username, form_data.password
-    )
+    # Try to authenticate with username/password, hashing off the event loop
+    try:
+        user = await authenticate_user(db, form_data.username, form_data.password)
+    except PasswordHasherBusyError as e:
+        raise busy_exception(e)
     if not user:
         logger.warning(f"Login failed for user: {form_data.username}")
         raise HTTPException(
@@ -49,7 +60,7 @@ async def login_access_token(
     # Create access token
     access_token_expires = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.id},
+        data=access_token_claims(user),
         expires_delta=access_token_expires
     )
 
@@ -87,7 +98,7 @@ async def refresh_token(
     # Create new access token
     access_token_expires = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.id},
+        data=access_token_claims(user),
         expires_delta=access_token_expires
     )
 
@@ -153,9 +164,14 @@ async def register_user(
             detail="Username already registered"
         )
 
+    try:
+        hashed_password = await password_hasher.hash(user_in.password)
+    except PasswordHasherBusyError as e:
+        raise busy_exception(e)
+
     # Create new user
     try:
-        user = crud.create_user(db, user_in)
+        user = crud.create_user(db, user_in, hashed_password=hashed_password)
         logger.info(f"User registered: {user.username}")
         return user
     except ValueError as e:
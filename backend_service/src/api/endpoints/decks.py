@@ -1,14 +1,23 @@
 """
 Deck management endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File, Form, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from typing import Any, List, Optional
 from sqlalchemy.orm import Session
+import os
+import tempfile
 
 from db_module import crud, models, schemas
 from db_module.database import get_db
+from db_module.pagination import NEXT_CURSOR_HEADER, next_cursor
 from ...auth.jwt import get_current_active_user
+from ...config import settings
 from ...logger_config import logger
+from ...services.streaming import stream_deck
+from ...services import deck_transfer
 
 router = APIRouter()
 
@@ -45,41 +54,230 @@ async def create_deck(
 
 @router.get("/", response_model=List[schemas.Deck])
 async def read_decks(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Retrieve decks.
+
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
-    decks = crud.get_decks_by_owner(
-        db, current_user.id, skip=skip, limit=limit
-    )
+    try:
+        decks = crud.get_decks_by_owner(
+            db, current_user.id, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    cursor_value = next_cursor(decks, limit)
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
     return decks
 
 @router.get("/public", response_model=List[schemas.Deck])
 async def read_public_decks(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Retrieve public decks.
+
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
-    decks = crud.get_public_decks(db, skip=skip, limit=limit)
+    try:
+        decks = crud.get_public_decks(db, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    cursor_value = next_cursor(decks, limit)
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
     return decks
 
 
 
+@router.post("/import", response_model=schemas.DeckImportResult)
+async def import_deck(
+    file: UploadFile = File(...),
+    title: Optional[str] = Form(None),
+    description: Optional[str] = Form(None),
+    is_public: bool = Form(False),
+    import_format: Optional[str] = Form(None, alias="format"),
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Create a deck from a csv, jsonl or apkg file.
+
+    The format is taken from the file extension unless `format` is given.
+    Cards are inserted in batches of DECK_IMPORT_BATCH_SIZE.
+    """
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+        logger.warning(f"Deck import too large: {file.filename}")
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Upload exceeds the maximum size of {settings.MAX_UPLOAD_SIZE} bytes"
+        )
+
+    stem, file_ext = os.path.splitext(file.filename or "")
+    import_format = (import_format or file_ext.lstrip(".")).lower()
+    if import_format not in deck_transfer.PARSERS:
+        logger.warning(f"Invalid import format: {import_format}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid import format. Allowed: {', '.join(deck_transfer.PARSERS)}"
+        )
+
+    deck_in = schemas.DeckCreate(
+        title=title or stem or "Imported deck",
+        description=description,
+        is_public=is_public
+    )
+    try:
+        deck, imported_count = await run_in_threadpool(
+            deck_transfer.import_deck,
+            db, file.file, import_format, deck_in, current_user.id, settings.DECK_IMPORT_BATCH_SIZE
+        )
+    except deck_transfer.DeckImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    logger.info(f"Deck imported: {deck.id} ({imported_count} cards)")
+    return schemas.DeckImportResult(
+        **schemas.Deck.model_validate(deck).model_dump(),
+        imported_count=imported_count
+    )
+
+@router.post("/{deck_id}/clone", response_model=schemas.Deck)
+async def clone_deck(
+    deck_id: str,
+    title: Optional[str] = None,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Copy a readable deck and its flashcards into a new private deck.
+    """
+    deck = crud.get_deck(db, deck_id)
+    if not deck:
+        logger.warning(f"Deck not found: {deck_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Deck not found"
+        )
+
+    # Check if user is the owner or the deck is public
+    if deck.owner_id != current_user.id and not deck.is_public:
+        # Check if deck is shared with user
+        if not crud.user_can_read_deck(db, deck.id, current_user.id):
+            logger.warning(f"User {current_user.username} attempted to clone deck {deck_id}")
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+
+    clone = crud.clone_deck(db, deck_id, current_user.id, title=title)
+    logger.info(f"Deck cloned: {deck_id} -> {clone.id}")
+    return clone
+
+@router.get("/{deck_id}/export")
+async def export_deck(
+    deck_id: str,
+    export_format: str = Query("csv", alias="format"),
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Download a deck as csv, jsonl or apkg.
+
+    csv and jsonl are streamed straight from the database cursor.
+    """
+    export_format = export_format.lower()
+    if export_format not in deck_transfer.EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid export format. Allowed: {', '.join(deck_transfer.EXPORT_FORMATS)}"
+        )
+
+    deck = crud.get_deck(db, deck_id)
+    if not deck:
+        logger.warning(f"Deck not found: {deck_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Deck not found"
+        )
+
+    # Check if user is the owner or the deck is public
+    if deck.owner_id != current_user.id and not deck.is_public:
+        # Check if deck is shared with user
+        if not crud.user_can_read_deck(db, deck.id, current_user.id):
+            logger.warning(f"User {current_user.username} attempted to export deck {deck_id}")
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+
+    filename = deck_transfer.export_filename(deck, export_format)
+    media_type = deck_transfer.EXPORT_FORMATS[export_format]
+
+    if export_format == "apkg":
+        if not deck_transfer.APKG_SUPPORT:
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail="apkg export is not available"
+            )
+        # Anki packages are zipped SQLite files, so they are built on disk first
+        fd, path = tempfile.mkstemp(suffix=".apkg")
+        os.close(fd)
+        try:
+            await run_in_threadpool(deck_transfer.write_apkg, db, deck, path)
+        except Exception:
+            deck_transfer.remove_file(path)
+            raise
+        return FileResponse(
+            path,
+            media_type=media_type,
+            filename=filename,
+            background=BackgroundTask(deck_transfer.remove_file, path)
+        )
+
+    writer = deck_transfer.iter_csv if export_format == "csv" else deck_transfer.iter_jsonl
+    return StreamingResponse(
+        writer(db.get_bind(), deck.id),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/{deck_id}", response_model=schemas.DeckWithFlashcards)
 async def read_deck(
     deck_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.DECK_PAGE_MAX_SIZE),
+    cursor: Optional[str] = None,
+    stream: bool = False,
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> Any:
     """
-    Get deck by ID.
+    Get deck by ID with its flashcards.
+
+    Up to DECK_PAGE_MAX_SIZE flashcards are returned by default. Pass `limit`
+    to page through a large deck; when there are more flashcards, the
+    X-Next-Cursor response header is the `cursor` of the next page. Pass
+    `stream=true` to stream the whole deck with flat memory use.
     """
     deck = crud.get_deck(db, deck_id)
     if not deck:
@@ -92,27 +290,32 @@ async def read_deck(
     # Check if user is the owner or the deck is public
     if deck.owner_id != current_user.id and not deck.is_public:
         # Check if deck is shared with user
-        if current_user not in deck.shared_with:
+        if not crud.user_can_read_deck(db, deck.id, current_user.id):
             logger.warning(f"User {current_user.username} attempted to access deck {deck_id}")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions"
             )
 
-    # Get flashcards for the deck
-    db_flashcards = crud.get_flashcards_by_deck(db, deck_id)
+    if stream:
+        return stream_deck(db, deck)
 
-    # Create a DeckWithFlashcards response using Pydantic's from_attributes feature
-    # First convert the SQLAlchemy model to a Pydantic model
-    deck_data = schemas.Deck.model_validate(deck, from_attributes=True)
-
-    # Create the DeckWithFlashcards model with the deck data and flashcards
-    response = schemas.DeckWithFlashcards(
-        **deck_data.model_dump(),
-        flashcards=[schemas.Flashcard.model_validate(flashcard, from_attributes=True) for flashcard in db_flashcards]
-    )
+    # Load the cards with one indexed query
+    limit = limit or settings.DECK_PAGE_MAX_SIZE
+    try:
+        flashcards = crud.load_deck_flashcards(db, deck, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    cursor_value = next_cursor(flashcards, limit)
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
 
-    return response
+    # Return the ORM object so the response model is built from it in one
+    # pass instead of copying through intermediate Pydantic models
+    return deck
 
 @router.put("/{deck_id}", response_model=schemas.Deck)
 async def update_deck(
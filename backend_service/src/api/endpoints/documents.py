@@ -1,114 +1,36 @@
 """
 Document management endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks
-from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File
+from fastapi.responses import StreamingResponse
+from typing import Any, List, Optional
 from sqlalchemy.orm import Session
 import uuid
 import os
-import aiofiles
 from pathlib import Path
 
 from db_module import crud, models, schemas
 from db_module.database import get_db
+from db_module.pagination import NEXT_CURSOR_HEADER, next_cursor
 from ...auth.jwt import get_current_active_user
 from ...config import settings
 from ...logger_config import logger
-from ...services.ocr_service import OCRServiceClient
-from ...services.llm_service import LLMServiceClient
+from ...services.events import document_event_stream
+from ...services.uploads import UnsupportedFileTypeError, UploadTooLargeError, save_upload, store_by_content
 
 router = APIRouter()
 
-# Initialize service clients
-ocr_client = OCRServiceClient()
-llm_client = LLMServiceClient()
-
-async def process_document(
-    document_id: str,
-    file_path: Path,
-    db: Session
-):
-    """
-    Process a document: extract text with OCR and generate flashcards.
-
-    Args:
-        document_id: ID of the document to process.
-        file_path: Path to the document file.
-        db: Database session.
-    """
-    try:
-        # Update document status to OCR processing
-        crud.update_document_status(
-            db, document_id, models.DocumentStatus.OCR_PROCESSING.value
-        )
-
-        # Extract text with OCR
-        ocr_result = await ocr_client.extract_text(file_path)
-        extracted_text = ocr_result.get("text", "")
-
-        # Save extracted text to database
-        text_data = schemas.ExtractedTextCreate(
-            content=extracted_text,
-            document_id=document_id
-        )
-        crud.create_extracted_text(db, text_data)
-
-        # Update document status to OCR complete
-        crud.update_document_status(
-            db, document_id, models.DocumentStatus.OCR_COMPLETE.value
-        )
-
-        # Update document status to flashcard generating
-        crud.update_document_status(
-            db, document_id, models.DocumentStatus.FLASHCARD_GENERATING.value
-        )
-
-        # Generate flashcards
-        flashcard_result = await llm_client.generate_flashcards(extracted_text, num_cards=10)
-
-        # Create a deck for the flashcards
-        document = crud.get_document(db, document_id)
-        deck_name = f"Deck for {document.filename}"
-
-        deck_data = schemas.DeckCreate(
-            title=deck_name,
-            description=f"Automatically generated from {document.filename}",
-            document_id=document_id
-        )
-        deck = crud.create_deck(db, deck_data, owner_id=document.owner_id)
-
-        # Save flashcards to database
-        for card in flashcard_result.get("flashcards", []):
-            flashcard_data = schemas.FlashcardCreate(
-                question=card["question"],
-                answer=card["answer"],
-                deck_id=deck.id
-            )
-            crud.create_flashcard(db, flashcard_data)
-
-        # Update document status to complete
-        crud.update_document_status(
-            db, document_id, models.DocumentStatus.FLASHCARD_COMPLETE.value
-        )
-
-        logger.info(f"Document processing complete: {document_id}")
-
-    except Exception as e:
-        logger.exception(f"Error processing document {document_id}: {str(e)}")
-        # Update document status to error
-        crud.update_document_status(
-            db, document_id, models.DocumentStatus.ERROR.value, str(e)
-        )
-
 @router.post("/", response_model=schemas.Document)
 async def create_document(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Upload a new document.
+
+    The document is queued for OCR and flashcard generation, which the
+    document workers pick up; follow /documents/{id}/events for progress.
     """
     # Check file extension
     file_ext = os.path.splitext(file.filename)[1].lower().lstrip(".")
@@ -119,52 +41,80 @@ async def create_document(
             detail=f"Invalid file extension. Allowed: {', '.join(settings.ALLOWED_EXTENSIONS)}"
         )
 
-    # Generate unique filename
+    # Write to a unique temporary name until the digest is known
     unique_filename = f"{uuid.uuid4()}.{file_ext}"
     file_path = settings.UPLOAD_DIR / unique_filename
 
-    # Save file
     try:
-        async with aiofiles.open(file_path, "wb") as f:
-            content = await file.read()
-            await f.write(content)
-    except Exception as e:
-        logger.exception(f"Error saving file: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error saving file: {str(e)}"
-        )
-
-    # Create document in database
-    document_data = schemas.DocumentCreate(
-        filename=file.filename,
-        mime_type=file.content_type or f"image/{file_ext}"
-    )
-    document = crud.create_document(
-        db, document_data, current_user.id, str(file_path)
-    )
+        # Stream the file to disk, checking its type and size on the way, then
+        # link it under its digest so identical uploads share one file
+        try:
+            stored = await save_upload(file, file_path, file_ext, settings.MAX_UPLOAD_SIZE)
+            content = store_by_content(stored, settings.UPLOAD_DIR, file_ext)
+        except UploadTooLargeError as e:
+            logger.warning(f"Upload too large: {file.filename}")
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
+        except UnsupportedFileTypeError as e:
+            logger.warning(f"Upload content does not match its extension: {file.filename}")
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=str(e)
+            )
+        except Exception as e:
+            logger.exception(f"Error saving file: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error saving file: {str(e)}"
+            )
 
-    # Process document in background
-    background_tasks.add_task(
-        process_document, document.id, file_path, db
-    )
+        # Create document in database together with its processing job
+        document_data = schemas.DocumentCreate(
+            filename=file.filename,
+            mime_type=content.mime_type,
+            content_sha256=content.sha256
+        )
+        document = crud.create_document_with_job(
+            db, document_data, current_user.id, str(content.path),
+            max_attempts=settings.JOB_MAX_ATTEMPTS
+        )
+        # Deleting the last other document stored in the shared file, between
+        # the link and the insert, removes the file: link it again
+        store_by_content(stored, settings.UPLOAD_DIR, file_ext)
+    finally:
+        file_path.unlink(missing_ok=True)
 
     logger.info(f"Document created: {document.id}")
     return document
 
 @router.get("/", response_model=List[schemas.Document])
 async def read_documents(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Retrieve documents.
+
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
-    documents = crud.get_documents_by_owner(
-        db, current_user.id, skip=skip, limit=limit
-    )
+    try:
+        documents = crud.get_documents_by_owner(
+            db, current_user.id, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    cursor_value = next_cursor(documents, limit)
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
     return documents
 
 @router.get("/{document_id}", response_model=schemas.Document)
@@ -194,6 +144,43 @@ async def read_document(
 
     return document
 
+@router.get("/{document_id}/events")
+async def read_document_events(
+    document_id: str,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Stream the processing events of a document as server-sent events.
+
+    The current status is sent first, followed by stage transitions
+    (`status`), pages OCR'd and flashcards generated (`progress`) and
+    failed attempts that will be retried (`retry`). The stream ends once
+    the document completes or fails.
+    """
+    document = crud.get_document(db, document_id)
+    if not document:
+        logger.warning(f"Document not found: {document_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+
+    # Check if user is the owner
+    if document.owner_id != current_user.id:
+        logger.warning(f"User {current_user.username} attempted to follow document {document_id}")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+    return StreamingResponse(
+        document_event_stream(db.get_bind(), document_id, heartbeat=settings.DOCUMENT_EVENTS_HEARTBEAT),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they are written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/{document_id}/text", response_model=schemas.ExtractedText)
 async def read_document_text(
     document_id: str,
@@ -255,22 +242,21 @@ async def delete_document(
             detail="Not enough permissions"
         )
 
-    # Delete file
-    try:
-        file_path = Path(document.file_path)
-        if file_path.exists():
-            file_path.unlink()
-    except Exception as e:
-        logger.error(f"Error deleting file {document.file_path}: {str(e)}")
-
     # Delete extracted text first (if exists)
     extracted_text = crud.get_extracted_text_by_document(db, document_id)
     if extracted_text:
         logger.info(f"Deleting extracted text for document: {document_id}")
         crud.delete_extracted_text(db, extracted_text.id)
 
-    # Delete document from database
-    crud.delete_document(db, document_id)
+    def delete_file(path: str) -> None:
+        try:
+            Path(path).unlink(missing_ok=True)
+        except Exception as e:
+            logger.error(f"Error deleting file {path}: {str(e)}")
+
+    # Delete document from database, and its file unless identical uploads
+    # of other documents still use it
+    crud.delete_document(db, document_id, delete_file=delete_file)
 
     logger.info(f"Document deleted: {document_id}")
     return document
@@ -1,14 +1,16 @@
 """
 Flashcard management endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import Any, List, Optional
 from sqlalchemy.orm import Session
 
 from db_module import crud, models, schemas
 from db_module.database import get_db
+from db_module.pagination import NEXT_CURSOR_HEADER, next_cursor
 from ...auth.jwt import get_current_active_user
 from ...logger_config import logger
+from ...services.streaming import stream_flashcards
 
 router = APIRouter()
 
@@ -46,13 +48,20 @@ async def create_flashcard(
 @router.get("/", response_model=List[schemas.Flashcard])
 async def read_flashcards(
     deck_id: str,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    stream: bool = False,
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Retrieve flashcards for a deck.
+
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    With `stream=true` every card of the deck is streamed as one JSON array and
+    the paging parameters are ignored.
     """
     # Check if deck exists
     deck = crud.get_deck(db, deck_id)
@@ -66,15 +75,29 @@ async def read_flashcards(
     # Check if user is the owner or the deck is public
     if deck.owner_id != current_user.id and not deck.is_public:
         # Check if deck is shared with user
-        if current_user not in deck.shared_with:
+        if not crud.user_can_read_deck(db, deck.id, current_user.id):
             logger.warning(f"User {current_user.username} attempted to access flashcards for deck {deck_id}")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions"
             )
 
+    if stream:
+        return stream_flashcards(db, deck_id)
+
     # Get flashcards
-    flashcards = crud.get_flashcards_by_deck(db, deck_id, skip=skip, limit=limit)
+    try:
+        flashcards = crud.get_flashcards_by_deck(
+            db, deck_id, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    cursor_value = next_cursor(flashcards, limit)
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
     return flashcards
 
 @router.get("/{flashcard_id}", response_model=schemas.Flashcard)
@@ -98,7 +121,7 @@ async def read_flashcard(
     deck = crud.get_deck(db, flashcard.deck_id)
     if deck.owner_id != current_user.id and not deck.is_public:
         # Check if deck is shared with user
-        if current_user not in deck.shared_with:
+        if not crud.user_can_read_deck(db, deck.id, current_user.id):
             logger.warning(f"User {current_user.username} attempted to access flashcard {flashcard_id}")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -1,14 +1,15 @@
 """
 Study session endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import Any, List, Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 from db_module import crud, models, schemas
 from db_module.models import generate_uuid
 from db_module.database import get_db
+from db_module.pagination import NEXT_CURSOR_HEADER, next_cursor
 from ...auth.jwt import get_current_active_user
 from ...logger_config import logger
 
@@ -35,7 +36,7 @@ async def create_study_session(
     # Check if user is the owner or the deck is public or shared
     if deck.owner_id != current_user.id and not deck.is_public:
         # Check if deck is shared with user
-        if current_user not in deck.shared_with:
+        if not crud.user_can_read_deck(db, deck.id, current_user.id):
             logger.warning(f"User {current_user.username} attempted to create study session for deck {session_in.deck_id}")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -57,18 +58,31 @@ async def create_study_session(
 
 @router.get("/sessions", response_model=List[schemas.StudySession])
 async def read_study_sessions(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Retrieve study sessions for the current user.
+
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
     # Get study sessions
-    sessions = db.query(models.StudySession).filter(
-        models.StudySession.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    try:
+        sessions = crud.get_study_sessions_by_user(
+            db, current_user.id, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    cursor_value = next_cursor(sessions, limit, sort_attr="started_at")
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
 
     return sessions
 
@@ -211,13 +225,17 @@ async def create_study_record(
 @router.get("/records", response_model=List[schemas.StudyRecord])
 async def read_study_records(
     session_id: str,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Retrieve study records for a session.
+
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
     # Check if session exists
     session = db.query(models.StudySession).filter(
@@ -240,8 +258,17 @@ async def read_study_records(
         )
 
     # Get study records
-    records = db.query(models.StudyRecord).filter(
-        models.StudyRecord.session_id == session_id
-    ).offset(skip).limit(limit).all()
+    try:
+        records = crud.get_study_records_by_session(
+            db, session_id, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    cursor_value = next_cursor(records, limit)
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
 
     return records
@@ -14,11 +14,15 @@ router = APIRouter()
 
 @router.get("/me", response_model=schemas.User)
 async def read_users_me(
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
 ) -> Any:
     """
     Get current user.
     """
+    # A user built from trusted token claims has no profile fields
+    if current_user.email is None:
+        return crud.get_user(db, current_user.id)
     return current_user
 
 @router.put("/me", response_model=schemas.User)
@@ -13,6 +13,7 @@ from ..logger_config import logger
 from db_module import crud, models, schemas
 from db_module.database import get_db
 from sqlalchemy.orm import Session
+from .user_cache import load_user
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
@@ -48,6 +49,43 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     logger.debug(f"Created access token for user: {data.get('sub')}")
     return encoded_jwt
 
+def access_token_claims(user: models.User) -> Dict[str, Any]:
+    """
+    Claims of an access token for a user.
+
+    Besides the user ID, the token carries the username, role and active
+    flag, which get_current_user trusts with JWT_TRUST_USER_CLAIMS.
+
+    Args:
+        user: User the token is issued to.
+
+    Returns:
+        Claims to pass to create_access_token.
+    """
+    return {"sub": user.id, "name": user.username, "role": user.role, "active": user.is_active}
+
+def user_from_claims(payload: Dict[str, Any]) -> Optional[models.User]:
+    """
+    Build the user of a token from its signed claims.
+
+    The user is not attached to a session and only has its ID, username,
+    role and active flag set.
+
+    Args:
+        payload: Decoded token.
+
+    Returns:
+        User object, or None if the token lacks the claims.
+    """
+    if not {"sub", "name", "role", "active"} <= payload.keys():
+        return None
+    return models.User(
+        id=payload["sub"],
+        username=payload["name"],
+        role=payload["role"],
+        is_active=payload["active"]
+    )
+
 def create_refresh_token_for_user(db: Session, user_id: str) -> models.RefreshToken:
     """
     Create a refresh token for a user.
@@ -75,6 +113,9 @@ async def get_current_user(
     """
     Get the current user from the JWT token.
 
+    The user is read through the user cache, or built from the token claims
+    with JWT_TRUST_USER_CLAIMS, so most requests do not query the database.
+
     Args:
         token: JWT token.
         db: Database session.
@@ -109,8 +150,9 @@ async def get_current_user(
         logger.warning(f"JWT error: {e}")
         raise credentials_exception
 
-    # Get user from database
-    user = crud.get_user(db, user_id)
+    user = user_from_claims(payload) if settings.JWT_TRUST_USER_CLAIMS else None
+    if user is None:
+        user = load_user(db, user_id)
     if user is None:
         logger.warning(f"User not found: {user_id}")
         raise credentials_exception
@@ -0,0 +1,190 @@
+"""
+Cache of authenticated users.
+
+get_current_user resolves the user of every authenticated request. The
+public fields of recently seen users (schemas.User, without the password
+hash) are kept in an in-process LRU for USER_CACHE_TTL seconds and, with
+USER_CACHE_REDIS_URL set, in Redis, where other API processes find them.
+
+crud reports users that are updated, deleted or have their tokens revoked
+(see crud.user_change_listeners); their entries are dropped from this
+process and from Redis. The in-process entries of other processes expire
+with the TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from db_module import crud, models, schemas
+from ..config import settings
+from ..logger_config import logger
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+try:
+    from prometheus_client import Counter
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+REDIS_KEY_PREFIX = "flashcards:user:"
+# Tries at dropping a changed user from Redis; past them the stale entry
+# lives until the TTL expires
+REDIS_DELETE_ATTEMPTS = 2
+
+if PROMETHEUS_AVAILABLE:
+    user_cache_lookups = Counter(
+        'backend_user_cache_lookups_total',
+        'Authenticated user lookups by cache tier; a miss of every tier queries the database',
+        ['tier', 'result']
+    )
+
+def _record_lookup(tier: str, hit: bool) -> None:
+    if PROMETHEUS_AVAILABLE:
+        user_cache_lookups.labels(tier=tier, result="hit" if hit else "miss").inc()
+
+class UserCache:
+    """Bounded TTL LRU of users, optionally backed by Redis."""
+
+    def __init__(self, maxsize: int, ttl: float, redis_client=None):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Users kept in memory, 0 disables the cache
+            ttl: Seconds a user is kept, in memory and in Redis
+            redis_client: Redis client shared by the API processes, None for memory only
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.redis = redis_client
+        self._entries: "OrderedDict[str, Tuple[float, schemas.User]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a user read before one is not cached after it
+        self.generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, user_id: str) -> Optional[schemas.User]:
+        """Get a cached user, or None if absent or expired."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                _record_lookup("memory", True)
+                return entry[1]
+            self._entries.pop(user_id, None)
+        _record_lookup("memory", False)
+        if self.redis is None:
+            return None
+        try:
+            data = self.redis.get(REDIS_KEY_PREFIX + user_id)
+        except Exception as e:
+            logger.warning(f"User cache Redis lookup failed: {str(e)}")
+            return None
+        _record_lookup("redis", data is not None)
+        if data is None:
+            return None
+        user = schemas.User.model_validate_json(data)
+        self._remember(user)
+        return user
+
+    def set(self, user: schemas.User, generation: Optional[int] = None) -> None:
+        """
+        Cache a user for the TTL.
+
+        Args:
+            user: User read from the database
+            generation: Value of self.generation before the user was read; the
+                user is not cached if an invalidation happened since
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+        self._remember(user)
+        if self.redis is not None:
+            try:
+                self.redis.setex(REDIS_KEY_PREFIX + user.id, max(1, round(self.ttl)), user.model_dump_json())
+            except Exception as e:
+                logger.warning(f"User cache Redis update failed: {str(e)}")
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop a user from memory and from Redis."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self.generation += 1
+        if self.redis is not None:
+            for attempt in range(1, REDIS_DELETE_ATTEMPTS + 1):
+                try:
+                    self.redis.delete(REDIS_KEY_PREFIX + user_id)
+                    break
+                except Exception as e:
+                    if attempt == REDIS_DELETE_ATTEMPTS:
+                        logger.error(
+                            f"User cache Redis invalidation failed for user {user_id}, "
+                            f"other processes may serve it for up to {self.ttl:g}s: {str(e)}"
+                        )
+        logger.debug(f"Dropped cached user: {user_id}")
+
+    def clear(self) -> None:
+        """Drop every user kept in memory."""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, user: schemas.User) -> None:
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+def _create_redis_client():
+    if not settings.USER_CACHE_REDIS_URL:
+        return None
+    if not REDIS_AVAILABLE:
+        logger.warning("redis package not available, authenticated users are cached in memory only")
+        return None
+    # Short timeouts: a slow Redis must not hold up every request
+    return redis.from_url(
+        settings.USER_CACHE_REDIS_URL, decode_responses=True,
+        socket_timeout=0.5, socket_connect_timeout=0.5
+    )
+
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL, _create_redis_client())
+crud.user_change_listeners.append(user_cache.invalidate)
+
+def load_user(db: Session, user_id: str) -> Optional[models.User]:
+    """
+    Get a user through the cache.
+
+    A cached user is returned as a new models.User that is not attached to
+    the session, carrying the schemas.User fields only.
+
+    Args:
+        db: Database session, used on a cache miss
+        user_id: User ID
+
+    Returns:
+        The user, or None if it does not exist
+    """
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return models.User(**cached.model_dump())
+    generation = user_cache.generation
+    user = crud.get_user(db, user_id)
+    if user is not None:
+        user_cache.set(schemas.User.model_validate(user), generation)
+    return user
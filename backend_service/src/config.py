@@ -28,11 +28,42 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("JWT_REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+    # Authenticate with the role and active claims of the access token instead of
+    # loading the user; deactivation then takes effect when the token expires
+    JWT_TRUST_USER_CLAIMS: bool = os.getenv("JWT_TRUST_USER_CLAIMS", "false").lower() == "true"
+
+    # Authenticated user cache (0 disables it). Other processes' entries of a
+    # changed user are dropped from Redis at once and from memory within the TTL
+    USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", "10000"))
+    USER_CACHE_TTL: float = float(os.getenv("USER_CACHE_TTL", "60"))  # seconds
+    USER_CACHE_REDIS_URL: str = os.getenv("USER_CACHE_REDIS_URL", "")
 
     # Service URLs
     OCR_SERVICE_URL: str = os.getenv("OCR_SERVICE_URL", "http://ocr-service:8000")
     LLM_SERVICE_URL: str = os.getenv("LLM_SERVICE_URL", "http://llm-service:8001")
 
+    # Service HTTP client pool settings (shared by the OCR and LLM clients)
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))  # seconds
+    HTTP_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_POOL_TIMEOUT: float = float(os.getenv("HTTP_POOL_TIMEOUT", "10"))  # wait for a free connection
+    HTTP_READ_TIMEOUT: float = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+    # HTTP/2 is negotiated over TLS and needs the h2 package (httpx[http2])
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+    OCR_REQUEST_TIMEOUT: float = float(os.getenv("OCR_REQUEST_TIMEOUT", "30"))
+    LLM_REQUEST_TIMEOUT: float = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
+
+    # Service call resilience settings
+    OCR_MAX_ATTEMPTS: int = int(os.getenv("OCR_MAX_ATTEMPTS", "3"))
+    LLM_MAX_ATTEMPTS: int = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))
+    SERVICE_RETRY_BASE_DELAY: float = float(os.getenv("SERVICE_RETRY_BASE_DELAY", "0.5"))
+    SERVICE_RETRY_MAX_DELAY: float = float(os.getenv("SERVICE_RETRY_MAX_DELAY", "30"))
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_TIMEOUT: float = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+    # Seconds before a duplicate OCR request is sent for a slow one, 0 disables hedging
+    OCR_HEDGE_DELAY: float = float(os.getenv("OCR_HEDGE_DELAY", "0"))
+
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./data/flashcards.db")
 
@@ -41,6 +72,47 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = int(os.getenv("MAX_UPLOAD_SIZE", "10485760"))  # 10 MB
     ALLOWED_EXTENSIONS: List[str] = ["jpg", "jpeg", "png", "pdf"]
 
+    # Deck import settings
+    DECK_IMPORT_BATCH_SIZE: int = int(os.getenv("DECK_IMPORT_BATCH_SIZE", "1000"))
+    # Most bytes an Anki package may unpack to, checked before anything is extracted
+    DECK_IMPORT_MAX_UNPACKED_SIZE: int = int(os.getenv("DECK_IMPORT_MAX_UNPACKED_SIZE", "104857600"))  # 100 MB
+    # Most flashcards returned by one deck detail response (stream=true returns them all)
+    DECK_PAGE_MAX_SIZE: int = int(os.getenv("DECK_PAGE_MAX_SIZE", "5000"))
+
+    # Document processing queue settings
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_DELAY: float = float(os.getenv("JOB_RETRY_DELAY", "10"))  # seconds, doubled per attempt
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+    # Run the worker pool inside the API process (local development without a worker container).
+    # Off by default: the workers' database calls are synchronous and would block the API's event loop
+    JOB_WORKER_EMBEDDED: bool = os.getenv("JOB_WORKER_EMBEDDED", "false").lower() == "true"
+    # OCR to LLM pipeline: minimum characters of OCR text per LLM request
+    # (the requested flashcard count is shared out over the whole document),
+    # chunks waiting between stages, and LLM requests in flight per document
+    PIPELINE_CHUNK_CHARS: int = int(os.getenv("PIPELINE_CHUNK_CHARS", "8000"))
+    PIPELINE_QUEUE_SIZE: int = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+    PIPELINE_LLM_CONCURRENCY: int = int(os.getenv("PIPELINE_LLM_CONCURRENCY", "2"))
+    # Most LLM requests per document, below the LLM service's 5/minute limit on /generate
+    PIPELINE_MAX_CHUNKS: int = int(os.getenv("PIPELINE_MAX_CHUNKS", "4"))
+    # Clone the flashcards of an identical upload (own or public decks) instead of calling the LLM
+    DEDUP_REUSE_FLASHCARDS: bool = os.getenv("DEDUP_REUSE_FLASHCARDS", "true").lower() == "true"
+
+    # Document event stream settings. Without a Redis URL events only reach
+    # subscribers in the process running the job (embedded workers)
+    DOCUMENT_EVENTS_REDIS_URL: str = os.getenv("DOCUMENT_EVENTS_REDIS_URL", "")
+    DOCUMENT_EVENTS_CHANNEL: str = os.getenv("DOCUMENT_EVENTS_CHANNEL", "flashcards:document-events")
+    DOCUMENT_EVENTS_QUEUE_SIZE: int = int(os.getenv("DOCUMENT_EVENTS_QUEUE_SIZE", "100"))  # per subscriber
+    # Seconds between keep-alive comments, when the document status is also re-read
+    DOCUMENT_EVENTS_HEARTBEAT: float = float(os.getenv("DOCUMENT_EVENTS_HEARTBEAT", "15"))
+
+    # Password hashing pool (the bcrypt cost is BCRYPT_ROUNDS, read by db_module.crud).
+    # Logins and registrations beyond the workers wait in a queue of
+    # PASSWORD_HASH_QUEUE_SIZE, past which they are answered with 503
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "64"))
+
     # Security settings
     SECURITY_PASSWORD_SALT: str = os.getenv("SECURITY_PASSWORD_SALT", "salt")
 
@@ -13,9 +13,13 @@ from contextlib import asynccontextmanager
 from .config import settings
 from .logger_config import logger
 from .api import api_router
-from db_module.database import init_db
+from db_module.database import init_db, dispose_async_engine
 from .scripts.create_native_decks import create_native_decks
 from .middleware import limiter, rate_limit_handler, check_redis_health
+from .middleware.upload_limit import UploadSizeLimitMiddleware
+from .worker import DocumentWorkerPool
+from .services import http_client
+from .services.events import event_bus
 
 # Prometheus metrics
 try:
@@ -34,6 +38,8 @@ except ImportError:
     class Gauge:
         def __init__(self, *args, **kwargs): pass
         def set(self, *args, **kwargs): pass
+        def labels(self, *args, **kwargs): return self
+        def set_function(self, *args, **kwargs): pass
     logger.warning("Prometheus dependencies not available. Monitoring disabled.")
 
 @asynccontextmanager
@@ -63,12 +69,29 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("Redis connection failed - rate limiting may not work properly")
 
+    # Open the pooled HTTP client shared by the OCR and LLM service clients
+    http_client.get_http_client()
+
+    # Relay document events published by the worker service to event streams
+    await event_bus.start()
+
+    # Process queued documents in this process when no worker service runs
+    worker_pool = None
+    if settings.JOB_WORKER_EMBEDDED and os.getenv("TESTING", "false").lower() != "true":
+        worker_pool = DocumentWorkerPool()
+        worker_pool.start()
+
     logger.info("Backend service started successfully")
 
     yield
 
     # Shutdown events
     logger.info("Shutting down backend service")
+    if worker_pool:
+        await worker_pool.stop(timeout=10)
+    await http_client.close_http_client()
+    await event_bus.stop()
+    await dispose_async_engine()
 
 # Create FastAPI app
 app = FastAPI(
@@ -146,6 +169,28 @@ backend_external_api_duration = Histogram(
     ['service']
 )
 
+# Utilization of the pooled HTTP client used for OCR and LLM service calls,
+# read from the pool on every scrape
+backend_http_pool_connections = Gauge(
+    'backend_http_pool_connections',
+    'Connections and queued requests in the service HTTP client pool',
+    ['state']
+)
+for _state in ("active", "idle", "waiting", "max_connections"):
+    backend_http_pool_connections.labels(state=_state).set_function(
+        lambda state=_state: http_client.pool_stats()[state]
+    )
+
+# Reject oversized document and deck uploads before their body is buffered
+# (added before CORS so that its 413 responses carry the CORS headers)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        f"{settings.API_V1_STR}/documents/": settings.MAX_UPLOAD_SIZE,
+        f"{settings.API_V1_STR}/decks/import": settings.MAX_UPLOAD_SIZE,
+    }
+)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -153,6 +198,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API router
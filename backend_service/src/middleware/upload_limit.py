@@ -0,0 +1,68 @@
+"""
+Request body size limit for upload endpoints.
+
+FastAPI parses a multipart body completely before the endpoint runs, so a
+limit checked in the endpoint only applies after an oversized upload has
+already been received. This ASGI middleware rejects such requests with
+413 from the Content-Length header, or as soon as the streamed body
+crosses the limit.
+"""
+from typing import Dict
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..logger_config import logger
+
+# Allowance for the multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD = 64 * 1024
+
+def _too_large(limit: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Upload exceeds the maximum size of {limit} bytes"
+    )
+
+class UploadSizeLimitMiddleware:
+    """Limit the body size of POST requests to the given paths."""
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: ASGI application
+            limits: Maximum upload size in bytes per request path
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get(scope.get("path", "")) if scope["type"] == "http" else None
+        if limit is None or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        max_body = limit + MULTIPART_OVERHEAD
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_body:
+            logger.warning(f"Rejected upload of {int(content_length)} bytes to {scope['path']}")
+            error = _too_large(limit)
+            response = JSONResponse(status_code=error.status_code, content={"detail": error.detail})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body:
+                    logger.warning(f"Rejected streamed upload over {max_body} bytes to {scope['path']}")
+                    raise _too_large(limit)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -7,6 +7,7 @@ It deletes any existing decks and creates three rich native decks.
 import logging
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from db_module import crud, schemas
 from db_module.database import get_db
 from db_module.models import User, Deck, Flashcard, StudySession, StudyRecord
 import uuid
@@ -261,19 +262,15 @@ def create_native_decks(delete_existing=True):
                 db.refresh(new_deck)
                 logger.info(f"Created deck: {new_deck.id}")
 
-                # Add flashcards to the deck
-                flashcard_count = 0
-                for card_data in flashcards:
-                    new_card = Flashcard(
-                        id=str(uuid.uuid4()),
+                # Add flashcards to the deck in a single batch
+                flashcard_count = crud.create_flashcards_bulk(db, [
+                    schemas.FlashcardCreate(
                         question=card_data["question"],
                         answer=card_data["answer"],
                         deck_id=new_deck.id
                     )
-                    db.add(new_card)
-                    flashcard_count += 1
-
-                db.commit()
+                    for card_data in flashcards
+                ])
                 logger.info(f"Added {flashcard_count} flashcards to deck: {deck_title}")
 
                 created_decks += 1
@@ -0,0 +1,243 @@
+"""
+Bulk deck export and import.
+
+Exports are written from crud.iter_flashcard_batches, so a deck is never
+held in memory as a whole. Imports parse the upload row by row and insert
+the cards in batches through crud.create_flashcards_bulk, in the
+transaction that creates the deck.
+
+Supported formats:
+    csv   - question,answer columns with a header row
+    jsonl - one {"question": ..., "answer": ...} object per line
+    apkg  - Anki package using the Basic note type (export needs genanki)
+"""
+import codecs
+import csv
+import html
+import io
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import uuid
+import zipfile
+from typing import BinaryIO, Iterator, List, Tuple, Union
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from db_module import crud, models, schemas
+from ..config import settings
+from ..logger_config import logger
+from .streaming import iter_detached_batches
+
+try:
+    import genanki
+    APKG_SUPPORT = True
+except ImportError:
+    APKG_SUPPORT = False
+    logger.warning("genanki not available, apkg export disabled")
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "apkg": "application/octet-stream",
+}
+
+# Rows read from the database per export batch
+EXPORT_BATCH_SIZE = 1000
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+class DeckImportError(ValueError):
+    """Raised when an uploaded deck file cannot be parsed."""
+
+def export_filename(deck: models.Deck, export_format: str) -> str:
+    """Build a download filename from the deck title."""
+    stem = re.sub(r"[^A-Za-z0-9_-]+", "_", deck.title).strip("_") or deck.id
+    return f"{stem}.{export_format}"
+
+def iter_csv(bind: Union[Engine, Connection], deck_id: str) -> Iterator[bytes]:
+    """Yield a deck as CSV, one chunk per database batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["question", "answer"])
+    for batch in iter_detached_batches(bind, deck_id, EXPORT_BATCH_SIZE):
+        writer.writerows((row.question, row.answer) for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+def iter_jsonl(bind: Union[Engine, Connection], deck_id: str) -> Iterator[bytes]:
+    """Yield a deck as JSON Lines, one chunk per database batch."""
+    for batch in iter_detached_batches(bind, deck_id, EXPORT_BATCH_SIZE):
+        yield "".join(
+            json.dumps({"question": row.question, "answer": row.answer}, ensure_ascii=False) + "\n"
+            for row in batch
+        ).encode()
+
+def _anki_id(value: str) -> int:
+    """Derive a stable Anki deck ID from a UUID."""
+    return uuid.UUID(value).int % (1 << 31)
+
+def write_apkg(db: Session, deck: models.Deck, path: str) -> None:
+    """
+    Write a deck to an Anki package file.
+
+    Raises:
+        RuntimeError: If genanki is not installed.
+    """
+    if not APKG_SUPPORT:
+        raise RuntimeError("apkg export requires genanki")
+    anki_deck = genanki.Deck(_anki_id(deck.id), deck.title, description=deck.description or "")
+    for batch in crud.iter_flashcard_batches(db, deck.id, batch_size=EXPORT_BATCH_SIZE):
+        for row in batch:
+            anki_deck.add_note(genanki.Note(
+                model=genanki.BASIC_MODEL,
+                fields=[html.escape(row.question), html.escape(row.answer)],
+                guid=genanki.guid_for(row.id)
+            ))
+    genanki.Package(anki_deck).write_to_file(path)
+
+def _clean_anki_field(value: str) -> str:
+    """Turn an Anki HTML field back into plain text."""
+    return html.unescape(_TAG_RE.sub("", value.replace("<br>", "\n"))).strip()
+
+def _parse_csv(file: BinaryIO) -> Iterator[Tuple[str, str]]:
+    text = codecs.getreader("utf-8-sig")(file)
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [column.strip().lower() for column in header]
+    if "question" in columns and "answer" in columns:
+        q_index, a_index = columns.index("question"), columns.index("answer")
+    else:
+        # No header: the first two columns are question and answer
+        q_index, a_index = 0, 1
+        if len(header) < 2:
+            raise DeckImportError("Line 1: expected question and answer columns")
+        yield header[0], header[1]
+    for row in reader:
+        if not row:
+            continue
+        if len(row) <= max(q_index, a_index):
+            raise DeckImportError(f"Line {reader.line_num}: expected question and answer columns")
+        yield row[q_index], row[a_index]
+
+def _parse_jsonl(file: BinaryIO) -> Iterator[Tuple[str, str]]:
+    for line_number, line in enumerate(codecs.getreader("utf-8-sig")(file), start=1):
+        if not line.strip():
+            continue
+        try:
+            card = json.loads(line)
+            yield str(card["question"]), str(card["answer"])
+        except (ValueError, KeyError, TypeError):
+            raise DeckImportError(f"Line {line_number}: expected an object with question and answer")
+
+def _parse_apkg(file: BinaryIO) -> Iterator[Tuple[str, str]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            with zipfile.ZipFile(file) as package:
+                names = set(package.namelist())
+                if "collection.anki21b" in names:
+                    # Current Anki exports hold the real collection in a zstd
+                    # compressed anki21b file next to a placeholder anki2 one
+                    raise DeckImportError(
+                        "Anki packages in the collection.anki21b format are not supported; "
+                        "export with \"Support older Anki versions\" enabled"
+                    )
+                if sum(info.file_size for info in package.infolist()) > settings.DECK_IMPORT_MAX_UNPACKED_SIZE:
+                    raise DeckImportError("Anki package is too large to unpack")
+                collection = next(
+                    (name for name in ("collection.anki21", "collection.anki2") if name in names), None
+                )
+                if collection is None:
+                    raise DeckImportError("Anki package has no collection")
+                path = package.extract(collection, tmp)
+        except zipfile.BadZipFile:
+            raise DeckImportError("Not a valid Anki package")
+
+        connection = sqlite3.connect(path)
+        try:
+            for (fields,) in connection.execute("SELECT flds FROM notes ORDER BY id"):
+                values = fields.split("\x1f")
+                if len(values) >= 2:
+                    yield _clean_anki_field(values[0]), _clean_anki_field(values[1])
+        except sqlite3.DatabaseError:
+            raise DeckImportError("Not a valid Anki collection")
+        finally:
+            connection.close()
+
+PARSERS = {
+    "csv": _parse_csv,
+    "jsonl": _parse_jsonl,
+    "apkg": _parse_apkg,
+}
+
+def import_deck(
+    db: Session,
+    file: BinaryIO,
+    import_format: str,
+    deck_in: schemas.DeckCreate,
+    owner_id: str,
+    batch_size: int
+) -> Tuple[models.Deck, int]:
+    """
+    Create a deck from an uploaded file.
+
+    Cards are inserted every batch_size rows. The deck and its cards are
+    committed together, so a file that turns out to be invalid part way
+    through, or any other failure, leaves no partial deck.
+
+    Args:
+        db: Database session
+        file: Uploaded file object
+        import_format: One of PARSERS
+        deck_in: Deck attributes
+        owner_id: ID of the importing user
+        batch_size: Cards per INSERT
+
+    Returns:
+        The new deck and the number of imported cards
+
+    Raises:
+        DeckImportError: If the file cannot be parsed.
+    """
+    imported = 0
+    batch: List[schemas.FlashcardCreate] = []
+    try:
+        deck = crud.create_deck(db, deck_in, owner_id, commit=False)
+        deck_id = deck.id
+        for question, answer in PARSERS[import_format](file):
+            if not question.strip() or not answer.strip():
+                continue
+            batch.append(schemas.FlashcardCreate(question=question, answer=answer, deck_id=deck_id))
+            if len(batch) >= batch_size:
+                imported += crud.create_flashcards_bulk(db, batch, commit=False)
+                batch = []
+        if batch:
+            imported += crud.create_flashcards_bulk(db, batch, commit=False)
+        db.commit()
+    except (DeckImportError, UnicodeDecodeError, csv.Error) as e:
+        db.rollback()
+        logger.warning(f"Deck import failed after {imported} cards: {e}")
+        if isinstance(e, DeckImportError):
+            raise
+        raise DeckImportError(f"Could not read file: {e}")
+    except BaseException:
+        db.rollback()
+        raise
+
+    logger.info(f"Imported {imported} cards into deck {deck_id}")
+    return deck, imported
+
+def remove_file(path: str) -> None:
+    """Delete a temporary export file, ignoring missing files."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,201 @@
+"""
+Document processing jobs.
+
+Uploads are queued in the processing_jobs table by
+crud.create_document_with_job and run by the worker pool in ..worker.
+Each stage is recorded on the job and on its document, and a retried job
+skips the stages whose results are already stored. OCR pages are streamed
+into the flashcard pipeline (see .flashcard_pipeline), so generation of
+the first chunks overlaps OCR of the later pages.
+
+Documents are matched on the SHA-256 of their content. The OCR text of an
+identical upload is copied whatever its owner, and with
+DEDUP_REUSE_FLASHCARDS the flashcards of an identical upload are cloned
+from a deck the owner already has or from a public deck.
+
+Stage transitions and progress are published on the document event bus
+(see .events) for clients following the document.
+"""
+from contextlib import aclosing
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from db_module import crud, models, schemas
+from ..config import settings
+from ..logger_config import logger
+from .events import event_bus
+from .flashcard_pipeline import generate_flashcards_pipelined
+from .ocr_service import OCRServiceClient
+from .llm_service import LLMServiceClient
+
+try:
+    from prometheus_client import Counter
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+# Flashcards requested from the LLM service per document
+FLASHCARDS_PER_DOCUMENT = 10
+
+# Joins the pages of the stored OCR text; pages keep their paragraph breaks
+PAGE_SEPARATOR = "\f"
+
+if PROMETHEUS_AVAILABLE:
+    dedup_lookups = Counter(
+        'backend_dedup_lookups_total',
+        'Lookups of the results of an identical upload; each hit saves an OCR or LLM call',
+        ['stage', 'result']
+    )
+
+def _record_lookup(stage: str, hit: bool) -> None:
+    if PROMETHEUS_AVAILABLE:
+        dedup_lookups.labels(stage=stage, result="hit" if hit else "miss").inc()
+
+async def _set_stage(
+    db: Session,
+    job: models.ProcessingJob,
+    stage: models.DocumentStatus,
+    **data: Any
+) -> None:
+    """Record the stage a job has reached and publish it to the document's subscribers."""
+    crud.update_job_stage(db, job, stage.value)
+    await event_bus.publish(job.document_id, "status", status=stage.value, **data)
+
+async def _copy_identical_text(
+    db: Session,
+    job: models.ProcessingJob,
+    document: models.Document
+) -> Optional[models.ExtractedText]:
+    """Copy the OCR text of an identical document, if there is one."""
+    if not document.content_sha256:
+        return None
+    shared = crud.find_extracted_text_by_content(db, document.content_sha256, document.id)
+    _record_lookup("ocr", shared is not None)
+    if not shared:
+        return None
+    logger.info(f"Reusing OCR text of document {shared.document_id} for document: {document.id}")
+    extracted_text = crud.create_extracted_text(db, schemas.ExtractedTextCreate(
+        content=shared.content,
+        document_id=document.id
+    ))
+    await _set_stage(db, job, models.DocumentStatus.OCR_COMPLETE)
+    return extracted_text
+
+async def _ocr_pages(
+    db: Session,
+    job: models.ProcessingJob,
+    document: models.Document,
+    ocr_client: OCRServiceClient
+) -> AsyncIterator[Tuple[str, int]]:
+    """Stream pages from the OCR service, storing the full text after the last one."""
+    await _set_stage(db, job, models.DocumentStatus.OCR_PROCESSING)
+    texts = []
+    async with aclosing(ocr_client.stream_pages(Path(document.file_path))) as records:
+        async for record in records:
+            texts.append(record["text"])
+            await event_bus.publish(
+                document.id, "progress", pages_done=len(texts), page_count=record["page_count"]
+            )
+            yield record["text"], record["page_count"]
+    crud.create_extracted_text(db, schemas.ExtractedTextCreate(
+        content=PAGE_SEPARATOR.join(text.replace(PAGE_SEPARATOR, "\n").strip() for text in texts),
+        document_id=document.id
+    ))
+    await _set_stage(db, job, models.DocumentStatus.OCR_COMPLETE)
+    await _set_stage(db, job, models.DocumentStatus.FLASHCARD_GENERATING)
+
+async def _stored_pages(text: str) -> AsyncIterator[Tuple[str, int]]:
+    """Split stored OCR text where the pages were joined."""
+    pages = [page.strip() for page in text.split(PAGE_SEPARATOR)]
+    for page in pages:
+        yield page, len(pages)
+
+def _clone_identical_deck(db: Session, document: models.Document) -> Optional[models.Deck]:
+    """Clone the flashcards of an identical document the owner may read."""
+    if not (settings.DEDUP_REUSE_FLASHCARDS and document.content_sha256):
+        return None
+    source = crud.find_reusable_deck(db, document.content_sha256, document.owner_id, document.id)
+    _record_lookup("flashcards", source is not None)
+    if not source:
+        return None
+    deck = crud.clone_deck(
+        db, source.id, document.owner_id,
+        title=f"Deck for {document.filename}",
+        description=f"Automatically generated from {document.filename}",
+        document_id=document.id
+    )
+    logger.info(f"Cloned flashcards of deck {source.id} into deck {deck.id} for document: {document.id}")
+    return deck
+
+async def process_document(
+    db: Session,
+    job: models.ProcessingJob,
+    ocr_client: OCRServiceClient,
+    llm_client: LLMServiceClient
+) -> None:
+    """
+    Run a processing job: extract text with OCR and generate flashcards.
+
+    Errors are raised to the worker, which records the failed attempt and
+    schedules a retry.
+
+    Args:
+        db: Database session owned by the job
+        job: Claimed processing job
+        ocr_client: OCR service client
+        llm_client: LLM service client
+    """
+    document = crud.get_document(db, job.document_id)
+    if not document:
+        logger.warning(f"Document {job.document_id} of processing job {job.id} no longer exists")
+        return
+
+    extracted_text = crud.get_extracted_text_by_document(db, document.id)
+    if extracted_text:
+        logger.info(f"Reusing extracted text for document: {document.id}")
+    else:
+        extracted_text = await _copy_identical_text(db, job, document)
+
+    # A deck left by a failed attempt is reused; its cards are written in one
+    # transaction, so a deck with cards is complete
+    deck = crud.get_deck_by_document(db, document.id)
+    if not deck and extracted_text:
+        deck = _clone_identical_deck(db, document)
+    if deck and crud.get_flashcards_by_deck(db, deck.id, limit=1):
+        logger.info(f"Flashcards already generated for document: {document.id}")
+    else:
+        if extracted_text:
+            await _set_stage(db, job, models.DocumentStatus.FLASHCARD_GENERATING)
+            pages = _stored_pages(extracted_text.content)
+        else:
+            # OCR and generation overlap: chunks are sent to the LLM as pages arrive
+            pages = _ocr_pages(db, job, document, ocr_client)
+
+        async def report_cards(generated: int) -> None:
+            await event_bus.publish(
+                document.id, "progress",
+                cards_generated=generated, cards_requested=FLASHCARDS_PER_DOCUMENT
+            )
+
+        flashcards = await generate_flashcards_pipelined(
+            pages, llm_client, FLASHCARDS_PER_DOCUMENT, on_progress=report_cards
+        )
+        if not deck:
+            deck = crud.create_deck(db, schemas.DeckCreate(
+                title=f"Deck for {document.filename}",
+                description=f"Automatically generated from {document.filename}",
+                document_id=document.id
+            ), owner_id=document.owner_id)
+        crud.create_flashcards_bulk(db, [
+            schemas.FlashcardCreate(
+                question=card["question"],
+                answer=card["answer"],
+                deck_id=deck.id
+            )
+            for card in flashcards
+        ])
+
+    await _set_stage(db, job, models.DocumentStatus.FLASHCARD_COMPLETE, deck_id=deck.id)
+    logger.info(f"Document processing complete: {document.id}")
@@ -0,0 +1,261 @@
+"""
+Document processing events.
+
+Clients follow a document through GET /documents/{id}/events instead of
+polling its status. Jobs publish an event for every stage transition and
+for progress within a stage (pages OCR'd, flashcards generated). The bus
+hands each event to the subscribers of its document in this process and,
+with DOCUMENT_EVENTS_REDIS_URL set, to every other API process through a
+Redis channel; workers running as a separate service need the channel to
+reach the API.
+
+Events are best effort: a subscriber that falls behind loses its oldest
+events, and the event stream re-reads the document status at every
+heartbeat, so a lost event only delays an update.
+"""
+import asyncio
+import json
+import uuid
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Set, Union
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from db_module import crud, models
+from ..config import settings
+from ..logger_config import logger
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+try:
+    from prometheus_client import Counter, Gauge
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+# Document statuses after which no further event is published
+TERMINAL_STATUSES = {
+    models.DocumentStatus.FLASHCARD_COMPLETE.value,
+    models.DocumentStatus.ERROR.value,
+}
+
+if PROMETHEUS_AVAILABLE:
+    event_subscribers = Gauge(
+        'backend_document_event_subscribers',
+        'Open document event streams in this process'
+    )
+    events_dropped = Counter(
+        'backend_document_events_dropped_total',
+        'Events dropped because a subscriber fell behind'
+    )
+
+Event = Dict[str, Any]
+
+class DocumentEventBus:
+    """Publish/subscribe of document events, optionally fanned out through Redis."""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        channel: str = settings.DOCUMENT_EVENTS_CHANNEL,
+        queue_size: int = settings.DOCUMENT_EVENTS_QUEUE_SIZE
+    ):
+        """
+        Initialize the bus.
+
+        Args:
+            redis_url: Redis server relaying events between processes, None for in-process only
+            channel: Redis channel of the events
+            queue_size: Events buffered per subscriber before the oldest is dropped
+        """
+        self.redis_url = redis_url if REDIS_AVAILABLE else None
+        self.channel = channel
+        self.queue_size = queue_size
+        # Tags the messages of this process, which are delivered locally before they are sent
+        self.origin = uuid.uuid4().hex
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+        if redis_url and not REDIS_AVAILABLE:
+            logger.warning("redis package not available, document events stay in this process")
+
+    @contextmanager
+    def subscribe(self, document_id: str) -> Iterator[asyncio.Queue]:
+        """
+        Receive the events of a document while the context is open.
+
+        Yields:
+            Queue of the events published from now on
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(document_id, set()).add(queue)
+        if PROMETHEUS_AVAILABLE:
+            event_subscribers.inc()
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(document_id, set())
+            subscribers.discard(queue)
+            if not subscribers:
+                self._subscribers.pop(document_id, None)
+            if PROMETHEUS_AVAILABLE:
+                event_subscribers.dec()
+
+    def deliver(self, event: Event) -> None:
+        """Hand an event to the subscribers of its document in this process."""
+        for queue in self._subscribers.get(event["document_id"], ()):
+            if queue.full():
+                queue.get_nowait()
+                if PROMETHEUS_AVAILABLE:
+                    events_dropped.inc()
+            queue.put_nowait(event)
+
+    async def publish(self, document_id: str, event_type: str, **data: Any) -> None:
+        """
+        Publish an event of a document.
+
+        Failures to reach Redis are logged and never raised, so events
+        cannot fail the job publishing them.
+
+        Args:
+            document_id: Document ID
+            event_type: "status", "progress" or "retry"
+            **data: Fields of the event
+        """
+        event = {"type": event_type, "document_id": document_id, **data}
+        self.deliver(event)
+        if not self.redis_url:
+            return
+        try:
+            await self._client().publish(self.channel, json.dumps({"origin": self.origin, "event": event}))
+        except Exception as e:
+            logger.warning(f"Could not publish document event to Redis: {str(e)}")
+
+    async def start(self) -> None:
+        """Start relaying events published by other processes, if Redis is configured."""
+        if self.redis_url and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+            logger.info(f"Listening for document events on Redis channel {self.channel}")
+
+    async def stop(self) -> None:
+        """Stop the relay and close the Redis connections."""
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    def receive(self, data: Union[str, bytes]) -> None:
+        """Deliver an event relayed through Redis, unless this process sent it."""
+        try:
+            message = json.loads(data)
+            if message["origin"] != self.origin:
+                self.deliver(message["event"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed document event: {str(e)}")
+
+    def _client(self):
+        if self._redis is None:
+            # No socket timeout: the relay blocks on the channel between events
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True, socket_connect_timeout=2)
+        return self._redis
+
+    async def _listen(self) -> None:
+        """Relay channel messages to local subscribers, reconnecting with backoff."""
+        delay = 1.0
+        while True:
+            pubsub = self._client().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                delay = 1.0
+                async for message in pubsub.listen():
+                    self.receive(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Document event channel unavailable, retrying in {delay:.0f}s: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                await pubsub.aclose()
+
+event_bus = DocumentEventBus(settings.DOCUMENT_EVENTS_REDIS_URL or None)
+
+def status_event(bind: Union[Engine, Connection], document_id: str) -> Optional[Event]:
+    """
+    Read the current status of a document as a status event.
+
+    The document is read through a session of its own, as the event stream
+    outlives the request session.
+
+    Returns:
+        The event, or None if the document no longer exists
+    """
+    with Session(bind=bind) as session:
+        document = crud.get_document(session, document_id)
+        if not document:
+            return None
+        event = {"type": "status", "document_id": document_id, "status": document.status}
+        if document.status == models.DocumentStatus.ERROR.value:
+            event["error"] = document.error_message
+        elif document.status == models.DocumentStatus.FLASHCARD_COMPLETE.value:
+            deck = crud.get_deck_by_document(session, document_id)
+            event["deck_id"] = deck.id if deck else None
+        return event
+
+def sse_message(event: Event) -> bytes:
+    """Format an event as a server-sent event named after its type."""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode()
+
+async def document_event_stream(
+    bind: Union[Engine, Connection],
+    document_id: str,
+    bus: DocumentEventBus = event_bus,
+    heartbeat: float = settings.DOCUMENT_EVENTS_HEARTBEAT
+) -> AsyncIterator[bytes]:
+    """
+    Stream the events of a document as server-sent events.
+
+    The current status is sent first, then every event until the document
+    completes or fails. Between events a keep-alive comment is sent every
+    heartbeat seconds, and the status is read again in case an event was
+    lost.
+
+    Args:
+        bind: Database bind of the request session
+        document_id: Document ID
+        bus: Event bus to subscribe to
+        heartbeat: Seconds between keep-alive comments
+
+    Yields:
+        Server-sent event chunks
+    """
+    # Subscribe before reading the status, so no transition falls in between
+    with bus.subscribe(document_id) as queue:
+        current = status_event(bind, document_id)
+        if current is None:
+            return
+        yield sse_message(current)
+        while current["status"] not in TERMINAL_STATUSES:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                latest = status_event(bind, document_id)
+                if latest is None:
+                    return
+                if latest["status"] != current["status"]:
+                    current = latest
+                    yield sse_message(latest)
+                else:
+                    yield b": keep-alive\n\n"
+                continue
+            if event["type"] == "status":
+                current = event
+            yield sse_message(event)
@@ -0,0 +1,143 @@
+"""
+Pipelined flashcard generation.
+
+Pages of text flow through three stages connected by bounded queues:
+
+    pages -> chunker -[chunks]-> LLM workers -[results]-> collector
+
+The chunker groups pages into chunks of at least chunk_chars characters and
+queues each chunk as soon as it is complete, so generation starts while
+later pages are still being extracted. When the LLM falls behind, the
+full chunk queue stops the chunker from reading pages, which in turn holds
+back the OCR stream. A long document then takes about as long as its
+slower stage instead of the sum of both.
+"""
+import asyncio
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..logger_config import logger
+from .llm_service import LLMServiceClient
+
+@dataclass
+class Chunk:
+    """Consecutive pages of text sent to the LLM in one request."""
+    index: int
+    text: str
+    num_cards: int
+
+def cards_for_chunk(remaining_cards: int, chunk_pages: int, remaining_pages: int) -> int:
+    """
+    Share of the remaining flashcards for a chunk, in proportion to its pages.
+
+    Args:
+        remaining_cards: Flashcards not yet allotted to a chunk
+        chunk_pages: Pages in the chunk
+        remaining_pages: Pages not yet allotted, including the chunk
+
+    Returns:
+        Flashcards to request for the chunk, 0 if its pages are too few for one
+    """
+    return round(remaining_cards * chunk_pages / max(remaining_pages, chunk_pages))
+
+async def run_stages(*stages: Awaitable[None]) -> None:
+    """Run pipeline stages concurrently; the first failure cancels the others."""
+    tasks = [asyncio.ensure_future(stage) for stage in stages]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+async def generate_flashcards_pipelined(
+    pages: AsyncIterator[Tuple[str, int]],
+    llm_client: LLMServiceClient,
+    num_cards: int,
+    chunk_chars: int = settings.PIPELINE_CHUNK_CHARS,
+    queue_size: int = settings.PIPELINE_QUEUE_SIZE,
+    concurrency: int = settings.PIPELINE_LLM_CONCURRENCY,
+    max_chunks: int = settings.PIPELINE_MAX_CHUNKS,
+    on_progress: Optional[Callable[[int], Awaitable[None]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Generate flashcards chunk by chunk while the pages are still arriving.
+
+    Args:
+        pages: Async generator of (page text, page count of the document)
+        llm_client: LLM service client
+        num_cards: Flashcards for the whole document, shared out by page
+        chunk_chars: Characters of text after which a chunk is sent, once its
+            pages are worth num_cards / max_chunks flashcards; the chunk
+            taking the last of num_cards runs to the end of the document
+        queue_size: Chunks, and chunk results, waiting between two stages
+        concurrency: LLM requests in flight
+        max_chunks: Most chunks, and so LLM requests, for the document
+        on_progress: Awaited with the number of flashcards generated so far after each chunk
+
+    Returns:
+        The flashcards in document order
+    """
+    chunks: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    results: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    cards: Dict[int, List[Dict[str, Any]]] = {}
+
+    # Flashcards a chunk must be worth before it is sent, so that the
+    # document takes at most max_chunks requests
+    min_cards = max(1, -(-num_cards // max(1, max_chunks)))
+
+    async def chunker() -> None:
+        texts: List[str] = []
+        size = chunk_pages = allotted_pages = page_count = index = 0
+        remaining_cards = num_cards
+
+        async def emit(wanted: int) -> None:
+            nonlocal texts, size, chunk_pages, allotted_pages, index, remaining_cards
+            await chunks.put(Chunk(index=index, text="\n\n".join(texts), num_cards=wanted))
+            remaining_cards -= wanted
+            allotted_pages += chunk_pages
+            index += 1
+            texts, size, chunk_pages = [], 0, 0
+
+        async with aclosing(pages):
+            async for text, page_count in pages:
+                chunk_pages += 1
+                if text:
+                    texts.append(text)
+                    size += len(text)
+                if size >= chunk_chars:
+                    wanted = cards_for_chunk(remaining_cards, chunk_pages, page_count - allotted_pages)
+                    # A chunk worth too few flashcards keeps growing, and the one
+                    # that would spend the rest of the budget takes the remaining pages
+                    if min_cards <= wanted < remaining_cards:
+                        await emit(wanted)
+        if texts and remaining_cards > 0:
+            await emit(remaining_cards)
+        for _ in range(concurrency):
+            await chunks.put(None)
+
+    async def generate() -> None:
+        while (chunk := await chunks.get()) is not None:
+            result = await llm_client.generate_flashcards(chunk.text, num_cards=chunk.num_cards)
+            await results.put((chunk.index, result.get("flashcards", [])))
+        await results.put(None)
+
+    async def collect() -> None:
+        finished = generated = 0
+        while finished < concurrency:
+            result = await results.get()
+            if result is None:
+                finished += 1
+            else:
+                cards[result[0]] = result[1]
+                generated += len(result[1])
+                if on_progress is not None:
+                    await on_progress(generated)
+
+    await run_stages(chunker(), *(generate() for _ in range(concurrency)), collect())
+    flashcards = [card for index in sorted(cards) for card in cards[index]]
+    logger.info(f"Generated {len(flashcards)} flashcards from {len(cards)} chunks")
+    return flashcards
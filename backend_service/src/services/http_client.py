@@ -0,0 +1,96 @@
+"""
+Shared HTTP client for calls to the OCR and LLM services.
+
+One pooled httpx.AsyncClient is opened in the application lifespan (or by
+the worker process) and reused by every service client, so requests share
+keep-alive connections instead of paying a new connection per call.
+"""
+from typing import Dict, Optional
+
+import httpx
+
+from ..config import settings
+from ..logger_config import logger
+
+try:
+    import h2  # noqa: F401
+    HTTP2_SUPPORT = True
+except ImportError:
+    HTTP2_SUPPORT = False
+    logger.debug("h2 not available, service calls use HTTP/1.1")
+
+_client: Optional[httpx.AsyncClient] = None
+
+def request_timeout(seconds: float) -> httpx.Timeout:
+    """Build a per-call timeout with the configured connect and pool limits."""
+    return httpx.Timeout(
+        seconds,
+        connect=settings.HTTP_CONNECT_TIMEOUT,
+        pool=settings.HTTP_POOL_TIMEOUT
+    )
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create a pooled AsyncClient from the HTTP_* settings."""
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=request_timeout(settings.HTTP_READ_TIMEOUT),
+        http2=settings.HTTP2_ENABLED and HTTP2_SUPPORT
+    )
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared client, opening it on first use.
+
+    Returns:
+        The process-wide pooled AsyncClient
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+        logger.info(
+            f"Opened service HTTP client pool (max {settings.HTTP_MAX_CONNECTIONS} connections, "
+            f"http2={settings.HTTP2_ENABLED and HTTP2_SUPPORT})"
+        )
+    return _client
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("Closed service HTTP client pool")
+
+def pool_stats() -> Dict[str, int]:
+    """
+    Report the utilization of the shared connection pool.
+
+    Returns:
+        Open connections split into active and idle ones, requests waiting
+        for a connection, and the configured maximum
+    """
+    stats = {
+        "max_connections": settings.HTTP_MAX_CONNECTIONS,
+        "connections": 0,
+        "active": 0,
+        "idle": 0,
+        "waiting": 0,
+    }
+    # httpx does not expose its pool, so read the httpcore pool behind the transport
+    pool = getattr(getattr(_client, "_transport", None), "_pool", None)
+    if _client is None or _client.is_closed or pool is None:
+        return stats
+    connections = list(pool.connections)
+    idle = sum(1 for connection in connections if connection.is_idle())
+    stats.update(
+        connections=len(connections),
+        active=len(connections) - idle,
+        idle=idle,
+        waiting=sum(1 for request in getattr(pool, "_requests", []) if request.is_queued())
+    )
+    return stats
@@ -5,20 +5,46 @@ import httpx
 from typing import Dict, Any, List, Optional
 from ..config import settings
 from ..logger_config import logger
+from .http_client import get_http_client, request_timeout
+from .resilience import CircuitOpenError, ResiliencePolicy
+
+# Shared by every client instance, so the circuit state is per process
+llm_policy = ResiliencePolicy(
+    "llm",
+    max_attempts=settings.LLM_MAX_ATTEMPTS,
+    base_delay=settings.SERVICE_RETRY_BASE_DELAY,
+    max_delay=settings.SERVICE_RETRY_MAX_DELAY,
+    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.CIRCUIT_RESET_TIMEOUT
+)
 
 class LLMServiceClient:
     """Client for the LLM service."""
     
-    def __init__(self, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        policy: Optional[ResiliencePolicy] = None
+    ):
         """
         Initialize the LLM service client.
         
         Args:
             base_url: Base URL of the LLM service.
+            http_client: HTTP client to send requests with, defaults to the shared pooled client.
+            policy: Retry and circuit breaker policy, defaults to the shared LLM policy.
         """
         self.base_url = base_url or settings.LLM_SERVICE_URL
+        self._http_client = http_client
+        self.policy = policy or llm_policy
         logger.debug(f"Initialized LLM service client with base URL: {self.base_url}")
     
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client used for requests to the LLM service."""
+        return self._http_client or get_http_client()
+    
     async def generate_flashcards(self, text: str, num_cards: int = 5) -> Dict[str, Any]:
         """
         Generate flashcards from text using the LLM service.
@@ -31,6 +57,7 @@ class LLMServiceClient:
             Dictionary with generated flashcards.
             
         Raises:
+            CircuitOpenError: If the LLM service circuit is open.
             Exception: If LLM service request fails.
         """
         logger.info(f"Generating {num_cards} flashcards from {len(text)} characters of text")
@@ -43,25 +70,28 @@ class LLMServiceClient:
         
         # Send request to LLM service
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/generate",
-                    json=data,
-                    timeout=60.0  # 60 seconds timeout
-                )
-                
-                # Check response status
-                response.raise_for_status()
-                
-                # Parse response
-                result = response.json()
-                logger.info(f"Successfully generated {len(result.get('flashcards', []))} flashcards")
-                return result
-                
+            response = await self.policy.call(lambda: self.client.post(
+                f"{self.base_url}/generate",
+                json=data,
+                timeout=request_timeout(settings.LLM_REQUEST_TIMEOUT)
+            ))
+            
+            # Check response status
+            response.raise_for_status()
+            
+            # Parse response
+            result = response.json()
+            logger.info(f"Successfully generated {len(result.get('flashcards', []))} flashcards")
+            return result
+            
         except httpx.HTTPStatusError as e:
             logger.error(f"LLM service HTTP error: {e.response.status_code} - {e.response.text}")
             raise Exception(f"LLM service error: {e.response.status_code} - {e.response.text}")
             
+        except CircuitOpenError as e:
+            logger.warning(str(e))
+            raise
+            
         except httpx.RequestError as e:
             logger.error(f"LLM service request error: {str(e)}")
             raise Exception(f"LLM service request error: {str(e)}")
@@ -82,6 +112,7 @@ class LLMServiceClient:
             Dictionary with generated flashcards.
             
         Raises:
+            CircuitOpenError: If the LLM service circuit is open.
             Exception: If LLM service request fails.
         """
         logger.info(f"Generating {num_cards} flashcards from {len(chunks)} text chunks")
@@ -94,25 +125,28 @@ class LLMServiceClient:
         
         # Send request to LLM service
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/generate/chunks",
-                    json=data,
-                    timeout=60.0  # 60 seconds timeout
-                )
-                
-                # Check response status
-                response.raise_for_status()
-                
-                # Parse response
-                result = response.json()
-                logger.info(f"Successfully generated {len(result.get('flashcards', []))} flashcards from chunks")
-                return result
-                
+            response = await self.policy.call(lambda: self.client.post(
+                f"{self.base_url}/generate/chunks",
+                json=data,
+                timeout=request_timeout(settings.LLM_REQUEST_TIMEOUT)
+            ))
+            
+            # Check response status
+            response.raise_for_status()
+            
+            # Parse response
+            result = response.json()
+            logger.info(f"Successfully generated {len(result.get('flashcards', []))} flashcards from chunks")
+            return result
+            
         except httpx.HTTPStatusError as e:
             logger.error(f"LLM service HTTP error: {e.response.status_code} - {e.response.text}")
             raise Exception(f"LLM service error: {e.response.status_code} - {e.response.text}")
             
+        except CircuitOpenError as e:
+            logger.warning(str(e))
+            raise
+            
         except httpx.RequestError as e:
             logger.error(f"LLM service request error: {str(e)}")
             raise Exception(f"LLM service request error: {str(e)}")
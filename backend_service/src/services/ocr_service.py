@@ -1,26 +1,113 @@
 """
 OCR service client.
 """
+import json
+import mimetypes
+import os
+import secrets
 import httpx
 import aiofiles
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, Optional
 from ..config import settings
 from ..logger_config import logger
+from .http_client import get_http_client, request_timeout
+from .resilience import CircuitOpenError, ResiliencePolicy
+
+# Shared by every client instance, so the circuit state is per process
+ocr_policy = ResiliencePolicy(
+    "ocr",
+    max_attempts=settings.OCR_MAX_ATTEMPTS,
+    base_delay=settings.SERVICE_RETRY_BASE_DELAY,
+    max_delay=settings.SERVICE_RETRY_MAX_DELAY,
+    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+    hedge_delay=settings.OCR_HEDGE_DELAY or None
+)
+
+# Bytes read from disk per chunk of a streamed upload
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+class MultipartFileStream:
+    """
+    A multipart/form-data body with a single file field, streamed from disk.
+
+    The file is read chunk by chunk while the request is sent, instead of
+    being loaded into memory first. Every iteration opens the file again,
+    so the same body can be sent by retried and hedged requests.
+    """
+
+    def __init__(
+        self,
+        field: str,
+        file_path: Path,
+        content_type: Optional[str] = None,
+        chunk_size: int = UPLOAD_CHUNK_SIZE
+    ):
+        """
+        Initialize the body.
+
+        Args:
+            field: Name of the form field.
+            file_path: Path of the file to send.
+            content_type: MIME type of the file, guessed from its name by default.
+            chunk_size: Bytes read from the file per chunk.
+        """
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.boundary = secrets.token_hex(16)
+        content_type = content_type or mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+        filename = file_path.name.replace('"', "%22")
+        self._head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self.size = len(self._head) + os.path.getsize(file_path) + len(self._tail)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Content-Type and Content-Length headers of the body."""
+        return {
+            "Content-Type": f"multipart/form-data; boundary={self.boundary}",
+            "Content-Length": str(self.size)
+        }
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield self._head
+        async with aiofiles.open(self.file_path, "rb") as f:
+            while chunk := await f.read(self.chunk_size):
+                yield chunk
+        yield self._tail
 
 class OCRServiceClient:
     """Client for the OCR service."""
     
-    def __init__(self, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        policy: Optional[ResiliencePolicy] = None
+    ):
         """
         Initialize the OCR service client.
         
         Args:
             base_url: Base URL of the OCR service.
+            http_client: HTTP client to send requests with, defaults to the shared pooled client.
+            policy: Retry and circuit breaker policy, defaults to the shared OCR policy.
         """
         self.base_url = base_url or settings.OCR_SERVICE_URL
+        self._http_client = http_client
+        self.policy = policy or ocr_policy
         logger.debug(f"Initialized OCR service client with base URL: {self.base_url}")
     
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client used for requests to the OCR service."""
+        return self._http_client or get_http_client()
+    
     async def extract_text(self, file_path: Path) -> Dict[str, Any]:
         """
         Extract text from an image using the OCR service.
@@ -32,38 +119,37 @@ class OCRServiceClient:
             Dictionary with extracted text.
             
         Raises:
+            CircuitOpenError: If the OCR service circuit is open.
             Exception: If OCR service request fails.
         """
         logger.info(f"Extracting text from file: {file_path}")
         
-        # Read file content
-        async with aiofiles.open(file_path, "rb") as f:
-            file_content = await f.read()
-        
-        # Prepare file for upload
-        files = {"file": (file_path.name, file_content, f"image/{file_path.suffix[1:]}")}
-        
-        # Send request to OCR service
+        # Send request to OCR service, streaming the file from disk
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/extract",
-                    files=files,
-                    timeout=30.0  # 30 seconds timeout
-                )
-                
-                # Check response status
-                response.raise_for_status()
-                
-                # Parse response
-                result = response.json()
-                logger.info(f"Successfully extracted {len(result.get('text', ''))} characters of text")
-                return result
-                
+            body = MultipartFileStream("file", file_path)
+            response = await self.policy.call(lambda: self.client.post(
+                f"{self.base_url}/extract",
+                content=body,
+                headers=body.headers,
+                timeout=request_timeout(settings.OCR_REQUEST_TIMEOUT)
+            ))
+            
+            # Check response status
+            response.raise_for_status()
+            
+            # Parse response
+            result = response.json()
+            logger.info(f"Successfully extracted {len(result.get('text', ''))} characters of text")
+            return result
+            
         except httpx.HTTPStatusError as e:
             logger.error(f"OCR service HTTP error: {e.response.status_code} - {e.response.text}")
             raise Exception(f"OCR service error: {e.response.status_code} - {e.response.text}")
             
+        except CircuitOpenError as e:
+            logger.warning(str(e))
+            raise
+            
         except httpx.RequestError as e:
             logger.error(f"OCR service request error: {str(e)}")
             raise Exception(f"OCR service request error: {str(e)}")
@@ -71,3 +157,68 @@ class OCRServiceClient:
         except Exception as e:
             logger.exception(f"Unexpected error during OCR text extraction: {str(e)}")
             raise
+    
+    async def stream_pages(self, file_path: Path) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Extract text page by page from the streaming endpoint of the OCR service.
+        
+        Pages are yielded as the OCR service extracts them, so later stages
+        can start before the whole document is done. Only the request is
+        retried; an error once pages have arrived fails the stream.
+        
+        Args:
+            file_path: Path to the image or PDF file.
+            
+        Yields:
+            Page records with the page number, the page count and the text.
+            
+        Raises:
+            CircuitOpenError: If the OCR service circuit is open.
+            Exception: If the OCR service request fails or the stream is cut short.
+        """
+        logger.info(f"Streaming text from file: {file_path}")
+        body = MultipartFileStream("file", file_path)
+        
+        def send():
+            request = self.client.build_request(
+                "POST",
+                f"{self.base_url}/extract/stream",
+                content=body,
+                headers=body.headers,
+                timeout=request_timeout(settings.OCR_REQUEST_TIMEOUT)
+            )
+            return self.client.send(request, stream=True)
+        
+        try:
+            response = await self.policy.call(send, hedge=False)
+        except CircuitOpenError as e:
+            logger.warning(str(e))
+            raise
+        except httpx.RequestError as e:
+            logger.error(f"OCR service request error: {str(e)}")
+            raise Exception(f"OCR service request error: {str(e)}")
+        
+        try:
+            if response.is_error:
+                await response.aread()
+                logger.error(f"OCR service HTTP error: {response.status_code} - {response.text}")
+                raise Exception(f"OCR service error: {response.status_code} - {response.text}")
+            
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record.get("status") == "error":
+                    raise Exception(f"OCR service error: {record.get('detail')}")
+                if record.get("status") == "success":
+                    logger.info(f"Streamed {record['page_count']} pages from file: {file_path}")
+                    return
+                yield record
+            raise Exception("OCR service stream ended before the last page")
+            
+        except httpx.RequestError as e:
+            logger.error(f"OCR service stream error: {str(e)}")
+            raise Exception(f"OCR service stream error: {str(e)}")
+            
+        finally:
+            await response.aclose()
@@ -0,0 +1,176 @@
+"""
+Password hashing off the event loop.
+
+bcrypt takes about 200 ms of CPU per hash at the default cost. Run inline
+in an async handler it stalls every other request of the process for that
+long. The hashes are computed in a bounded thread pool instead (bcrypt
+releases the GIL, so the workers hash in parallel). At most
+PASSWORD_HASH_QUEUE_SIZE requests wait for a worker; past that,
+PasswordHasherBusyError is raised and the endpoints answer 503, rather
+than letting logins queue up for longer than clients wait.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from db_module import crud, models
+from ..config import settings
+from ..logger_config import logger
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+if PROMETHEUS_AVAILABLE:
+    password_hash_queue_depth = Gauge(
+        'backend_password_hash_queue_depth',
+        'Password hash operations waiting for a worker'
+    )
+    password_hash_in_progress = Gauge(
+        'backend_password_hash_in_progress',
+        'Password hash operations running on a worker'
+    )
+    password_hash_wait = Histogram(
+        'backend_password_hash_wait_seconds',
+        'Time a password hash operation waited for a worker',
+        ['operation'],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+    )
+    password_hash_rejections = Counter(
+        'backend_password_hash_rejections_total',
+        'Password hash operations rejected because the queue was full',
+        ['operation']
+    )
+
+class PasswordHasherBusyError(Exception):
+    """Raised when the password hashing queue is full."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__("Too many logins in progress, try again shortly")
+
+class PasswordHasher:
+    """Bounded thread pool for bcrypt hashing and verification."""
+
+    def __init__(
+        self,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        queue_size: int = settings.PASSWORD_HASH_QUEUE_SIZE
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            workers: Threads hashing at the same time
+            queue_size: Operations allowed to wait for a thread
+        """
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        # Operations admitted (queued or running) and running, updated from the
+        # event loop and the worker threads
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._average = 0.2  # seconds per operation
+
+    @property
+    def queued(self) -> int:
+        """Operations waiting for a worker."""
+        return self._admitted - self._running
+
+    async def hash(self, password: str) -> str:
+        """Hash a password for storing."""
+        return await self._run("hash", crud.get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password against its stored hash.
+
+        Returns:
+            Whether the password matches, and a new hash to store if the stored
+            one was made with other hashing parameters
+        """
+        return await self._run("verify", crud.verify_and_update_password, password, hashed_password)
+
+    async def _run(self, operation: str, function: Callable[..., Any], *args: Any) -> Any:
+        if self.queued >= self.queue_size:
+            if PROMETHEUS_AVAILABLE:
+                password_hash_rejections.labels(operation=operation).inc()
+            logger.warning(f"Password hash queue full ({self.queued} waiting), rejecting {operation}")
+            raise PasswordHasherBusyError(self._average * (self._admitted / self.workers + 1))
+
+        submitted = time.monotonic()
+
+        def timed() -> Any:
+            begin = time.monotonic()
+            with self._lock:
+                self._running += 1
+                self._report()
+            if PROMETHEUS_AVAILABLE:
+                password_hash_wait.labels(operation=operation).observe(begin - submitted)
+            try:
+                return function(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    # Moving average of the cost of one operation, for Retry-After
+                    self._average += (time.monotonic() - begin - self._average) * 0.1
+                    self._report()
+
+        with self._lock:
+            self._admitted += 1
+            self._report()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            with self._lock:
+                self._admitted -= 1
+                self._report()
+
+    def _report(self) -> None:
+        if PROMETHEUS_AVAILABLE:
+            password_hash_queue_depth.set(self.queued)
+            password_hash_in_progress.set(self._running)
+
+password_hasher = PasswordHasher()
+
+async def authenticate_user(
+    db: Session,
+    username: str,
+    password: str,
+    hasher: PasswordHasher = password_hasher
+) -> Optional[models.User]:
+    """
+    Authenticate a user by username and password on the hashing pool.
+
+    A password hash made with other parameters than the current ones
+    (BCRYPT_ROUNDS) is replaced by a new hash after a successful login.
+
+    Args:
+        db: Database session
+        username: Username
+        password: Password given by the user
+        hasher: Hashing pool
+
+    Returns:
+        The user, or None if the username or password is wrong
+
+    Raises:
+        PasswordHasherBusyError: If the hashing queue is full
+    """
+    user = crud.get_user_by_username(db, username)
+    if not user:
+        return None
+    valid, new_hash = await hasher.verify(password, user.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        crud.update_password_hash(db, user.id, new_hash)
+    return user
@@ -0,0 +1,274 @@
+"""
+Retry, circuit breaker and hedging policy for calls to the OCR and LLM services.
+
+A ResiliencePolicy wraps a coroutine that sends one request:
+
+    response = await policy.call(lambda: client.post(url, json=data))
+
+- 429, 502, 503 and 504 responses and transport errors are retried with
+  exponential backoff and full jitter. A Retry-After header takes the
+  place of the computed delay.
+- A circuit breaker counts consecutive 5xx responses and transport errors.
+  Once open it rejects calls with CircuitOpenError until reset_timeout has
+  passed, then lets a single trial call through.
+- With hedge_delay set, a second identical request is sent when the first
+  has not answered within hedge_delay seconds and the first good response
+  wins. Only use it for idempotent calls.
+"""
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from ..logger_config import logger
+
+try:
+    from prometheus_client import Counter, Gauge
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+# Responses worth another attempt
+RETRY_STATUSES = {429, 502, 503, 504}
+
+if PROMETHEUS_AVAILABLE:
+    service_call_retries = Counter(
+        'backend_service_call_retries_total',
+        'Retried calls to downstream services',
+        ['service', 'reason']
+    )
+    circuit_breaker_state = Gauge(
+        'backend_circuit_breaker_state',
+        'Circuit breaker state per downstream service (0 closed, 1 half-open, 2 open)',
+        ['service']
+    )
+    circuit_breaker_rejections = Counter(
+        'backend_circuit_breaker_rejections_total',
+        'Calls rejected while the circuit was open',
+        ['service']
+    )
+    service_call_hedges = Counter(
+        'backend_service_call_hedges_total',
+        'Hedged requests sent, and how many of them answered first',
+        ['service', 'outcome']
+    )
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the downstream circuit is open."""
+
+    def __init__(self, service: str, retry_after: float):
+        super().__init__(f"{service} service unavailable (circuit open, retry in {retry_after:.0f}s)")
+        self.service = service
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one downstream service."""
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, service: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            service: Service name used in errors and metrics
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+        """
+        self.service = service
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._set_state(self.CLOSED)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        if PROMETHEUS_AVAILABLE:
+            circuit_breaker_state.labels(service=self.service).set(self._STATE_VALUES[state])
+
+    def _reject(self) -> None:
+        if PROMETHEUS_AVAILABLE:
+            circuit_breaker_rejections.labels(service=self.service).inc()
+        retry_after = max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+        raise CircuitOpenError(self.service, retry_after)
+
+    def before_call(self) -> None:
+        """
+        Admit or reject a call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a trial call running.
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self._reject()
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                self._reject()
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        """Close the circuit after a healthy response."""
+        self.failures = 0
+        self._trial_in_flight = False
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit for {self.service} service closed")
+            self._set_state(self.CLOSED)
+
+    def release_trial(self) -> None:
+        """Let another trial through after one that ended without an answer (cancelled)."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold or after a failed trial."""
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit for {self.service} service opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class ResiliencePolicy:
+    """Retries, circuit breaking and optional hedging for one downstream service."""
+
+    def __init__(
+        self,
+        service: str,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        hedge_delay: Optional[float] = None
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            service: Service name used in logs and metrics
+            max_attempts: Attempts per call, including the first
+            base_delay: Backoff before the second attempt, doubled for each further one
+            max_delay: Upper bound of any wait, including Retry-After
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open
+            hedge_delay: Seconds before a hedged request is sent, None disables hedging
+        """
+        self.service = service
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_delay = hedge_delay
+        self.breaker = CircuitBreaker(service, failure_threshold, reset_timeout)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff after the given attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def call(self, send: Callable[[], Awaitable[httpx.Response]], hedge: bool = True) -> httpx.Response:
+        """
+        Send a request under the policy.
+
+        Args:
+            send: Coroutine factory sending the request once
+            hedge: Whether the call may be hedged; disable it for streamed responses
+
+        Returns:
+            The first response that is not retried, or the last response
+            once the attempts are used up
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+            httpx.RequestError: If the last attempt failed in transport.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            self.breaker.before_call()
+            try:
+                response = await (self._hedged(send) if self.hedge_delay and hedge else send())
+            except httpx.RequestError as e:
+                self.breaker.record_failure()
+                if attempt == self.max_attempts:
+                    raise
+                reason, delay = type(e).__name__, self.backoff(attempt)
+            except BaseException:
+                # Cancelled, or failed before the service answered: a half-open
+                # trial must not stay in flight forever
+                self.breaker.release_trial()
+                raise
+            else:
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_attempts:
+                    return response
+                reason = str(response.status_code)
+                delay = retry_after_seconds(response)
+                if delay is None:
+                    delay = self.backoff(attempt)
+                # Give the connection of a streamed response back to the pool
+                await response.aclose()
+            delay = min(delay, self.max_delay)
+            if PROMETHEUS_AVAILABLE:
+                service_call_retries.labels(service=self.service, reason=reason).inc()
+            logger.warning(
+                f"{self.service} service call attempt {attempt} failed ({reason}), retrying in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+    async def _hedged(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Send a request and a hedge after hedge_delay, returning the first good response."""
+        first = asyncio.ensure_future(send())
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_delay)
+        if done:
+            return first.result()
+
+        if PROMETHEUS_AVAILABLE:
+            service_call_hedges.labels(service=self.service, outcome="sent").inc()
+        hedge = asyncio.ensure_future(send())
+        pending = {first, hedge}
+        winner = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result().status_code not in RETRY_STATUSES:
+                        if task is hedge and PROMETHEUS_AVAILABLE:
+                            service_call_hedges.labels(service=self.service, outcome="won").inc()
+                        winner = task
+                        return task.result()
+            # Neither request succeeded: report the one that finished last
+            winner = task
+            return task.result()
+        finally:
+            for task in (first, hedge):
+                if task is winner:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled() and task.exception() is None:
+                    # The losing response still holds a connection of the pool
+                    await task.result().aclose()
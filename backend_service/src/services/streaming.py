@@ -0,0 +1,88 @@
+"""
+Streaming JSON serialization for large decks.
+
+Deck detail and flashcard listings can hold tens of thousands of cards.
+Instead of building the full list, response model and JSON string in
+memory, these generators write the JSON document incrementally from
+batches read with crud.iter_flashcard_batches.
+"""
+from typing import Any, Iterator, List, Union
+
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from db_module import crud, models, schemas
+from ..logger_config import logger
+
+# Rows fetched from the database per batch
+STREAM_BATCH_SIZE = 1000
+
+_flashcards_adapter = TypeAdapter(List[schemas.Flashcard])
+
+def iter_detached_batches(
+    bind: Union[Engine, Connection],
+    deck_id: str,
+    batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[List[Any]]:
+    """
+    Yield the flashcard row batches of a deck for a streamed response body.
+
+    The rows are read through a session of their own on the request session's
+    bind: the request session is closed once the endpoint returns, before the
+    response body is sent.
+    """
+    with Session(bind=bind) as session:
+        yield from crud.iter_flashcard_batches(session, deck_id, batch_size=batch_size)
+
+def _flashcard_array(bind: Union[Engine, Connection], deck_id: str, batch_size: int) -> Iterator[bytes]:
+    """Yield the flashcards of a deck as the chunks of a JSON array."""
+    yield b"["
+    first = True
+    for batch in iter_detached_batches(bind, deck_id, batch_size):
+        flashcards = _flashcards_adapter.validate_python(batch, from_attributes=True)
+        # Drop the enclosing brackets so batches join into one array
+        chunk = _flashcards_adapter.dump_json(flashcards)[1:-1]
+        yield chunk if first else b"," + chunk
+        first = False
+    yield b"]"
+
+def stream_flashcards(db: Session, deck_id: str, batch_size: int = STREAM_BATCH_SIZE) -> StreamingResponse:
+    """
+    Stream the flashcards of a deck as a JSON array.
+
+    Args:
+        db: Database session
+        deck_id: Deck ID
+        batch_size: Rows fetched per batch
+
+    Returns:
+        Streaming response with the same body as List[schemas.Flashcard]
+    """
+    logger.debug(f"Streaming flashcards for deck: {deck_id}")
+    return StreamingResponse(_flashcard_array(db.get_bind(), deck_id, batch_size), media_type="application/json")
+
+def stream_deck(db: Session, deck: models.Deck, batch_size: int = STREAM_BATCH_SIZE) -> StreamingResponse:
+    """
+    Stream a deck and its flashcards as a JSON object.
+
+    Args:
+        db: Database session
+        deck: Deck to serialize
+        batch_size: Rows fetched per batch
+
+    Returns:
+        Streaming response with the same body as schemas.DeckWithFlashcards
+    """
+    logger.debug(f"Streaming deck: {deck.id}")
+    # Serialize the deck fields now, while the request session is still open
+    head = schemas.Deck.model_validate(deck).model_dump_json().encode()[:-1] + b',"flashcards":'
+    bind, deck_id = db.get_bind(), deck.id
+
+    def body() -> Iterator[bytes]:
+        yield head
+        yield from _flashcard_array(bind, deck_id, batch_size)
+        yield b"}"
+
+    return StreamingResponse(body(), media_type="application/json")
@@ -0,0 +1,134 @@
+"""
+Streaming storage of uploaded documents.
+
+An upload is copied to disk one chunk at a time. The file type is checked
+from the magic bytes of the first chunk, the size is enforced as chunks
+arrive and the SHA-256 digest is computed on the way, so memory use per
+upload is bounded by the chunk size.
+
+Stored files are then linked under their digest, so identical uploads share
+one file on disk.
+"""
+import hashlib
+import os
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Optional, Tuple
+
+import aiofiles
+from fastapi import UploadFile
+
+from ..logger_config import logger
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Leading bytes, MIME type and matching extensions of each accepted file type
+FILE_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg", ("jpg", "jpeg")),
+    (b"\x89PNG\r\n\x1a\n", "image/png", ("png",)),
+    (b"%PDF-", "application/pdf", ("pdf",)),
+]
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the maximum size."""
+
+class UnsupportedFileTypeError(ValueError):
+    """Raised when the content of an upload does not match an accepted file type."""
+
+@dataclass
+class StoredUpload:
+    """A file written to disk from an upload."""
+    path: Path
+    size: int
+    sha256: str
+    mime_type: str
+
+def detect_file_type(head: bytes) -> Optional[Tuple[str, Tuple[str, ...]]]:
+    """
+    Identify a file from its first bytes.
+
+    Returns:
+        MIME type and matching extensions, or None for unknown content
+    """
+    for signature, mime_type, extensions in FILE_SIGNATURES:
+        if head.startswith(signature):
+            return mime_type, extensions
+    return None
+
+async def save_upload(
+    file: UploadFile,
+    path: Path,
+    extension: str,
+    max_size: int,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> StoredUpload:
+    """
+    Stream an upload to path.
+
+    The partially written file is removed if the upload is rejected.
+
+    Args:
+        file: Uploaded file
+        path: Destination path
+        extension: Extension of the uploaded filename, without the dot
+        max_size: Maximum size in bytes
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        The stored file with its size, digest and detected MIME type
+
+    Raises:
+        UnsupportedFileTypeError: If the content does not match the extension.
+        UploadTooLargeError: If the upload is larger than max_size.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    mime_type = None
+    try:
+        async with aiofiles.open(path, "wb") as out:
+            while chunk := await file.read(chunk_size):
+                if mime_type is None:
+                    detected = detect_file_type(chunk)
+                    if detected is None or extension not in detected[1]:
+                        raise UnsupportedFileTypeError(f"File content is not a valid {extension} file")
+                    mime_type = detected[0]
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLargeError(f"Upload exceeds the maximum size of {max_size} bytes")
+                digest.update(chunk)
+                await out.write(chunk)
+        if mime_type is None:
+            raise UnsupportedFileTypeError("File is empty")
+    except BaseException:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    logger.info(f"Stored upload {path.name}: {size} bytes, sha256 {digest.hexdigest()}")
+    return StoredUpload(path=path, size=size, sha256=digest.hexdigest(), mime_type=mime_type)
+
+def store_by_content(stored: StoredUpload, upload_dir: Path, extension: str) -> StoredUpload:
+    """
+    Link a stored upload to its content-addressed path, <sha256>.<extension>.
+
+    An identical file already at that path is kept. The upload keeps its own
+    file, so that calling this again once the document is saved re-creates
+    the shared file if the last other document using it was deleted in the
+    meantime; remove the upload's file afterwards.
+
+    Args:
+        stored: Upload written by save_upload
+        upload_dir: Directory of the content-addressed files
+        extension: File extension, without the dot
+
+    Returns:
+        The upload at its content-addressed path
+    """
+    path = upload_dir / f"{stored.sha256}.{extension}"
+    try:
+        os.link(stored.path, path)
+    except FileExistsError:
+        pass
+    return replace(stored, path=path)
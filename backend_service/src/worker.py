@@ -0,0 +1,192 @@
+"""
+Document processing worker pool.
+
+Workers claim jobs from the processing_jobs table under a lease, keep the
+lease alive while a job runs and record the outcome. A job whose worker
+dies is claimed again once its lease expires, so queued work survives
+restarts of both the API and the workers.
+
+Run as a separate process (the document-worker service in docker-compose):
+    python -m src.worker
+or embedded in the API process with JOB_WORKER_EMBEDDED=true.
+"""
+import asyncio
+import os
+import signal
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from db_module import crud, models
+from db_module.database import SessionLocal, init_db
+from .config import settings
+from .logger_config import logger
+from .services.document_processing import process_document
+from .services.events import event_bus
+from .services.http_client import close_http_client
+from .services.ocr_service import OCRServiceClient
+from .services.llm_service import LLMServiceClient
+from .services.resilience import CircuitOpenError
+
+class DocumentWorkerPool:
+    """A fixed number of asyncio workers processing queued documents."""
+
+    def __init__(
+        self,
+        concurrency: int = settings.JOB_WORKER_CONCURRENCY,
+        session_factory: Callable[[], Session] = SessionLocal,
+        ocr_client: Optional[OCRServiceClient] = None,
+        llm_client: Optional[LLMServiceClient] = None,
+        lease_seconds: float = settings.JOB_LEASE_SECONDS,
+        retry_delay: float = settings.JOB_RETRY_DELAY,
+        poll_interval: float = settings.JOB_POLL_INTERVAL,
+        name: Optional[str] = None
+    ):
+        """
+        Initialize the worker pool.
+
+        Args:
+            concurrency: Number of jobs processed at the same time
+            session_factory: Creates the database session of each job
+            ocr_client: OCR service client
+            llm_client: LLM service client
+            lease_seconds: Lease length, renewed every third of it while a job runs
+            retry_delay: Delay before the first retry of a failed job
+            poll_interval: Seconds an idle worker waits before polling again
+            name: Prefix of the lease owner IDs, defaults to host and process
+        """
+        self.concurrency = concurrency
+        self.session_factory = session_factory
+        self.ocr_client = ocr_client or OCRServiceClient()
+        self.llm_client = llm_client or LLMServiceClient()
+        self.lease_seconds = lease_seconds
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._stopping = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._next_reap = 0.0
+
+    def start(self) -> None:
+        """Start the workers on the running event loop."""
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.create_task(self._work(f"{self.name}-{index}"))
+            for index in range(self.concurrency)
+        ]
+        logger.info(f"Started {self.concurrency} document workers: {self.name}")
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the workers after their current job.
+
+        Jobs still running after timeout seconds are cancelled; their
+        leases expire and another worker picks them up again.
+        """
+        self._stopping.set()
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        logger.info(f"Stopped document workers: {self.name}")
+
+    async def run_once(self, worker_id: str) -> bool:
+        """
+        Claim and run one job.
+
+        Returns:
+            True if a job was run, False if the queue had no runnable job
+        """
+        with self.session_factory() as db:
+            if time.monotonic() >= self._next_reap:
+                self._next_reap = time.monotonic() + self.lease_seconds
+                crud.fail_expired_processing_jobs(db)
+
+            job = crud.claim_processing_job(db, worker_id, self.lease_seconds)
+            if not job:
+                return False
+
+            job_id, document_id = job.id, job.document_id
+            heartbeat = asyncio.create_task(self._heartbeat(job_id, worker_id))
+            try:
+                await process_document(db, job, self.ocr_client, self.llm_client)
+            except CircuitOpenError as e:
+                # The downstream is known to be down: wait for the circuit
+                # instead of spending one of the job's attempts
+                db.rollback()
+                delay = max(e.retry_after, self.poll_interval)
+                if crud.release_processing_job(db, job_id, worker_id, delay, str(e)):
+                    retry_at = datetime.now() + timedelta(seconds=delay)
+                    await event_bus.publish(document_id, "retry", retry_at=retry_at.isoformat(), error=str(e))
+            except Exception as e:
+                logger.exception(f"Error processing job {job_id}: {str(e)}")
+                db.rollback()
+                failed = crud.fail_processing_job(db, job_id, worker_id, str(e), self.retry_delay)
+                await self._publish_failure(document_id, failed)
+            else:
+                crud.complete_processing_job(db, job_id, worker_id)
+            finally:
+                heartbeat.cancel()
+            return True
+
+    async def _publish_failure(self, document_id: str, job: Optional[models.ProcessingJob]) -> None:
+        """Publish a failed attempt: a retry while the job has attempts left, else the error."""
+        if job is None:
+            return
+        if job.status == models.JobStatus.FAILED.value:
+            await event_bus.publish(
+                document_id, "status", status=models.DocumentStatus.ERROR.value, error=job.last_error
+            )
+        else:
+            await event_bus.publish(
+                document_id, "retry",
+                attempt=job.attempts, max_attempts=job.max_attempts,
+                retry_at=job.run_after.isoformat(), error=job.last_error
+            )
+
+    async def _heartbeat(self, job_id: str, worker_id: str) -> None:
+        """Renew the lease of a running job until cancelled."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            with self.session_factory() as db:
+                if not crud.extend_job_lease(db, job_id, worker_id, self.lease_seconds):
+                    logger.warning(f"Worker {worker_id} lost the lease of job {job_id}")
+                    return
+
+    async def _work(self, worker_id: str) -> None:
+        """Process jobs until the pool is stopped, polling while the queue is empty."""
+        while not self._stopping.is_set():
+            try:
+                ran = await self.run_once(worker_id)
+            except Exception as e:
+                logger.exception(f"Worker {worker_id} error: {str(e)}")
+                ran = False
+            if not ran:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+async def run_workers() -> None:
+    """Run a worker pool until SIGINT or SIGTERM."""
+    init_db()
+    pool = DocumentWorkerPool()
+    pool.start()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+    await pool.stop(timeout=settings.JOB_LEASE_SECONDS)
+    await close_http_client()
+    await event_bus.stop()
+
+if __name__ == "__main__":
+    asyncio.run(run_workers())
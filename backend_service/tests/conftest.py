@@ -11,7 +11,7 @@ This module implements best practices for testing FastAPI applications with SQLA
 import pytest
 import os
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from datetime import datetime, timedelta
@@ -42,6 +42,7 @@ def mock_limiter():
         yield mock_limiter
 
 from backend_service.src.main import app
+from backend_service.src.auth.user_cache import user_cache
 from db_module.database import get_db
 # Import the centralized Base that includes all models
 from db_module.base import Base
@@ -59,6 +60,16 @@ engine = create_engine(
     # echo=True
 )
 
+# Let SQLAlchemy emit BEGIN itself: pysqlite's own transaction handling
+# does not nest the savepoints test sessions use
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+@event.listens_for(engine, "begin")
+def _begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
 # Create a sessionmaker for test sessions
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -90,8 +101,9 @@ def db_session(prepare_database):
     connection = engine.connect()
     # Begin a transaction
     transaction = connection.begin()
-    # Create a session bound to this connection
-    session = TestingSessionLocal(bind=connection)
+    # Create a session bound to this connection; its commits and rollbacks
+    # use a savepoint, so code rolling back on failure keeps the test's data
+    session = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
 
     yield session
 
@@ -123,6 +135,19 @@ def client(db_session):
     # Clear the override after the test
     app.dependency_overrides.clear()
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """Start every test with an empty authenticated user cache."""
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Start every test with fresh rate limit counters, so logins across the suite don't add up."""
+    app.state.limiter.reset()
+    yield
+
 @pytest.fixture
 def test_user(db_session):
     """Create a test user."""
@@ -0,0 +1,243 @@
+"""
+Tests for deck export, import and cloning.
+"""
+import csv
+import io
+import json
+import sqlite3
+import zipfile
+import pytest
+from db_module import crud, schemas
+from backend_service.src.config import settings
+from backend_service.src.services import deck_transfer
+
+# Mark all tests in this file as integration tests
+pytestmark = [pytest.mark.integration]
+
+def auth_headers(client, user):
+    """Log in as user and return an Authorization header."""
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": user.username, "password": "Password123"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@pytest.fixture
+def big_deck(db_session, test_user):
+    """Create a deck with enough cards to span several export batches."""
+    deck = crud.create_deck(db_session, schemas.DeckCreate(title="Export me"), test_user.id)
+    crud.create_flashcards_bulk(db_session, [
+        schemas.FlashcardCreate(question=f"Q{i}, \"quoted\"", answer=f"A{i}\nline <b>2</b>", deck_id=deck.id)
+        for i in range(2500)
+    ])
+    return deck
+
+def test_export_csv(client, test_user, big_deck):
+    """Test exporting a deck as CSV."""
+    response = client.get(
+        f"/api/v1/decks/{big_deck.id}/export", headers=auth_headers(client, test_user), params={"format": "csv"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="Export_me.csv"' in response.headers["content-disposition"]
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["question", "answer"]
+    assert len(rows) == 2501
+    assert ["Q0, \"quoted\"", "A0\nline <b>2</b>"] in rows
+
+def test_export_jsonl(client, test_user, big_deck):
+    """Test exporting a deck as JSON Lines."""
+    response = client.get(
+        f"/api/v1/decks/{big_deck.id}/export", headers=auth_headers(client, test_user), params={"format": "jsonl"}
+    )
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert len(lines) == 2500
+    cards = [json.loads(line) for line in lines]
+    assert {"question": "Q2499, \"quoted\"", "answer": "A2499\nline <b>2</b>"} in cards
+
+@pytest.mark.parametrize("export_format", ["csv", "jsonl", "apkg"])
+def test_export_import_round_trip(client, test_user, big_deck, export_format):
+    """Test that an exported deck imports back with the same cards."""
+    if export_format == "apkg" and not deck_transfer.APKG_SUPPORT:
+        pytest.skip("genanki not installed")
+    headers = auth_headers(client, test_user)
+    exported = client.get(f"/api/v1/decks/{big_deck.id}/export", headers=headers, params={"format": export_format})
+    assert exported.status_code == 200
+
+    response = client.post(
+        "/api/v1/decks/import",
+        headers=headers,
+        files={"file": (f"copy.{export_format}", exported.content)},
+        data={"title": "Copy"}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["title"] == "Copy"
+    assert result["imported_count"] == 2500
+
+    original = client.get(f"/api/v1/decks/{big_deck.id}", headers=headers).json()["flashcards"]
+    copy = client.get(f"/api/v1/decks/{result['id']}", headers=headers).json()["flashcards"]
+    assert sorted((c["question"], c["answer"]) for c in copy) == sorted((c["question"], c["answer"]) for c in original)
+
+def test_import_csv_in_batches(client, db_session, test_user, monkeypatch):
+    """Test that imports go through the bulk insert path in batches."""
+    calls = []
+    original = crud.create_flashcards_bulk
+
+    def counting_bulk(db, flashcards, **kwargs):
+        calls.append(len(flashcards))
+        return original(db, flashcards, **kwargs)
+
+    monkeypatch.setattr(crud, "create_flashcards_bulk", counting_bulk)
+    monkeypatch.setattr(settings, "DECK_IMPORT_BATCH_SIZE", 100)
+    body = "answer,question\n" + "".join(f"a{i},q{i}\n" for i in range(250))
+
+    response = client.post(
+        "/api/v1/decks/import",
+        headers=auth_headers(client, test_user),
+        files={"file": ("cards.csv", body.encode())}
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "cards"
+    assert calls == [100, 100, 50]
+    cards = crud.get_flashcards_by_deck(db_session, response.json()["id"], limit=None)
+    assert ("q0", "a0") in [(card.question, card.answer) for card in cards]
+
+def test_import_invalid_file_removes_deck(client, db_session, test_user):
+    """Test that a malformed file is rejected without leaving a partial deck."""
+    body = '{"question": "q1", "answer": "a1"}\nnot json\n'
+    response = client.post(
+        "/api/v1/decks/import",
+        headers=auth_headers(client, test_user),
+        files={"file": ("cards.jsonl", body.encode())},
+        data={"title": "Broken"}
+    )
+    assert response.status_code == 400
+    assert "Line 2" in response.json()["detail"]
+    assert [d.title for d in crud.get_decks_by_owner(db_session, test_user.id)] == []
+
+def test_import_is_rolled_back_on_failure(client, db_session, test_user, monkeypatch):
+    """Test that a failure after some batches leaves neither the deck nor its first cards."""
+    original = crud.create_flashcards_bulk
+    calls = []
+
+    def failing_bulk(db, flashcards, **kwargs):
+        calls.append(len(flashcards))
+        if len(calls) == 2:
+            raise RuntimeError("database went away")
+        return original(db, flashcards, **kwargs)
+
+    monkeypatch.setattr(crud, "create_flashcards_bulk", failing_bulk)
+    monkeypatch.setattr(settings, "DECK_IMPORT_BATCH_SIZE", 100)
+    body = "question,answer\n" + "".join(f"q{i},a{i}\n" for i in range(250))
+
+    with pytest.raises(RuntimeError):
+        client.post(
+            "/api/v1/decks/import",
+            headers=auth_headers(client, test_user),
+            files={"file": ("cards.csv", body.encode())}
+        )
+    assert calls == [100, 100]
+    db_session.expire_all()
+    assert crud.get_decks_by_owner(db_session, test_user.id) == []
+
+def test_import_size_limit(client, db_session, test_user, monkeypatch):
+    """Test that an import over MAX_UPLOAD_SIZE is rejected."""
+    body = b"question,answer\n" + b"q,a\n" * 100
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", len(body) - 1)
+    response = client.post(
+        "/api/v1/decks/import",
+        headers=auth_headers(client, test_user),
+        files={"file": ("cards.csv", body)}
+    )
+    assert response.status_code == 413
+    assert crud.get_decks_by_owner(db_session, test_user.id) == []
+
+def make_apkg(tmp_path, cards, extra=None):
+    """Build an Anki package whose collection.anki2 holds cards, plus any extra members."""
+    path = tmp_path / "collection.anki2"
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, flds TEXT)")
+    connection.executemany(
+        "INSERT INTO notes (flds) VALUES (?)", [(f"{question}\x1f{answer}",) for question, answer in cards]
+    )
+    connection.commit()
+    connection.close()
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+        package.write(path, "collection.anki2")
+        for name, data in (extra or {}).items():
+            package.writestr(name, data)
+    return buffer.getvalue()
+
+def test_import_apkg(client, db_session, test_user, tmp_path):
+    """Test importing the notes of a legacy Anki package."""
+    response = client.post(
+        "/api/v1/decks/import",
+        headers=auth_headers(client, test_user),
+        files={"file": ("cards.apkg", make_apkg(tmp_path, [("q1", "a1"), ("q2", "a2")]))}
+    )
+    assert response.status_code == 200
+    cards = crud.get_flashcards_by_deck(db_session, response.json()["id"], limit=None)
+    assert sorted((card.question, card.answer) for card in cards) == [("q1", "a1"), ("q2", "a2")]
+
+def test_import_apkg_anki21b_rejected(client, db_session, test_user, tmp_path):
+    """Test that a current Anki export is rejected instead of importing its placeholder collection."""
+    body = make_apkg(
+        tmp_path, [("Please update to the latest Anki version", "")], {"collection.anki21b": b"\x28\xb5\x2f\xfd"}
+    )
+    response = client.post(
+        "/api/v1/decks/import",
+        headers=auth_headers(client, test_user),
+        files={"file": ("cards.apkg", body)}
+    )
+    assert response.status_code == 400
+    assert "anki21b" in response.json()["detail"]
+    assert crud.get_decks_by_owner(db_session, test_user.id) == []
+
+def test_import_apkg_unpacked_size_limit(client, db_session, test_user, tmp_path, monkeypatch):
+    """Test that a package unpacking past DECK_IMPORT_MAX_UNPACKED_SIZE is rejected before extraction."""
+    body = make_apkg(tmp_path, [("q", "a")], {"media/0": b"\0" * 1_000_000})
+    assert len(body) < 100_000
+    monkeypatch.setattr(settings, "DECK_IMPORT_MAX_UNPACKED_SIZE", 500_000)
+    response = client.post(
+        "/api/v1/decks/import",
+        headers=auth_headers(client, test_user),
+        files={"file": ("cards.apkg", body)}
+    )
+    assert response.status_code == 400
+    assert "too large" in response.json()["detail"]
+    assert crud.get_decks_by_owner(db_session, test_user.id) == []
+
+def test_import_unknown_format(client, test_user):
+    """Test that unknown formats are rejected."""
+    response = client.post(
+        "/api/v1/decks/import",
+        headers=auth_headers(client, test_user),
+        files={"file": ("cards.xlsx", b"data")}
+    )
+    assert response.status_code == 400
+
+def test_clone_public_deck(client, db_session, test_user, big_deck):
+    """Test cloning a public deck into a private copy for another user."""
+    other = crud.create_user(db_session, schemas.UserCreate(
+        email="cloner@example.com", username="cloner", password="Password123"
+    ))
+    headers = auth_headers(client, other)
+
+    # Private decks of other users cannot be cloned
+    response = client.post(f"/api/v1/decks/{big_deck.id}/clone", headers=headers)
+    assert response.status_code == 403
+
+    crud.update_deck(db_session, big_deck.id, schemas.DeckUpdate(is_public=True))
+    response = client.post(f"/api/v1/decks/{big_deck.id}/clone", headers=headers, params={"title": "Mine"})
+    assert response.status_code == 200
+    clone = response.json()
+    assert clone["title"] == "Mine"
+    assert clone["owner_id"] == other.id
+    assert clone["is_public"] is False
+    assert len(crud.get_flashcards_by_deck(db_session, clone["id"], limit=None)) == 2500
+
+    response = client.post("/api/v1/decks/missing/clone", headers=headers)
+    assert response.status_code == 404
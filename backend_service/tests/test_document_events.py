@@ -0,0 +1,103 @@
+"""
+Tests for the document event bus and the event stream endpoint.
+"""
+import json
+
+import pytest
+
+from db_module import crud, models, schemas
+from backend_service.src.auth.jwt import create_access_token
+from backend_service.src.services.events import DocumentEventBus, document_event_stream
+
+def auth_headers(user):
+    """Authorization header with an access token for user (no login, which is rate limited)."""
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.id})}"}
+
+def create_document(db, user, status=models.DocumentStatus.UPLOADED):
+    """Create a document of user with the given status."""
+    document = crud.create_document_with_job(
+        db, schemas.DocumentCreate(filename="notes.png", mime_type="image/png"), user.id, "/uploads/notes.png"
+    )
+    document.status = status.value
+    db.commit()
+    return document
+
+def parse(chunk):
+    """Event of a server-sent event chunk, or None for a keep-alive comment."""
+    if chunk.startswith(b":"):
+        return None
+    name, data = chunk.decode().strip().split("\n")
+    event = json.loads(data[len("data: "):])
+    assert name == f"event: {event['type']}"
+    return event
+
+@pytest.mark.asyncio
+async def test_bus_delivers_to_subscribers():
+    """Test delivery per document, dropping the oldest events of a slow subscriber."""
+    bus = DocumentEventBus(queue_size=2)
+    with bus.subscribe("doc-1") as queue, bus.subscribe("doc-2") as other:
+        for pages_done in range(1, 4):
+            await bus.publish("doc-1", "progress", pages_done=pages_done, page_count=3)
+        assert [queue.get_nowait()["pages_done"] for _ in range(queue.qsize())] == [2, 3]
+        assert other.empty()
+    await bus.publish("doc-1", "progress", pages_done=3, page_count=3)
+    assert bus._subscribers == {}
+
+def test_bus_relays_events_of_other_processes():
+    """Test that channel messages are delivered unless this process sent them."""
+    bus = DocumentEventBus()
+    event = {"type": "status", "document_id": "doc-1", "status": "ocr_complete"}
+    with bus.subscribe("doc-1") as queue:
+        bus.receive(json.dumps({"origin": bus.origin, "event": event}))
+        assert queue.empty()
+        bus.receive(json.dumps({"origin": "worker", "event": event}))
+        bus.receive("not json")
+        assert queue.get_nowait() == event
+        assert queue.empty()
+
+@pytest.mark.asyncio
+async def test_stream_sends_status_then_events(db_session, test_user):
+    """Test that the stream starts with the current status and ends with the last stage."""
+    document = create_document(db_session, test_user, models.DocumentStatus.OCR_PROCESSING)
+    bus = DocumentEventBus()
+    stream = document_event_stream(db_session.get_bind(), document.id, bus=bus, heartbeat=5)
+
+    assert parse(await anext(stream))["status"] == "ocr_processing"
+    await bus.publish(document.id, "progress", pages_done=1, page_count=1)
+    await bus.publish(document.id, "status", status="flashcard_complete", deck_id="deck-1")
+    events = [parse(chunk) async for chunk in stream]
+    assert [event["type"] for event in events] == ["progress", "status"]
+    assert events[1]["deck_id"] == "deck-1"
+    assert bus._subscribers == {}
+
+@pytest.mark.asyncio
+async def test_stream_rereads_status_on_heartbeat(db_session, test_user):
+    """Test that a transition without an event is picked up at the next heartbeat."""
+    document = create_document(db_session, test_user, models.DocumentStatus.OCR_PROCESSING)
+    stream = document_event_stream(db_session.get_bind(), document.id, bus=DocumentEventBus(), heartbeat=0.01)
+
+    assert parse(await anext(stream))["status"] == "ocr_processing"
+    assert parse(await anext(stream)) is None
+    document.status = models.DocumentStatus.ERROR.value
+    document.error_message = "Lease expired"
+    db_session.commit()
+    events = [parse(chunk) async for chunk in stream]
+    assert [event for event in events if event] == [
+        {"type": "status", "document_id": document.id, "status": "error", "error": "Lease expired"}
+    ]
+
+def test_events_endpoint(client, db_session, test_user):
+    """Test the event stream of a finished document and the owner check."""
+    document = create_document(db_session, test_user, models.DocumentStatus.FLASHCARD_COMPLETE)
+    response = client.get(f"/api/v1/documents/{document.id}/events", headers=auth_headers(test_user))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert parse(response.content) == {
+        "type": "status", "document_id": document.id, "status": "flashcard_complete", "deck_id": None
+    }
+
+    other = crud.create_user(db_session, schemas.UserCreate(
+        email="other@example.com", username="other", password="Password123"
+    ))
+    response = client.get(f"/api/v1/documents/{document.id}/events", headers=auth_headers(other))
+    assert response.status_code == 403
@@ -0,0 +1,285 @@
+"""
+Tests for the document processing queue and worker pool.
+"""
+import asyncio
+import io
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from db_module import crud, models, schemas
+from db_module.base import Base
+from db_module.database import create_db_engine
+from backend_service.src.auth.jwt import create_access_token
+from backend_service.src.config import settings
+from backend_service.src.services.document_processing import _stored_pages
+from backend_service.src.services.events import event_bus
+from backend_service.src.services.resilience import CircuitOpenError
+from backend_service.src.worker import DocumentWorkerPool
+
+# Mark all tests in this file as integration tests
+pytestmark = [pytest.mark.integration]
+
+def auth_headers(user):
+    """Authorization header with an access token for user (no login, which is rate limited)."""
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.id})}"}
+
+@pytest.fixture
+def worker_sessions(tmp_path):
+    """Sessionmaker on a file database, so every worker session sees committed jobs."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+def queue_documents(session_factory, count, max_attempts=3):
+    """Create a user with count uploaded documents and return the document IDs."""
+    with session_factory() as db:
+        user = crud.create_user(db, schemas.UserCreate(
+            email="worker@example.com", username="worker", password="Password123"
+        ))
+        return [
+            crud.create_document_with_job(
+                db, schemas.DocumentCreate(filename=f"page{i}.png", mime_type="image/png"),
+                user.id, f"/uploads/page{i}.png", max_attempts=max_attempts
+            ).id
+            for i in range(count)
+        ]
+
+def ocr_pages(*texts, delay=0.0):
+    """Stand-in for OCRServiceClient.stream_pages yielding the given pages."""
+    async def stream_pages(file_path):
+        for number, text in enumerate(texts, start=1):
+            await asyncio.sleep(delay)
+            yield {"page": number, "page_count": len(texts), "text": text}
+    return stream_pages
+
+def fake_clients():
+    """OCR and LLM clients returning canned results."""
+    ocr_client = MagicMock()
+    ocr_client.stream_pages.side_effect = ocr_pages("Mitochondria produce ATP.")
+    llm_client = AsyncMock()
+    llm_client.generate_flashcards.return_value = {"flashcards": [
+        {"question": "What produces ATP?", "answer": "Mitochondria"},
+        {"question": "What do mitochondria produce?", "answer": "ATP"},
+    ]}
+    return ocr_client, llm_client
+
+def test_upload_queues_processing_job(client, db_session, test_user, tmp_path, monkeypatch):
+    """Test that an upload is stored with a queued job instead of processed in the request."""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", tmp_path)
+    response = client.post(
+        "/api/v1/documents/",
+        headers=auth_headers(test_user),
+        files={"file": ("notes.png", io.BytesIO(b"\x89PNG\r\n\x1a\n"), "image/png")}
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == models.DocumentStatus.UPLOADED.value
+
+    document = crud.get_document(db_session, response.json()["id"])
+    assert [job.status for job in document.processing_jobs] == [models.JobStatus.QUEUED.value]
+    assert document.processing_jobs[0].max_attempts == settings.JOB_MAX_ATTEMPTS
+
+@pytest.mark.asyncio
+async def test_worker_processes_document(worker_sessions):
+    """Test that a worker runs every stage and completes the job."""
+    [document_id] = queue_documents(worker_sessions, 1)
+    ocr_client, llm_client = fake_clients()
+    pool = DocumentWorkerPool(
+        concurrency=1, session_factory=worker_sessions, ocr_client=ocr_client, llm_client=llm_client
+    )
+
+    assert await pool.run_once("worker-0")
+    assert not await pool.run_once("worker-0")
+
+    with worker_sessions() as db:
+        document = crud.get_document(db, document_id)
+        assert document.status == models.DocumentStatus.FLASHCARD_COMPLETE.value
+        job = document.processing_jobs[0]
+        assert job.status == models.JobStatus.SUCCEEDED.value
+        assert job.stage == models.DocumentStatus.FLASHCARD_COMPLETE.value
+        deck = crud.get_deck_by_document(db, document_id)
+        assert len(crud.get_flashcards_by_deck(db, deck.id)) == 2
+    llm_client.generate_flashcards.assert_awaited_once_with("Mitochondria produce ATP.", num_cards=10)
+
+@pytest.mark.asyncio
+async def test_worker_publishes_events(worker_sessions):
+    """Test that stage transitions and progress are published for the document."""
+    [document_id] = queue_documents(worker_sessions, 1)
+    ocr_client, llm_client = fake_clients()
+    ocr_client.stream_pages.side_effect = ocr_pages("Mitochondria produce ATP.", "Ribosomes make proteins.")
+    pool = DocumentWorkerPool(
+        concurrency=1, session_factory=worker_sessions, ocr_client=ocr_client, llm_client=llm_client
+    )
+
+    with event_bus.subscribe(document_id) as queue:
+        assert await pool.run_once("worker-0")
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+
+    with worker_sessions() as db:
+        deck_id = crud.get_deck_by_document(db, document_id).id
+    assert [{k: v for k, v in event.items() if k != "document_id"} for event in events] == [
+        {"type": "status", "status": "ocr_processing"},
+        {"type": "progress", "pages_done": 1, "page_count": 2},
+        {"type": "progress", "pages_done": 2, "page_count": 2},
+        {"type": "status", "status": "ocr_complete"},
+        {"type": "status", "status": "flashcard_generating"},
+        {"type": "progress", "cards_generated": 2, "cards_requested": 10},
+        {"type": "status", "status": "flashcard_complete", "deck_id": deck_id},
+    ]
+
+@pytest.mark.asyncio
+async def test_retry_resumes_after_last_stage(worker_sessions):
+    """Test that a retried job reuses the stored OCR text, split into its pages."""
+    [document_id] = queue_documents(worker_sessions, 1)
+    ocr_client, llm_client = fake_clients()
+    ocr_client.stream_pages.side_effect = ocr_pages(
+        "Mitochondria produce ATP.\n\nThey have their own DNA.", "Ribosomes make proteins."
+    )
+    cards = llm_client.generate_flashcards.return_value
+    llm_client.generate_flashcards.side_effect = [Exception("LLM service error: 503"), cards]
+    pool = DocumentWorkerPool(
+        concurrency=1, session_factory=worker_sessions, ocr_client=ocr_client,
+        llm_client=llm_client, retry_delay=60
+    )
+
+    with event_bus.subscribe(document_id) as queue:
+        assert await pool.run_once("worker-0")
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+    assert events[-1]["type"] == "retry"
+    assert (events[-1]["attempt"], events[-1]["max_attempts"]) == (1, 3)
+    with worker_sessions() as db:
+        document = crud.get_document(db, document_id)
+        job = document.processing_jobs[0]
+        assert job.status == models.JobStatus.QUEUED.value
+        assert job.last_error == "LLM service error: 503"
+        # The failure is retried, so the document is not marked as failed
+        assert document.status == models.DocumentStatus.FLASHCARD_GENERATING.value
+        content = crud.get_extracted_text_by_document(db, document_id).content
+        job.run_after = datetime.now() - timedelta(seconds=1)
+        db.commit()
+
+    assert await pool.run_once("worker-0")
+    with worker_sessions() as db:
+        document = crud.get_document(db, document_id)
+        assert document.status == models.DocumentStatus.FLASHCARD_COMPLETE.value
+        assert document.processing_jobs[0].attempts == 2
+    ocr_client.stream_pages.assert_called_once()
+    # Paragraph breaks within a page are not taken for page breaks
+    assert [page async for page in _stored_pages(content)] == [
+        ("Mitochondria produce ATP.\n\nThey have their own DNA.", 2), ("Ribosomes make proteins.", 2)
+    ]
+
+@pytest.mark.asyncio
+async def test_pool_drains_burst_within_concurrency(worker_sessions):
+    """Test that a burst of uploads is processed with at most `concurrency` jobs at once."""
+    document_ids = queue_documents(worker_sessions, 40)
+    ocr_client, llm_client = fake_clients()
+    running, peak = 0, 0
+
+    async def slow_ocr(file_path):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        yield {"page": 1, "page_count": 1, "text": f"Text of {file_path.name}"}
+
+    ocr_client.stream_pages.side_effect = slow_ocr
+    pool = DocumentWorkerPool(
+        concurrency=4, session_factory=worker_sessions, ocr_client=ocr_client,
+        llm_client=llm_client, poll_interval=0.01
+    )
+    pool.start()
+    try:
+        for _ in range(500):
+            with worker_sessions() as db:
+                if crud.count_processing_jobs(db)[models.JobStatus.SUCCEEDED.value] == len(document_ids):
+                    break
+            await asyncio.sleep(0.02)
+    finally:
+        await pool.stop(timeout=5)
+
+    with worker_sessions() as db:
+        assert crud.count_processing_jobs(db)[models.JobStatus.SUCCEEDED.value] == len(document_ids)
+    assert ocr_client.stream_pages.call_count == len(document_ids)
+    assert 1 < peak <= 4
+
+@pytest.mark.asyncio
+async def test_open_circuit_requeues_without_using_an_attempt(worker_sessions):
+    """Test that a job blocked by an open circuit keeps its attempts."""
+    [document_id] = queue_documents(worker_sessions, 1, max_attempts=1)
+    ocr_client, llm_client = fake_clients()
+    ocr_client.stream_pages.side_effect = CircuitOpenError("ocr", retry_after=30)
+    pool = DocumentWorkerPool(
+        concurrency=1, session_factory=worker_sessions, ocr_client=ocr_client, llm_client=llm_client
+    )
+
+    before = datetime.now()
+    assert await pool.run_once("worker-0")
+    with worker_sessions() as db:
+        document = crud.get_document(db, document_id)
+        job = document.processing_jobs[0]
+        assert job.status == models.JobStatus.QUEUED.value
+        assert job.attempts == 0
+        assert job.run_after >= before + timedelta(seconds=30)
+        assert document.status != models.DocumentStatus.ERROR.value
+
+def dedup_lookups(stage, result):
+    """Current value of the deduplication lookup counter."""
+    from prometheus_client import REGISTRY
+    return REGISTRY.get_sample_value(
+        "backend_dedup_lookups_total", {"stage": stage, "result": result}
+    ) or 0
+
+@pytest.mark.asyncio
+async def test_identical_uploads_reuse_results(worker_sessions):
+    """Test that OCR text is shared across users and flashcards only with the owner."""
+    pytest.importorskip("prometheus_client")
+    digest = "5" * 64
+    with worker_sessions() as db:
+        alice, bob = (
+            crud.create_user(db, schemas.UserCreate(
+                email=f"{name}@example.com", username=name, password="Password123"
+            )).id
+            for name in ("alice", "bob")
+        )
+
+    def upload(owner_id):
+        with worker_sessions() as db:
+            return crud.create_document_with_job(db, schemas.DocumentCreate(
+                filename="syllabus.pdf", mime_type="application/pdf", content_sha256=digest
+            ), owner_id, f"/uploads/{digest}.pdf").id
+
+    ocr_client, llm_client = fake_clients()
+    pool = DocumentWorkerPool(
+        concurrency=1, session_factory=worker_sessions, ocr_client=ocr_client, llm_client=llm_client
+    )
+    ocr_hits, flashcard_hits = dedup_lookups("ocr", "hit"), dedup_lookups("flashcards", "hit")
+
+    first = upload(alice)
+    assert await pool.run_once("worker-0")
+    # Bob gets Alice's OCR text, but not the cards of her private deck
+    second = upload(bob)
+    assert await pool.run_once("worker-0")
+    assert ocr_client.stream_pages.call_count == 1
+    assert llm_client.generate_flashcards.await_count == 2
+
+    # Alice uploading the syllabus again gets a copy of her own deck
+    third = upload(alice)
+    assert await pool.run_once("worker-0")
+    assert ocr_client.stream_pages.call_count == 1
+    assert llm_client.generate_flashcards.await_count == 2
+    assert dedup_lookups("ocr", "hit") - ocr_hits == 2
+    assert dedup_lookups("flashcards", "hit") - flashcard_hits == 1
+
+    with worker_sessions() as db:
+        assert crud.get_extracted_text_by_document(db, second).content == "Mitochondria produce ATP."
+        original, clone = crud.get_deck_by_document(db, first), crud.get_deck_by_document(db, third)
+        assert clone.id != original.id
+        assert clone.owner_id == alice and clone.is_public is False
+        assert clone.title == "Deck for syllabus.pdf"
+        assert len(crud.get_flashcards_by_deck(db, clone.id)) == 2
+        assert crud.get_document(db, third).status == models.DocumentStatus.FLASHCARD_COMPLETE.value
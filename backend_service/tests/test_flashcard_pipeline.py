@@ -0,0 +1,171 @@
+"""
+Tests for the pipelined OCR to LLM flashcard generation.
+"""
+import asyncio
+import time
+
+import pytest
+
+from backend_service.src.config import settings
+from backend_service.src.services.flashcard_pipeline import cards_for_chunk, generate_flashcards_pipelined
+
+async def pages(texts, delay=0.0, read=None, closed=None):
+    """Page stream of a document, optionally slowed down and recording progress."""
+    try:
+        for text in texts:
+            await asyncio.sleep(delay)
+            if read is not None:
+                read.append(text)
+            yield text, len(texts)
+    finally:
+        if closed is not None:
+            closed.append(True)
+
+class FakeLLM:
+    """LLM client answering one card per requested card, naming its chunk."""
+
+    def __init__(self, delay=0.0, gate=None, fail_on=None):
+        self.delay = delay
+        self.gate = gate
+        self.fail_on = fail_on
+        self.requests = []
+
+    async def generate_flashcards(self, text, num_cards=5):
+        self.requests.append((text, num_cards))
+        if self.gate is not None:
+            await self.gate.wait()
+        await asyncio.sleep(self.delay)
+        if self.fail_on is not None and self.fail_on in text:
+            raise Exception("LLM service error: 503")
+        return {"flashcards": [{"question": text, "answer": str(i)} for i in range(num_cards)]}
+
+def test_cards_for_chunk():
+    """Test that cards are shared out by pages."""
+    assert cards_for_chunk(10, 1, 1) == 10
+    assert cards_for_chunk(10, 25, 100) == 2
+    assert cards_for_chunk(10, 1, 100) == 0
+    assert cards_for_chunk(0, 5, 5) == 0
+
+@pytest.mark.asyncio
+async def test_card_budget_is_per_document():
+    """Test that chunks grow until worth a card and never ask for more cards than the document."""
+    texts = [f"page {i}" for i in range(50)]
+    llm = FakeLLM()
+
+    cards = await generate_flashcards_pipelined(
+        pages(texts), llm, num_cards=10, chunk_chars=1, concurrency=2, max_chunks=10
+    )
+
+    assert len(cards) == 10
+    assert [num_cards for _, num_cards in llm.requests] == [1] * 10
+    # Every page is sent once, in order
+    sent = "\n\n".join(text for text, _ in sorted(llm.requests, key=lambda request: int(request[0].split()[1])))
+    assert sent == "\n\n".join(texts)
+
+@pytest.mark.asyncio
+async def test_chunks_stay_within_llm_rate_limit():
+    """Test that a long document takes fewer requests than the LLM service allows per minute."""
+    texts = [f"page {i} " + "x" * 200 for i in range(100)]
+    llm = FakeLLM()
+    generate_flashcards = llm.generate_flashcards
+
+    async def rate_limited(text, num_cards=5):
+        # /generate answers 5/minute
+        if len(llm.requests) >= 5:
+            raise Exception("LLM service error: 429")
+        return await generate_flashcards(text, num_cards)
+
+    llm.generate_flashcards = rate_limited
+    cards = await generate_flashcards_pipelined(pages(texts), llm, num_cards=10, chunk_chars=100)
+
+    assert len(cards) == 10
+    assert len(llm.requests) <= settings.PIPELINE_MAX_CHUNKS < 5
+    assert "\n\n".join(text for text, _ in llm.requests) == "\n\n".join(texts)
+
+@pytest.mark.asyncio
+async def test_last_card_takes_the_remaining_pages():
+    """Test that no chunk is queued once the budget is spent."""
+    texts = ["a" * 100, "b" * 100, "c" * 100, "d" * 100]
+    llm = FakeLLM()
+
+    cards = await generate_flashcards_pipelined(
+        pages(texts), llm, num_cards=2, chunk_chars=100, concurrency=1
+    )
+
+    assert llm.requests == [("a" * 100 + "\n\n" + "b" * 100, 1), ("c" * 100 + "\n\n" + "d" * 100, 1)]
+    assert len(cards) == 2
+
+@pytest.mark.asyncio
+async def test_pages_are_chunked_in_order():
+    """Test chunking by size, the card split and the order of the results."""
+    texts = ["a" * 60, "b" * 60, "", "c" * 150, "d" * 10]
+    # Later chunks answer first
+    llm = FakeLLM()
+    delays = {0: 0.03, 1: 0.02, 2: 0.0}
+
+    async def generate_flashcards(text, num_cards=5):
+        await asyncio.sleep(delays[len(llm.requests)])
+        llm.requests.append((text, num_cards))
+        return {"flashcards": [{"question": text[0], "answer": str(i)} for i in range(num_cards)]}
+
+    llm.generate_flashcards = generate_flashcards
+    cards = await generate_flashcards_pipelined(
+        pages(texts), llm, num_cards=10, chunk_chars=100, concurrency=3
+    )
+
+    # "a" and "b" fill the first chunk, the empty page is carried into the second
+    assert sorted(llm.requests) == [
+        ("a" * 60 + "\n\n" + "b" * 60, 4), ("c" * 150, 4), ("d" * 10, 2)
+    ]
+    assert [card["question"] for card in cards] == ["a"] * 4 + ["c"] * 4 + ["d"] * 2
+
+@pytest.mark.asyncio
+async def test_generation_overlaps_ocr():
+    """Test that a long document takes about max(OCR, LLM) time instead of their sum."""
+    texts = [f"page {i}" for i in range(10)]
+    llm = FakeLLM(delay=0.03)
+
+    start = time.monotonic()
+    cards = await generate_flashcards_pipelined(
+        pages(texts, delay=0.03), llm, num_cards=10, chunk_chars=1, concurrency=1
+    )
+    elapsed = time.monotonic() - start
+
+    assert len(cards) == 10
+    # Sequential stages would take 0.6s
+    assert elapsed < 0.48
+
+@pytest.mark.asyncio
+async def test_full_queue_holds_back_pages():
+    """Test that pages stop being read while the LLM is behind."""
+    gate = asyncio.Event()
+    llm = FakeLLM(gate=gate)
+    read = []
+    texts = [f"page {i}" for i in range(20)]
+
+    task = asyncio.ensure_future(generate_flashcards_pipelined(
+        pages(texts, read=read), llm, num_cards=20, chunk_chars=1, queue_size=2, concurrency=1,
+        max_chunks=20
+    ))
+    await asyncio.sleep(0.05)
+    # One chunk at the LLM, two queued and one waiting to be queued
+    assert len(read) == 4
+
+    gate.set()
+    cards = await task
+    assert len(read) == 20
+    assert len(cards) == 20
+
+@pytest.mark.asyncio
+async def test_failure_stops_the_pipeline():
+    """Test that a failed chunk cancels the other stages and closes the page stream."""
+    closed = []
+    llm = FakeLLM(fail_on="page 1")
+    texts = [f"page {i}" for i in range(50)]
+
+    with pytest.raises(Exception, match="LLM service error: 503"):
+        await generate_flashcards_pipelined(
+            pages(texts, delay=0.001, closed=closed), llm, num_cards=10, chunk_chars=1, concurrency=2
+        )
+    assert closed == [True]
+    assert len(llm.requests) < len(texts)
@@ -0,0 +1,62 @@
+"""
+Tests for the shared service HTTP client.
+"""
+import httpx
+import pytest
+
+from backend_service.src.config import settings
+from backend_service.src.services import http_client
+from backend_service.src.services.llm_service import LLMServiceClient
+from backend_service.src.services.ocr_service import OCRServiceClient
+
+@pytest.mark.asyncio
+async def test_service_clients_share_pool():
+    """Test that both service clients send requests through one pooled client."""
+    await http_client.close_http_client()
+    shared = OCRServiceClient().client
+    assert LLMServiceClient().client is shared
+    assert http_client.get_http_client() is shared
+
+    await http_client.close_http_client()
+    assert shared.is_closed
+    # A closed pool is replaced on next use
+    reopened = LLMServiceClient().client
+    assert reopened is not shared and not reopened.is_closed
+    await http_client.close_http_client()
+
+@pytest.mark.asyncio
+async def test_per_call_timeout():
+    """Test that each service call sets its own read timeout on the request."""
+    seen = []
+
+    def handler(request):
+        seen.append(request.extensions["timeout"])
+        return httpx.Response(200, json={"flashcards": [{"question": "Q", "answer": "A"}]})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await LLMServiceClient("http://llm", http_client=client).generate_flashcards("text")
+
+    assert result["flashcards"] == [{"question": "Q", "answer": "A"}]
+    assert seen[0]["read"] == settings.LLM_REQUEST_TIMEOUT
+    assert seen[0]["connect"] == settings.HTTP_CONNECT_TIMEOUT
+    assert seen[0]["pool"] == settings.HTTP_POOL_TIMEOUT
+
+@pytest.mark.asyncio
+async def test_pool_stats():
+    """Test the pool utilization report of an idle and a closed pool."""
+    await http_client.close_http_client()
+    assert http_client.pool_stats() == {
+        "max_connections": settings.HTTP_MAX_CONNECTIONS,
+        "connections": 0, "active": 0, "idle": 0, "waiting": 0,
+    }
+    http_client.get_http_client()
+    stats = http_client.pool_stats()
+    assert stats["connections"] == stats["active"] + stats["idle"] == 0
+    await http_client.close_http_client()
+
+def test_pool_metrics_exposed(client):
+    """Test that the pool gauges are part of the Prometheus metrics."""
+    response = client.get("/metrics")
+    if response.status_code == 404:
+        pytest.skip("Prometheus instrumentation not installed")
+    assert 'backend_http_pool_connections{state="max_connections"}' in response.text
@@ -0,0 +1,138 @@
+"""
+Tests for the OCR service client and its streamed uploads.
+"""
+import hashlib
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI, File, UploadFile
+
+from backend_service.src.services.ocr_service import MultipartFileStream, OCRServiceClient
+from backend_service.src.services.resilience import ResiliencePolicy
+
+PDF = b"%PDF-1.7\n" + bytes(range(256)) * 2000
+
+def ocr_app():
+    """OCR service stand-in describing the file it received."""
+    app = FastAPI()
+
+    @app.post("/extract")
+    async def extract(file: UploadFile = File(...)):
+        content = await file.read()
+        return {
+            "text": "extracted",
+            "filename": file.filename,
+            "content_type": file.content_type,
+            "sha256": hashlib.sha256(content).hexdigest(),
+        }
+
+    return app
+
+async def collect(body):
+    return [chunk async for chunk in body]
+
+@pytest.mark.asyncio
+async def test_multipart_body_is_read_in_chunks(tmp_path):
+    """Test that the file is streamed in bounded chunks and can be sent again."""
+    path = tmp_path / "notes.pdf"
+    path.write_bytes(PDF)
+    body = MultipartFileStream("file", path, chunk_size=4096)
+
+    chunks = await collect(body)
+    assert max(len(chunk) for chunk in chunks[1:-1]) == 4096
+    assert b"".join(chunks[1:-1]) == PDF
+    assert sum(len(chunk) for chunk in chunks) == body.size == int(body.headers["Content-Length"])
+    # Retries and hedges iterate the same body again
+    assert await collect(body) == chunks
+
+@pytest.mark.asyncio
+async def test_extract_text_streams_file(tmp_path):
+    """Test that the streamed upload is parsed as a regular multipart file."""
+    path = tmp_path / "notes.pdf"
+    path.write_bytes(PDF)
+    sent = []
+
+    async def handler(request):
+        sent.append(request)
+        return await asgi.handle_async_request(request)
+
+    asgi = httpx.ASGITransport(app=ocr_app())
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await OCRServiceClient(
+            "http://ocr", http_client=client, policy=ResiliencePolicy("test")
+        ).extract_text(path)
+
+    assert result == {
+        "text": "extracted",
+        "filename": "notes.pdf",
+        "content_type": "application/pdf",
+        "sha256": hashlib.sha256(PDF).hexdigest(),
+    }
+    assert sent[0].headers["Content-Length"] == str(MultipartFileStream("file", path).size)
+    assert "Transfer-Encoding" not in sent[0].headers
+
+@pytest.mark.asyncio
+async def test_retry_resends_whole_file(tmp_path, monkeypatch):
+    """Test that a retried upload sends the complete file again."""
+    path = tmp_path / "scan.png"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"x" * 10000)
+    received = []
+
+    async def handler(request):
+        received.append(await request.aread())
+        if len(received) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"text": "ok"})
+
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr("backend_service.src.services.resilience.asyncio.sleep", no_sleep)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await OCRServiceClient(
+            "http://ocr", http_client=client, policy=ResiliencePolicy("test", max_attempts=2)
+        ).extract_text(path)
+
+    assert result == {"text": "ok"}
+    assert len(received) == 2
+    assert len(received[0]) == len(received[1])
+    assert path.read_bytes() in received[1]
+
+def ndjson(*records):
+    return "".join(json.dumps(record) + "\n" for record in records).encode()
+
+async def read_pages(body, path):
+    """Pages streamed by the OCR client from a service answering with body."""
+    def handler(request):
+        assert request.url.path == "/extract/stream"
+        return httpx.Response(200, content=body, headers={"Content-Type": "application/x-ndjson"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        ocr = OCRServiceClient("http://ocr", http_client=client, policy=ResiliencePolicy("test"))
+        return [record async for record in ocr.stream_pages(path)]
+
+@pytest.mark.asyncio
+async def test_stream_pages(tmp_path):
+    """Test that page records are yielded until the final summary."""
+    path = tmp_path / "notes.pdf"
+    path.write_bytes(PDF)
+    pages = await read_pages(ndjson(
+        {"page": 1, "page_count": 2, "text": "One"},
+        {"page": 2, "page_count": 2, "text": "Two"},
+        {"status": "success", "page_count": 2},
+    ), path)
+    assert [page["text"] for page in pages] == ["One", "Two"]
+
+@pytest.mark.asyncio
+async def test_stream_pages_errors(tmp_path):
+    """Test that an error record or a cut-off stream fails the extraction."""
+    path = tmp_path / "notes.pdf"
+    path.write_bytes(PDF)
+    with pytest.raises(Exception, match="OCR service error: Error processing PDF"):
+        await read_pages(ndjson(
+            {"page": 1, "page_count": 2, "text": "One"},
+            {"status": "error", "detail": "Error processing PDF: broken page"},
+        ), path)
+    with pytest.raises(Exception, match="ended before the last page"):
+        await read_pages(ndjson({"page": 1, "page_count": 2, "text": "One"}), path)
@@ -0,0 +1,135 @@
+"""
+Tests for paged and streamed deck and list endpoints.
+"""
+import pytest
+from db_module import crud, schemas
+from backend_service.src.config import settings
+
+# Mark all tests in this file as integration tests
+pytestmark = [pytest.mark.integration]
+
+def auth_headers(client, user):
+    """Log in as user and return an Authorization header."""
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": user.username, "password": "Password123"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_read_decks_cursor(client, db_session, test_user):
+    """Test walking deck pages through the X-Next-Cursor header."""
+    for i in range(5):
+        crud.create_deck(db_session, schemas.DeckCreate(title=f"Deck {i}"), test_user.id)
+    headers = auth_headers(client, test_user)
+
+    seen, params = [], {"limit": 2}
+    while True:
+        response = client.get("/api/v1/decks/", headers=headers, params=params)
+        assert response.status_code == 200
+        seen.extend(deck["id"] for deck in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params = {"limit": 2, "cursor": cursor}
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+def test_read_decks_invalid_cursor(client, test_user):
+    """Test that a malformed cursor is rejected with 400."""
+    headers = auth_headers(client, test_user)
+    response = client.get("/api/v1/decks/", headers=headers, params={"cursor": "garbage"})
+    assert response.status_code == 400
+
+def test_read_deck_returns_all_flashcards(client, db_session, test_user):
+    """Test that deck detail is not capped at 100 cards and can be paged."""
+    deck = crud.create_deck(db_session, schemas.DeckCreate(title="Big deck"), test_user.id)
+    crud.create_flashcards_bulk(db_session, [
+        schemas.FlashcardCreate(question=f"Q{i}", answer=f"A{i}", deck_id=deck.id)
+        for i in range(120)
+    ])
+    headers = auth_headers(client, test_user)
+
+    response = client.get(f"/api/v1/decks/{deck.id}", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()["flashcards"]) == 120
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get(f"/api/v1/decks/{deck.id}", headers=headers, params={"limit": 50})
+    assert response.status_code == 200
+    assert len(response.json()["flashcards"]) == 50
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(f"/api/v1/decks/{deck.id}", headers=headers, params={"limit": 100, "cursor": cursor})
+    assert len(response.json()["flashcards"]) == 70
+
+def test_read_deck_limit_is_capped(client, db_session, test_user, monkeypatch):
+    """Test that deck detail returns at most DECK_PAGE_MAX_SIZE cards and rejects larger limits."""
+    deck = crud.create_deck(db_session, schemas.DeckCreate(title="Capped deck"), test_user.id)
+    crud.create_flashcards_bulk(db_session, [
+        schemas.FlashcardCreate(question=f"Q{i}", answer=f"A{i}", deck_id=deck.id)
+        for i in range(120)
+    ])
+    headers = auth_headers(client, test_user)
+
+    for limit in (0, settings.DECK_PAGE_MAX_SIZE + 1):
+        response = client.get(f"/api/v1/decks/{deck.id}", headers=headers, params={"limit": limit})
+        assert response.status_code == 422
+
+    monkeypatch.setattr(settings, "DECK_PAGE_MAX_SIZE", 100)
+    response = client.get(f"/api/v1/decks/{deck.id}", headers=headers)
+    assert len(response.json()["flashcards"]) == 100
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(f"/api/v1/decks/{deck.id}", headers=headers, params={"cursor": cursor})
+    assert len(response.json()["flashcards"]) == 20
+
+def test_stream_deck_matches_regular_response(client, db_session, test_user):
+    """Test that streamed deck detail and flashcard listing match the buffered JSON."""
+    deck = crud.create_deck(db_session, schemas.DeckCreate(title="Streamed deck"), test_user.id)
+    crud.create_flashcards_bulk(db_session, [
+        schemas.FlashcardCreate(question=f"Q{i}", answer=f"A \"{i}\"", deck_id=deck.id)
+        for i in range(2500)
+    ])
+    headers = auth_headers(client, test_user)
+
+    regular = client.get(f"/api/v1/decks/{deck.id}", headers=headers)
+    streamed = client.get(f"/api/v1/decks/{deck.id}", headers=headers, params={"stream": True})
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"] == "application/json"
+    assert streamed.json() == regular.json()
+
+    listed = client.get("/api/v1/flashcards/", headers=headers, params={"deck_id": deck.id, "stream": True})
+    assert listed.status_code == 200
+    assert listed.json() == regular.json()["flashcards"]
+
+def test_stream_empty_deck(client, db_session, test_user):
+    """Test streaming a deck without flashcards."""
+    deck = crud.create_deck(db_session, schemas.DeckCreate(title="Empty deck"), test_user.id)
+    headers = auth_headers(client, test_user)
+
+    response = client.get(f"/api/v1/decks/{deck.id}", headers=headers, params={"stream": True})
+    assert response.json()["flashcards"] == []
+    response = client.get("/api/v1/flashcards/", headers=headers, params={"deck_id": deck.id, "stream": True})
+    assert response.json() == []
+
+def test_stream_memory_is_flat(db_session, test_user):
+    """Test that streaming memory does not grow with the deck size."""
+    import tracemalloc
+    from backend_service.src.services.streaming import _flashcard_array
+
+    def peak_for(num_cards):
+        deck = crud.create_deck(db_session, schemas.DeckCreate(title=f"{num_cards} cards"), test_user.id)
+        crud.create_flashcards_bulk(db_session, [
+            schemas.FlashcardCreate(question=f"Q{i}", answer=f"A{i}", deck_id=deck.id)
+            for i in range(num_cards)
+        ])
+        tracemalloc.start()
+        try:
+            for _ in _flashcard_array(db_session.get_bind(), deck.id, 500):
+                pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small, large = peak_for(1000), peak_for(10000)
+    assert large < small * 2
@@ -0,0 +1,83 @@
+"""
+Tests for password hashing on the bounded worker pool.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from passlib.context import CryptContext
+
+from db_module import crud
+from backend_service.src.services import passwords
+from backend_service.src.services.passwords import PasswordHasher, PasswordHasherBusyError, authenticate_user
+
+@pytest.mark.asyncio
+async def test_hashing_does_not_block_the_event_loop():
+    """Test that the loop keeps running while passwords are hashed."""
+    hasher = PasswordHasher(workers=2, queue_size=4)
+    gaps = []
+
+    async def ticker(stop):
+        last = time.monotonic()
+        while not stop.is_set():
+            await asyncio.sleep(0.005)
+            gaps.append(time.monotonic() - last)
+            last = time.monotonic()
+
+    stop = asyncio.Event()
+    task = asyncio.ensure_future(ticker(stop))
+    hashed = await hasher.hash("Password123")
+    assert (await hasher.verify("Password123", hashed)) == (True, None)
+    stop.set()
+    await task
+
+    # Two bcrypt runs take hundreds of milliseconds, the loop never stalled that long
+    assert len(gaps) > 10
+    assert max(gaps) < 0.1
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects():
+    """Test that operations past the queue size are rejected while the workers are busy."""
+    hasher = PasswordHasher(workers=1, queue_size=1)
+    release = threading.Event()
+    blocked = [asyncio.ensure_future(hasher._run("hash", release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    assert hasher.queued == 1
+
+    with pytest.raises(PasswordHasherBusyError) as excinfo:
+        await hasher.hash("Password123")
+    assert excinfo.value.retry_after > 0
+
+    release.set()
+    await asyncio.gather(*blocked)
+    assert hasher.queued == 0
+    assert crud.verify_password("Password123", await hasher.hash("Password123"))
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_hash(db_session, test_user):
+    """Test that a hash made with another cost is replaced after a successful login."""
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("Password123")
+    crud.update_password_hash(db_session, test_user.id, old_hash)
+
+    assert await authenticate_user(db_session, test_user.username, "WrongPassword1") is None
+    assert crud.get_user(db_session, test_user.id).hashed_password == old_hash
+
+    user = await authenticate_user(db_session, test_user.username, "Password123")
+    assert user.id == test_user.id
+    db_session.expire_all()
+    new_hash = crud.get_user(db_session, test_user.id).hashed_password
+    assert new_hash.startswith(f"$2b${crud.BCRYPT_ROUNDS:02d}$")
+    assert crud.verify_password("Password123", new_hash)
+
+def test_busy_hasher_answers_503(client, monkeypatch):
+    """Test that a full hashing queue turns requests away with Retry-After."""
+    async def busy(password):
+        raise PasswordHasherBusyError(retry_after=1.2)
+
+    monkeypatch.setattr(passwords.password_hasher, "hash", busy)
+    response = client.post("/api/v1/auth/register", json={
+        "email": "new@example.com", "username": "newuser", "password": "Password123"
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
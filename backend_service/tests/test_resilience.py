@@ -0,0 +1,212 @@
+"""
+Tests for the retry, circuit breaker and hedging policy of service calls.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from backend_service.src.services import resilience
+from backend_service.src.services.llm_service import LLMServiceClient
+from backend_service.src.services.resilience import CircuitBreaker, CircuitOpenError, ResiliencePolicy
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of waiting."""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", fake_sleep)
+    return delays
+
+def scripted_client(*responses):
+    """AsyncClient answering with the given responses in order, the last one repeated."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        response = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), calls
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors(sleeps):
+    """Test that 503s and transport errors are retried until a response succeeds."""
+    client, calls = scripted_client(
+        httpx.Response(503), httpx.ConnectError("refused"), httpx.Response(200, json={"ok": True})
+    )
+    policy = ResiliencePolicy("test", max_attempts=3, base_delay=1.0, max_delay=4.0)
+
+    response = await policy.call(lambda: client.get("http://svc/"))
+    assert response.status_code == 200
+    assert len(calls) == 3
+    # Full jitter: each delay lies between 0 and the exponential bound
+    assert 0 <= sleeps[0] <= 1.0 and 0 <= sleeps[1] <= 2.0
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_honours_retry_after(sleeps):
+    """Test that a 429 waits for its Retry-After, capped at max_delay."""
+    client, calls = scripted_client(
+        httpx.Response(429, headers={"Retry-After": "12"}),
+        httpx.Response(429, headers={"Retry-After": "600"}),
+        httpx.Response(200)
+    )
+    policy = ResiliencePolicy("test", max_attempts=3, max_delay=60.0)
+
+    response = await policy.call(lambda: client.get("http://svc/"))
+    assert response.status_code == 200
+    assert sleeps == [12.0, 60.0]
+    # Rate limiting is not a failure of the service
+    assert policy.breaker.failures == 0
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(sleeps):
+    """Test that a 4xx other than 429 is returned after one attempt."""
+    client, calls = scripted_client(httpx.Response(422))
+    response = await ResiliencePolicy("test").call(lambda: client.get("http://svc/"))
+    assert response.status_code == 422
+    assert len(calls) == 1
+    assert sleeps == []
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_last_response_returned_when_attempts_run_out(sleeps):
+    """Test that the client still sees the final error response."""
+    client, calls = scripted_client(httpx.Response(503))
+    llm = LLMServiceClient(
+        "http://llm", http_client=client, policy=ResiliencePolicy("test", max_attempts=2, failure_threshold=10)
+    )
+    with pytest.raises(Exception, match="LLM service error: 503"):
+        await llm.generate_flashcards("text")
+    assert len(calls) == 2
+    await client.aclose()
+
+def test_circuit_breaker_states(monkeypatch):
+    """Test opening, failing fast, the half-open trial and closing again."""
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == 30
+
+    # After the reset timeout a single trial call is let through
+    now[0] += 30
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # A failed trial opens the circuit again, a successful one closes it
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    now[0] += 30
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast(sleeps):
+    """Test that calls stop reaching a failing service once the circuit opens."""
+    client, calls = scripted_client(httpx.Response(500))
+    policy = ResiliencePolicy("test", max_attempts=1, failure_threshold=3)
+
+    for _ in range(3):
+        assert (await policy.call(lambda: client.get("http://svc/"))).status_code == 500
+    with pytest.raises(CircuitOpenError):
+        await policy.call(lambda: client.get("http://svc/"))
+    assert len(calls) == 3
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_hedged_request_wins():
+    """Test that a hedge answers for a slow first request."""
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+        return httpx.Response(200, json={"call": len(calls)})
+
+    policy = ResiliencePolicy("test", hedge_delay=0.01)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        response = await asyncio.wait_for(policy.call(lambda: client.get("http://svc/")), timeout=1)
+    assert response.json() == {"call": 2}
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_fast_response_is_not_hedged():
+    """Test that no hedge is sent when the first request answers in time."""
+    client, calls = scripted_client(httpx.Response(200))
+    policy = ResiliencePolicy("test", hedge_delay=1.0)
+    assert (await policy.call(lambda: client.get("http://svc/"))).status_code == 200
+    assert len(calls) == 1
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_releases_half_open_circuit(monkeypatch):
+    """Test that a cancelled half-open trial does not keep the circuit closed to every later call."""
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    policy = ResiliencePolicy("test", max_attempts=1, failure_threshold=1, reset_timeout=30)
+    policy.breaker.before_call()
+    policy.breaker.record_failure()
+    now[0] += 30
+
+    started = asyncio.Event()
+
+    async def hanging_send():
+        started.set()
+        await asyncio.sleep(5)
+
+    trial = asyncio.ensure_future(policy.call(hanging_send))
+    await started.wait()
+    assert policy.breaker.state == CircuitBreaker.HALF_OPEN
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    client, calls = scripted_client(httpx.Response(200))
+    assert (await policy.call(lambda: client.get("http://svc/"))).status_code == 200
+    assert policy.breaker.state == CircuitBreaker.CLOSED
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_losing_hedge_response_is_closed():
+    """Test that the response of the request that lost the race is closed."""
+    calls = []
+    responses = []
+    hedge_sent = asyncio.Event()
+
+    async def send():
+        # The first request answers once the hedge is sent, so both finish together
+        calls.append(None)
+        if len(calls) == 1:
+            await hedge_sent.wait()
+        else:
+            hedge_sent.set()
+        # A streamed response stays open until it is read or closed
+        response = httpx.Response(200, stream=httpx.ByteStream(b"{}"))
+        responses.append(response)
+        return response
+
+    policy = ResiliencePolicy("test", hedge_delay=0.01)
+    winner = await policy.call(send)
+    assert len(responses) == 2
+    (loser,) = [response for response in responses if response is not winner]
+    assert loser.is_closed
+    assert not winner.is_closed
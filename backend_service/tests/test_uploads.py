@@ -0,0 +1,167 @@
+"""
+Tests for streamed, size-bounded document uploads.
+"""
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+from db_module import crud
+from backend_service.src.auth.jwt import create_access_token
+from backend_service.src.config import settings
+from backend_service.src.middleware.upload_limit import MULTIPART_OVERHEAD, UploadSizeLimitMiddleware
+from backend_service.src.services import uploads
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 40
+
+def auth_headers(user):
+    """Authorization header with an access token for user (no login, which is rate limited)."""
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.id})}"}
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    """Store uploads in a temporary directory."""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+def upload(client, user, filename, content, content_type="image/png"):
+    """Upload a document as user."""
+    return client.post(
+        "/api/v1/documents/",
+        headers=auth_headers(user),
+        files={"file": (filename, io.BytesIO(content), content_type)}
+    )
+
+def test_upload_is_stored(client, db_session, test_user, upload_dir):
+    """Test that an upload is written to disk with the detected MIME type."""
+    response = upload(client, test_user, "scan.png", PNG, content_type="application/octet-stream")
+    assert response.status_code == 200
+    assert response.json()["mime_type"] == "image/png"
+
+    document = crud.get_document(db_session, response.json()["id"])
+    with open(document.file_path, "rb") as f:
+        assert f.read() == PNG
+
+def test_identical_uploads_share_one_file(client, db_session, test_user, upload_dir):
+    """Test that uploads are stored under their digest and deleted with the last document."""
+    digest = hashlib.sha256(PNG).hexdigest()
+    first = upload(client, test_user, "scan.png", PNG).json()
+    second = upload(client, test_user, "copy.png", PNG).json()
+    assert first["content_sha256"] == second["content_sha256"] == digest
+    assert first["file_path"] == second["file_path"] == str(upload_dir / f"{digest}.png")
+    assert list(upload_dir.iterdir()) == [upload_dir / f"{digest}.png"]
+
+    client.delete(f"/api/v1/documents/{first['id']}", headers=auth_headers(test_user))
+    assert (upload_dir / f"{digest}.png").exists()
+    client.delete(f"/api/v1/documents/{second['id']}", headers=auth_headers(test_user))
+    assert list(upload_dir.iterdir()) == []
+
+def test_upload_restores_file_deleted_meanwhile(client, db_session, test_user, upload_dir, monkeypatch):
+    """Test that an upload re-creates the shared file if the last other document was deleted before it was saved."""
+    digest = hashlib.sha256(PNG).hexdigest()
+    first = upload(client, test_user, "scan.png", PNG).json()
+    create_document_with_job = crud.create_document_with_job
+
+    def delete_first(db, *args, **kwargs):
+        # Runs after the second upload was linked to the shared file
+        assert crud.delete_document(db, first["id"], delete_file=os.remove)
+        assert not (upload_dir / f"{digest}.png").exists()
+        return create_document_with_job(db, *args, **kwargs)
+
+    monkeypatch.setattr(crud, "create_document_with_job", delete_first)
+    second = upload(client, test_user, "copy.png", PNG).json()
+
+    assert list(upload_dir.iterdir()) == [upload_dir / f"{digest}.png"]
+    with open(second["file_path"], "rb") as f:
+        assert f.read() == PNG
+
+def test_upload_content_must_match_extension(client, test_user, upload_dir):
+    """Test that the magic bytes are checked against the extension."""
+    response = upload(client, test_user, "scan.png", b"%PDF-1.7\n" + b"x" * 100)
+    assert response.status_code == 415
+    response = upload(client, test_user, "notes.jpg", b"just some text")
+    assert response.status_code == 415
+    assert list(upload_dir.iterdir()) == []
+
+def test_upload_size_limit(client, test_user, upload_dir, monkeypatch):
+    """Test that an upload over MAX_UPLOAD_SIZE is rejected and not kept."""
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", len(PNG) - 1)
+    response = upload(client, test_user, "scan.png", PNG)
+    assert response.status_code == 413
+    assert list(upload_dir.iterdir()) == []
+
+class ChunkedUpload:
+    """Minimal UploadFile stand-in recording the size of each read."""
+
+    def __init__(self, content):
+        self.stream = io.BytesIO(content)
+        self.reads = []
+
+    async def read(self, size=-1):
+        self.reads.append(size)
+        return self.stream.read(size)
+
+@pytest.mark.asyncio
+async def test_save_upload_reads_in_chunks(tmp_path):
+    """Test that the file is copied chunk by chunk and hashed on the way."""
+    content = b"%PDF-1.7\n" + b"0123456789" * 10000
+    file = ChunkedUpload(content)
+
+    stored = await uploads.save_upload(
+        file, tmp_path / "doc.pdf", "pdf", max_size=len(content), chunk_size=4096
+    )
+    assert stored.size == len(content)
+    assert stored.sha256 == hashlib.sha256(content).hexdigest()
+    assert stored.mime_type == "application/pdf"
+    assert set(file.reads) == {4096}
+    assert (tmp_path / "doc.pdf").read_bytes() == content
+
+@pytest.mark.asyncio
+async def test_save_upload_stops_at_limit(tmp_path):
+    """Test that reading stops as soon as the size limit is crossed."""
+    file = ChunkedUpload(b"%PDF-1.7\n" + b"x" * 100000)
+    with pytest.raises(uploads.UploadTooLargeError):
+        await uploads.save_upload(file, tmp_path / "doc.pdf", "pdf", max_size=10000, chunk_size=4096)
+    assert len(file.reads) == 3
+    assert not (tmp_path / "doc.pdf").exists()
+
+def limited_app(limit):
+    """App with one upload route behind the size limit middleware."""
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def receive_upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(UploadSizeLimitMiddleware, limits={"/upload": limit})
+    return TestClient(app)
+
+def test_middleware_rejects_declared_length():
+    """Test that a Content-Length over the limit is rejected before the body is read."""
+    client = limited_app(1000)
+    response = client.post("/upload", files={"file": ("a.bin", b"x" * (MULTIPART_OVERHEAD + 2000))})
+    assert response.status_code == 413
+    assert client.post("/upload", files={"file": ("a.bin", b"x" * 500)}).json() == {"size": 500}
+
+@pytest.mark.asyncio
+async def test_middleware_rejects_streamed_body():
+    """Test that a body without Content-Length is cut off once it crosses the limit."""
+    consumed = []
+
+    async def receive():
+        consumed.append(1)
+        return {"type": "http.request", "body": b"x" * 8192, "more_body": True}
+
+    async def app(scope, receive, send):
+        while (await receive())["more_body"]:
+            pass
+
+    middleware = UploadSizeLimitMiddleware(app, limits={"/upload": 1000})
+    scope = {"type": "http", "method": "POST", "path": "/upload", "headers": []}
+    with pytest.raises(HTTPException) as excinfo:
+        await middleware(scope, receive, None)
+    assert excinfo.value.status_code == 413
+    assert len(consumed) == (1000 + MULTIPART_OVERHEAD) // 8192 + 1
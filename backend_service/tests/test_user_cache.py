@@ -0,0 +1,139 @@
+"""
+Tests for the authenticated user cache and trusted token claims.
+"""
+import time
+
+import pytest
+
+from db_module import crud, schemas
+from backend_service.src.auth.jwt import access_token_claims, create_access_token
+from backend_service.src.auth.user_cache import UserCache, user_cache
+from backend_service.src.config import settings
+
+def auth_headers(claims):
+    """Authorization header with an access token (no login, which is rate limited)."""
+    return {"Authorization": f"Bearer {create_access_token(claims)}"}
+
+@pytest.fixture
+def user_queries(monkeypatch):
+    """Record the users loaded from the database."""
+    loaded = []
+    get_user = crud.get_user
+
+    def counting_get_user(db, user_id):
+        loaded.append(user_id)
+        return get_user(db, user_id)
+
+    monkeypatch.setattr(crud, "get_user", counting_get_user)
+    return loaded
+
+class FakeRedis:
+    """Dictionary standing in for the Redis commands used by the cache."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+def test_requests_reuse_cached_user(client, test_user, user_queries):
+    """Test that only the first request of a user loads it from the database."""
+    headers = auth_headers({"sub": test_user.id})
+    for _ in range(3):
+        response = client.get("/api/v1/users/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["email"] == test_user.email
+    assert user_queries == [test_user.id]
+
+def test_user_changes_invalidate_cache(client, db_session, test_user):
+    """Test that updates, deactivation and token revocation drop the cached user."""
+    headers = auth_headers({"sub": test_user.id})
+    client.get("/api/v1/users/me", headers=headers)
+
+    client.put("/api/v1/users/me", headers=headers, json={"full_name": "Renamed User"})
+    assert client.get("/api/v1/users/me", headers=headers).json()["full_name"] == "Renamed User"
+
+    assert user_cache.get(test_user.id) is not None
+    crud.revoke_all_user_tokens(db_session, test_user.id)
+    assert user_cache.get(test_user.id) is None
+
+    client.get("/api/v1/users/me", headers=headers)
+    crud.update_user(db_session, test_user.id, schemas.UserUpdate(is_active=False))
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 403
+
+def test_cache_is_bounded_and_expires(test_user):
+    """Test LRU eviction, expiry and that a user read before an invalidation is not cached."""
+    user = schemas.User.model_validate(test_user)
+    cache = UserCache(maxsize=2, ttl=0.05)
+    for user_id in ("a", "b"):
+        cache.set(user.model_copy(update={"id": user_id}))
+    cache.get("a")
+    cache.set(user)
+    assert [cache.get(user_id) is not None for user_id in ("a", "b", test_user.id)] == [True, False, True]
+
+    time.sleep(0.06)
+    assert cache.get(test_user.id) is None
+
+    generation = cache.generation
+    cache.invalidate(test_user.id)
+    cache.set(user, generation)
+    assert cache.get(test_user.id) is None
+
+def test_redis_tier_is_shared(test_user):
+    """Test that a user cached by one process is found, and dropped, by another."""
+    redis = FakeRedis()
+    user = schemas.User.model_validate(test_user)
+    first, second = UserCache(10, 60, redis), UserCache(10, 60, redis)
+
+    first.set(user)
+    assert second.get(test_user.id) == user
+    first.invalidate(test_user.id)
+    assert redis.data == {}
+
+def test_redis_invalidation_failure_is_retried(test_user):
+    """Test that a failed Redis delete is retried and never fails the change that triggered it."""
+    redis = FakeRedis()
+    user = schemas.User.model_validate(test_user)
+    cache = UserCache(10, 60, redis)
+    cache.set(user)
+    failures = []
+    delete = redis.delete
+
+    def flaky_delete(key):
+        if len(failures) < 1:
+            failures.append(key)
+            raise ConnectionError("Redis went away")
+        delete(key)
+
+    redis.delete = flaky_delete
+    cache.invalidate(test_user.id)
+    assert len(failures) == 1
+    assert redis.data == {}
+
+    def failing_delete(key):
+        raise ConnectionError("Redis went away")
+
+    cache.set(user)
+    redis.delete = failing_delete
+    cache.invalidate(test_user.id)
+    assert test_user.id not in cache._entries
+    assert cache.get(test_user.id) == user  # left in Redis until the TTL expires
+
+def test_trusted_claims_skip_user_lookup(client, test_user, user_queries, monkeypatch):
+    """Test that signed claims authenticate without a query when trusted."""
+    monkeypatch.setattr(settings, "JWT_TRUST_USER_CLAIMS", True)
+    headers = auth_headers(access_token_claims(test_user))
+
+    assert client.get("/api/v1/documents/", headers=headers).status_code == 200
+    assert user_queries == []
+    # The profile itself is still read from the database
+    assert client.get("/api/v1/users/me", headers=headers).json()["email"] == test_user.email
+
+    inactive = auth_headers({**access_token_claims(test_user), "active": False})
+    assert client.get("/api/v1/documents/", headers=inactive).status_code == 403
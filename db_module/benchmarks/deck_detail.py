@@ -0,0 +1,118 @@
+"""
+Deck detail read benchmark.
+
+Compares the original read_deck path (deck query, flashcard query, then a
+Deck model dumped into a DeckWithFlashcards model) with a selectinload of
+Deck.flashcards and with crud.get_deck_with_flashcards, both validated once
+into DeckWithFlashcards, and with reading the same deck one page at a time.
+
+Usage:
+    python -m db_module.benchmarks.deck_detail --cards 10000 --repeat 5
+"""
+import argparse
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.orm import selectinload, sessionmaker
+
+from db_module.database import create_db_engine
+from db_module.base import Base
+from db_module import crud, models, schemas
+from db_module.pagination import next_cursor
+
+def seed(SessionLocal, num_cards: int) -> str:
+    """Create a user and a deck with num_cards flashcards, returning the deck ID."""
+    with SessionLocal() as db:
+        user = models.User(
+            id=str(uuid.uuid4()), email="bench@example.com", username="bench", hashed_password="x"
+        )
+        deck = models.Deck(id=str(uuid.uuid4()), title="Benchmark deck", owner_id=user.id)
+        db.add_all([user, deck])
+        db.commit()
+        crud.create_flashcards_bulk(db, [
+            schemas.FlashcardCreate(question=f"Question {i}", answer=f"Answer {i}", deck_id=deck.id)
+            for i in range(num_cards)
+        ])
+        return deck.id
+
+def legacy_read(db, deck_id: str, num_cards: int) -> int:
+    """The read_deck implementation before eager loading, without the 100 card cap."""
+    deck = crud.get_deck(db, deck_id)
+    db_flashcards = crud.get_flashcards_by_deck(db, deck_id, limit=num_cards)
+    deck_data = schemas.Deck.model_validate(deck, from_attributes=True)
+    response = schemas.DeckWithFlashcards(
+        **deck_data.model_dump(),
+        flashcards=[schemas.Flashcard.model_validate(f, from_attributes=True) for f in db_flashcards]
+    )
+    # FastAPI dumps a returned model and validates it against response_model again
+    response = schemas.DeckWithFlashcards.model_validate(response.model_dump())
+    return len(response.model_dump_json())
+
+def selectin_read(db, deck_id: str, num_cards: int) -> int:
+    """Deck with a selectinload of its flashcards, validated once."""
+    deck = (
+        db.query(models.Deck)
+        .options(selectinload(models.Deck.flashcards))
+        .filter(models.Deck.id == deck_id)
+        .first()
+    )
+    return len(schemas.DeckWithFlashcards.model_validate(deck).model_dump_json())
+
+def attached_read(db, deck_id: str, num_cards: int) -> int:
+    """crud.get_deck_with_flashcards validated once, as read_deck does."""
+    deck = crud.get_deck_with_flashcards(db, deck_id)
+    return len(schemas.DeckWithFlashcards.model_validate(deck).model_dump_json())
+
+def paged_read(db, deck_id: str, num_cards: int, page_size: int = 500) -> int:
+    """Walk the whole deck one page of flashcards at a time."""
+    size, cursor = 0, None
+    while True:
+        deck = crud.get_deck_with_flashcards(db, deck_id, limit=page_size, cursor=cursor)
+        size += len(schemas.DeckWithFlashcards.model_validate(deck).model_dump_json())
+        cursor = next_cursor(deck.flashcards, page_size)
+        if cursor is None:
+            return size
+
+STRATEGIES = {
+    "legacy": legacy_read,
+    "selectinload": selectin_read,
+    "attached": attached_read,
+    "paged (500)": paged_read,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Deck detail read benchmark")
+    parser.add_argument("--cards", type=int, default=10000, help="Flashcards seeded in the deck")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per strategy")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        deck_id = seed(SessionLocal, args.cards)
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+        print(f"{'strategy':<14}{'median':>10}{'min':>10}{'queries':>9}{'bytes':>11}")
+        for name, read in STRATEGIES.items():
+            timings = []
+            for _ in range(args.repeat):
+                with SessionLocal() as db:
+                    statements.clear()
+                    start = time.perf_counter()
+                    size = read(db, deck_id, args.cards)
+                    timings.append(time.perf_counter() - start)
+            print(
+                f"{name:<14}{statistics.median(timings) * 1000:>8.1f}ms"
+                f"{min(timings) * 1000:>8.1f}ms{len(statements):>9}{size:>11}"
+            )
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
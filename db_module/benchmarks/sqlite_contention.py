@@ -0,0 +1,138 @@
+"""
+Read/write contention benchmark for the SQLite engine profiles.
+
+Simulates the production pattern where a background writer (document
+processing inserting flashcards one commit at a time) runs while several
+request threads read decks. It is run once with the legacy rollback-journal
+settings and once with the WAL profile from db_module.database.
+
+Usage:
+    python -m db_module.benchmarks.sqlite_contention --duration 5 --readers 8
+"""
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from db_module.database import SQLITE_PRAGMAS, create_db_engine
+from db_module.base import Base
+from db_module import models
+
+PROFILES = {
+    # SQLite defaults, i.e. the engine settings before the WAL profile existed
+    "rollback-journal": {"journal_mode": "DELETE", "synchronous": "FULL", "busy_timeout": 5000},
+    "wal": SQLITE_PRAGMAS,
+}
+
+def seed(SessionLocal, num_cards: int) -> str:
+    """Create a user and a deck with num_cards flashcards, returning the deck ID."""
+    with SessionLocal() as db:
+        user = models.User(
+            id=str(uuid.uuid4()), email="bench@example.com", username="bench", hashed_password="x"
+        )
+        deck = models.Deck(id=str(uuid.uuid4()), title="Benchmark deck", owner_id=user.id)
+        db.add_all([user, deck])
+        db.add_all(
+            models.Flashcard(id=str(uuid.uuid4()), question=f"Q{i}", answer=f"A{i}", deck_id=deck.id)
+            for i in range(num_cards)
+        )
+        db.commit()
+        return deck.id
+
+def run_profile(name: str, pragmas: Dict[str, Any], duration: float, readers: int, num_cards: int) -> Dict[str, Any]:
+    """Run the writer and reader threads against a fresh database file."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = create_db_engine(db_url, pragmas=pragmas, pool_size=readers + 2)
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        deck_id = seed(SessionLocal, num_cards)
+
+        stop = threading.Event()
+        read_latencies = []
+        write_latencies = []
+        errors = {"read": 0, "write": 0}
+        lock = threading.Lock()
+
+        def writer():
+            with SessionLocal() as db:
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    try:
+                        db.add(models.Flashcard(
+                            id=str(uuid.uuid4()), question="new", answer="card", deck_id=deck_id
+                        ))
+                        db.commit()
+                        elapsed = time.perf_counter() - start
+                        with lock:
+                            write_latencies.append(elapsed)
+                    except OperationalError:
+                        db.rollback()
+                        with lock:
+                            errors["write"] += 1
+
+        def reader():
+            with SessionLocal() as db:
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    try:
+                        db.query(models.Flashcard).filter(models.Flashcard.deck_id == deck_id).limit(100).all()
+                        db.rollback()  # end the read transaction
+                        elapsed = time.perf_counter() - start
+                        with lock:
+                            read_latencies.append(elapsed)
+                    except OperationalError:
+                        db.rollback()
+                        with lock:
+                            errors["read"] += 1
+
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    def percentile(values, pct):
+        if not values:
+            return 0.0
+        return statistics.quantiles(values, n=100)[pct - 1] * 1000 if len(values) > 1 else values[0] * 1000
+
+    return {
+        "profile": name,
+        "reads_per_s": len(read_latencies) / duration,
+        "writes_per_s": len(write_latencies) / duration,
+        "read_p50_ms": percentile(read_latencies, 50),
+        "read_p99_ms": percentile(read_latencies, 99),
+        "write_p99_ms": percentile(write_latencies, 99),
+        "read_errors": errors["read"],
+        "write_errors": errors["write"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite read/write contention benchmark")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to run each profile")
+    parser.add_argument("--readers", type=int, default=8, help="Number of concurrent reader threads")
+    parser.add_argument("--cards", type=int, default=1000, help="Flashcards seeded in the deck")
+    args = parser.parse_args()
+
+    print(f"{'profile':<18}{'reads/s':>10}{'writes/s':>10}{'read p50':>10}{'read p99':>10}{'write p99':>11}{'errors':>8}")
+    for name, pragmas in PROFILES.items():
+        r = run_profile(name, pragmas, args.duration, args.readers, args.cards)
+        print(
+            f"{r['profile']:<18}{r['reads_per_s']:>10.0f}{r['writes_per_s']:>10.0f}"
+            f"{r['read_p50_ms']:>8.2f}ms{r['read_p99_ms']:>8.2f}ms{r['write_p99_ms']:>9.2f}ms"
+            f"{r['read_errors'] + r['write_errors']:>8}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,31 @@
 """
 CRUD operations for database models.
 """
+from sqlalchemy import and_, exists, func, insert, literal, or_, select
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.exc import IntegrityError
 from . import models, schemas
+from .pagination import paginate
 from loguru import logger
-from typing import List, Optional, Dict, Any, Union
+from typing import Callable, Iterator, List, Optional, Dict, Any, Tuple, Union
 from passlib.context import CryptContext
+import os
 import uuid
 import secrets
+import time
 from datetime import datetime, timedelta
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing. Hashes made with another bcrypt cost are rehashed at
+# the next login (see verify_and_update_password)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
 
 def get_password_hash(password: str) -> str:
     """Hash a password for storing."""
@@ -22,10 +35,32 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a stored password against a provided password."""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password against its stored hash.
+
+    Returns:
+        Whether the password matches, and a new hash to store if the stored
+        one was made with other hashing parameters
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 # User CRUD operations
-def create_user(db: Session, user: schemas.UserCreate) -> models.User:
-    """Create a new user."""
-    hashed_password = get_password_hash(user.password)
+# Called with a user ID after the user is updated or deleted or its tokens
+# are revoked, so copies of the user cached outside the database are dropped
+user_change_listeners: List[Callable[[str], None]] = []
+
+def notify_user_changed(user_id: str) -> None:
+    """Run the user change listeners, logging their errors."""
+    for listener in user_change_listeners:
+        try:
+            listener(user_id)
+        except Exception as e:
+            logger.error(f"User change listener failed for user {user_id}: {str(e)}")
+
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None) -> models.User:
+    """Create a new user, hashing its password unless the hash is given."""
+    hashed_password = hashed_password or get_password_hash(user.password)
     db_user = models.User(
         id=str(uuid.uuid4()),
         email=user.email,
@@ -70,16 +105,26 @@ def update_user(db: Session, user_id: str, user_update: schemas.UserUpdate) -> O
             setattr(db_user, key, value)
         db.commit()
         db.refresh(db_user)
+        notify_user_changed(user_id)
         logger.info(f"Updated user: {db_user.username}")
         return db_user
     return None
 
+def update_password_hash(db: Session, user_id: str, hashed_password: str) -> None:
+    """Store a new hash of a user's password."""
+    db.query(models.User).filter(models.User.id == user_id).update(
+        {models.User.hashed_password: hashed_password}, synchronize_session=False
+    )
+    db.commit()
+    logger.info(f"Rehashed password of user: {user_id}")
+
 def delete_user(db: Session, user_id: str) -> bool:
     """Delete a user."""
     db_user = get_user(db, user_id)
     if db_user:
         db.delete(db_user)
         db.commit()
+        notify_user_changed(user_id)
         logger.info(f"Deleted user: {db_user.username}")
         return True
     return False
@@ -91,6 +136,7 @@ def create_document(db: Session, document: schemas.DocumentCreate, owner_id: str
         id=str(uuid.uuid4()),
         filename=document.filename,
         mime_type=document.mime_type,
+        content_sha256=document.content_sha256,
         file_path=file_path,
         owner_id=owner_id,
         status=models.DocumentStatus.UPLOADED.value
@@ -105,9 +151,13 @@ def get_document(db: Session, document_id: str) -> Optional[models.Document]:
     """Get a document by ID."""
     return db.query(models.Document).filter(models.Document.id == document_id).first()
 
-def get_documents_by_owner(db: Session, owner_id: str, skip: int = 0, limit: int = 100) -> List[models.Document]:
-    """Get documents by owner ID."""
-    return db.query(models.Document).filter(models.Document.owner_id == owner_id).offset(skip).limit(limit).all()
+def get_documents_by_owner(db: Session, owner_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[models.Document]:
+    """Get documents by owner ID, ordered by (created_at, id)."""
+    query = db.query(models.Document).filter(models.Document.owner_id == owner_id)
+    return paginate(
+        query, models.Document.created_at, models.Document.id, db.get_bind().dialect.name,
+        skip=skip, limit=limit, cursor=cursor
+    ).all()
 
 def update_document_status(db: Session, document_id: str, status: str, error_message: Optional[str] = None) -> Optional[models.Document]:
     """Update a document's status."""
@@ -122,15 +172,35 @@ def update_document_status(db: Session, document_id: str, status: str, error_mes
         return db_document
     return None
 
-def delete_document(db: Session, document_id: str) -> bool:
-    """Delete a document."""
+def delete_document(db: Session, document_id: str, delete_file: Optional[Callable[[str], None]] = None) -> bool:
+    """
+    Delete a document.
+
+    Args:
+        db: Database session.
+        document_id: ID of the document.
+        delete_file: Called with the document's file path when no other
+            document is stored in that file. It runs after the row is deleted
+            and before the transaction commits, so an identical upload cannot
+            be saved in between.
+
+    Returns:
+        True if the document existed.
+    """
     db_document = get_document(db, document_id)
-    if db_document:
+    if not db_document:
+        return False
+    try:
         db.delete(db_document)
+        db.flush()
+        if delete_file is not None and count_documents_by_file_path(db, db_document.file_path) == 0:
+            delete_file(db_document.file_path)
         db.commit()
-        logger.info(f"Deleted document: {db_document.filename}")
-        return True
-    return False
+    except Exception:
+        db.rollback()
+        raise
+    logger.info(f"Deleted document: {db_document.filename}")
+    return True
 
 # ExtractedText CRUD operations
 def create_extracted_text(db: Session, extracted_text: schemas.ExtractedTextCreate) -> models.ExtractedText:
@@ -160,9 +230,301 @@ def delete_extracted_text(db: Session, extracted_text_id: str) -> bool:
         return True
     return False
 
+def count_documents_by_file_path(db: Session, file_path: str) -> int:
+    """Count the documents stored in a file; identical uploads share one file."""
+    return db.query(func.count(models.Document.id)).filter(models.Document.file_path == file_path).scalar()
+
+# Content deduplication
+def find_extracted_text_by_content(db: Session, content_sha256: str, exclude_document_id: str) -> Optional[models.ExtractedText]:
+    """
+    Find the extracted text of another document with the same content.
+
+    OCR output depends only on the file, so it is shared across owners.
+
+    Args:
+        db: Database session.
+        content_sha256: SHA-256 of the document content.
+        exclude_document_id: Document looking for a match.
+
+    Returns:
+        The extracted text of an identical document, or None.
+    """
+    return db.query(models.ExtractedText).join(models.Document).filter(
+        models.Document.content_sha256 == content_sha256,
+        models.Document.id != exclude_document_id
+    ).order_by(models.ExtractedText.created_at).first()
+
+def find_reusable_deck(db: Session, content_sha256: str, owner_id: str, exclude_document_id: str) -> Optional[models.Deck]:
+    """
+    Find a non-empty deck generated from another document with the same content.
+
+    Only decks owned by owner_id or public decks are considered: a private
+    deck of another user may hold that user's own edits.
+
+    Args:
+        db: Database session.
+        content_sha256: SHA-256 of the document content.
+        owner_id: Owner of the document looking for a match.
+        exclude_document_id: Document looking for a match.
+
+    Returns:
+        The most recent matching deck, or None.
+    """
+    has_cards = exists().where(models.Flashcard.deck_id == models.Deck.id)
+    return db.query(models.Deck).join(models.Deck.document).filter(
+        models.Document.content_sha256 == content_sha256,
+        models.Document.id != exclude_document_id,
+        or_(models.Deck.owner_id == owner_id, models.Deck.is_public == True),
+        has_cards
+    ).order_by(models.Deck.created_at.desc()).first()
+
+# Processing job operations
+def create_document_with_job(
+    db: Session,
+    document: schemas.DocumentCreate,
+    owner_id: str,
+    file_path: str,
+    max_attempts: int = 3
+) -> models.Document:
+    """
+    Create a document and queue its processing job in one transaction.
+
+    Committing both rows together means an upload is never stored without
+    the job that processes it.
+    """
+    db_document = models.Document(
+        id=str(uuid.uuid4()),
+        filename=document.filename,
+        mime_type=document.mime_type,
+        content_sha256=document.content_sha256,
+        file_path=file_path,
+        owner_id=owner_id,
+        status=models.DocumentStatus.UPLOADED.value
+    )
+    db.add(db_document)
+    db.add(models.ProcessingJob(
+        id=str(uuid.uuid4()),
+        document_id=db_document.id,
+        max_attempts=max_attempts,
+        run_after=datetime.now()
+    ))
+    db.commit()
+    db.refresh(db_document)
+    logger.info(f"Created document and queued processing: {db_document.filename}")
+    return db_document
+
+def enqueue_processing_job(db: Session, document_id: str, max_attempts: int = 3) -> models.ProcessingJob:
+    """Queue a processing job for an existing document."""
+    db_job = models.ProcessingJob(
+        id=str(uuid.uuid4()),
+        document_id=document_id,
+        max_attempts=max_attempts,
+        run_after=datetime.now()
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    logger.info(f"Queued processing job {db_job.id} for document: {document_id}")
+    return db_job
+
+def get_processing_job(db: Session, job_id: str) -> Optional[models.ProcessingJob]:
+    """Get a processing job by ID."""
+    return db.query(models.ProcessingJob).filter(models.ProcessingJob.id == job_id).first()
+
+def _runnable_job_filter(now: datetime):
+    """Jobs that are due, or whose worker lost its lease with attempts left."""
+    job = models.ProcessingJob
+    return or_(
+        and_(job.status == models.JobStatus.QUEUED.value, job.run_after <= now),
+        and_(
+            job.status == models.JobStatus.RUNNING.value,
+            job.lease_expires_at < now,
+            job.attempts < job.max_attempts
+        )
+    )
+
+def claim_processing_job(db: Session, worker_id: str, lease_seconds: float, candidates: int = 5) -> Optional[models.ProcessingJob]:
+    """
+    Claim the next runnable processing job for a worker.
+
+    The claim is a conditional UPDATE that only matches while the job is
+    still runnable, so when several workers race for the same row exactly
+    one of them sees a matched row and the others move on to the next
+    candidate.
+
+    Args:
+        db: Database session
+        worker_id: Identifier stored as the lease owner
+        lease_seconds: Seconds until the lease expires without a heartbeat
+        candidates: Runnable jobs tried per call
+
+    Returns:
+        The claimed job, or None if no job is runnable
+    """
+    now = datetime.now()
+    runnable = _runnable_job_filter(now)
+    job_ids = [
+        job_id for (job_id,) in db.query(models.ProcessingJob.id)
+        .filter(runnable)
+        .order_by(models.ProcessingJob.run_after, models.ProcessingJob.created_at)
+        .limit(candidates)
+    ]
+    for job_id in job_ids:
+        claimed = db.query(models.ProcessingJob).filter(
+            models.ProcessingJob.id == job_id, runnable
+        ).update({
+            models.ProcessingJob.status: models.JobStatus.RUNNING.value,
+            models.ProcessingJob.lease_owner: worker_id,
+            models.ProcessingJob.lease_expires_at: now + timedelta(seconds=lease_seconds),
+            models.ProcessingJob.attempts: models.ProcessingJob.attempts + 1,
+            models.ProcessingJob.updated_at: now
+        }, synchronize_session=False)
+        db.commit()
+        if claimed:
+            logger.info(f"Worker {worker_id} claimed processing job: {job_id}")
+            return get_processing_job(db, job_id)
+    return None
+
+def extend_job_lease(db: Session, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+    """Extend the lease of a running job, returning False if the worker no longer holds it."""
+    extended = db.query(models.ProcessingJob).filter(
+        models.ProcessingJob.id == job_id,
+        models.ProcessingJob.status == models.JobStatus.RUNNING.value,
+        models.ProcessingJob.lease_owner == worker_id
+    ).update({
+        models.ProcessingJob.lease_expires_at: datetime.now() + timedelta(seconds=lease_seconds)
+    }, synchronize_session=False)
+    db.commit()
+    return bool(extended)
+
+def update_job_stage(db: Session, job: models.ProcessingJob, stage: str) -> None:
+    """Record the stage a job has reached on the job and on its document."""
+    job.stage = stage
+    db.query(models.Document).filter(models.Document.id == job.document_id).update(
+        {models.Document.status: stage}, synchronize_session=False
+    )
+    db.commit()
+    logger.info(f"Processing job {job.id} stage -> {stage}")
+
+def complete_processing_job(db: Session, job_id: str, worker_id: str) -> bool:
+    """Mark a job held by worker_id as succeeded."""
+    completed = db.query(models.ProcessingJob).filter(
+        models.ProcessingJob.id == job_id,
+        models.ProcessingJob.lease_owner == worker_id
+    ).update({
+        models.ProcessingJob.status: models.JobStatus.SUCCEEDED.value,
+        models.ProcessingJob.lease_owner: None,
+        models.ProcessingJob.lease_expires_at: None,
+        models.ProcessingJob.last_error: None
+    }, synchronize_session=False)
+    db.commit()
+    return bool(completed)
+
+def fail_processing_job(
+    db: Session,
+    job_id: str,
+    worker_id: str,
+    error: str,
+    retry_delay: float
+) -> Optional[models.ProcessingJob]:
+    """
+    Record a failed attempt of a job held by worker_id.
+
+    The job is queued again after retry_delay * 2 ** (attempts - 1) seconds
+    while it has attempts left. After the last attempt the job and its
+    document are marked as failed.
+
+    Returns:
+        The updated job, or None if the worker no longer holds its lease
+    """
+    db_job = get_processing_job(db, job_id)
+    if not db_job or db_job.lease_owner != worker_id:
+        return None
+    db_job.last_error = error
+    db_job.lease_owner = None
+    db_job.lease_expires_at = None
+    if db_job.attempts < db_job.max_attempts:
+        db_job.status = models.JobStatus.QUEUED.value
+        db_job.run_after = datetime.now() + timedelta(seconds=retry_delay * 2 ** (db_job.attempts - 1))
+        logger.warning(f"Processing job {job_id} attempt {db_job.attempts} failed, retrying at {db_job.run_after}: {error}")
+    else:
+        db_job.status = models.JobStatus.FAILED.value
+        db.query(models.Document).filter(models.Document.id == db_job.document_id).update({
+            models.Document.status: models.DocumentStatus.ERROR.value,
+            models.Document.error_message: error
+        }, synchronize_session=False)
+        logger.error(f"Processing job {job_id} failed after {db_job.attempts} attempts: {error}")
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def release_processing_job(db: Session, job_id: str, worker_id: str, delay: float, reason: str) -> bool:
+    """
+    Put a job held by worker_id back in the queue without using up an attempt.
+
+    Used when the job could not start because a downstream service is
+    known to be unavailable.
+    """
+    released = db.query(models.ProcessingJob).filter(
+        models.ProcessingJob.id == job_id,
+        models.ProcessingJob.lease_owner == worker_id
+    ).update({
+        models.ProcessingJob.status: models.JobStatus.QUEUED.value,
+        models.ProcessingJob.attempts: models.ProcessingJob.attempts - 1,
+        models.ProcessingJob.run_after: datetime.now() + timedelta(seconds=delay),
+        models.ProcessingJob.lease_owner: None,
+        models.ProcessingJob.lease_expires_at: None,
+        models.ProcessingJob.last_error: reason
+    }, synchronize_session=False)
+    db.commit()
+    if released:
+        logger.info(f"Released processing job {job_id} for {delay:.0f}s: {reason}")
+    return bool(released)
+
+def fail_expired_processing_jobs(db: Session) -> int:
+    """
+    Fail running jobs whose lease expired on their last attempt.
+
+    Such jobs are not runnable again, so their documents are marked as
+    failed here instead of staying in a processing state forever.
+
+    Returns:
+        Number of failed jobs
+    """
+    job = models.ProcessingJob
+    exhausted = and_(
+        job.status == models.JobStatus.RUNNING.value,
+        job.lease_expires_at < datetime.now(),
+        job.attempts >= job.max_attempts
+    )
+    error = "Processing did not finish before its lease expired"
+    db.query(models.Document).filter(
+        models.Document.id.in_(select(job.document_id).where(exhausted))
+    ).update({
+        models.Document.status: models.DocumentStatus.ERROR.value,
+        models.Document.error_message: error
+    }, synchronize_session=False)
+    failed = db.query(job).filter(exhausted).update({
+        job.status: models.JobStatus.FAILED.value,
+        job.lease_owner: None,
+        job.lease_expires_at: None,
+        job.last_error: error
+    }, synchronize_session=False)
+    db.commit()
+    if failed:
+        logger.error(f"Failed {failed} processing jobs with expired leases")
+    return failed
+
+def count_processing_jobs(db: Session) -> Dict[str, int]:
+    """Count processing jobs by status."""
+    counts = {job_status.value: 0 for job_status in models.JobStatus}
+    rows = db.query(models.ProcessingJob.status, func.count()).group_by(models.ProcessingJob.status)
+    counts.update({job_status: count for job_status, count in rows})
+    return counts
+
 # Deck CRUD operations
-def create_deck(db: Session, deck: schemas.DeckCreate, owner_id: str) -> models.Deck:
-    """Create a new deck."""
+def create_deck(db: Session, deck: schemas.DeckCreate, owner_id: str, commit: bool = True) -> models.Deck:
+    """Create a new deck; pass commit=False to let the caller commit."""
     db_deck = models.Deck(
         id=str(uuid.uuid4()),
         title=deck.title,
@@ -172,7 +534,10 @@ def create_deck(db: Session, deck: schemas.DeckCreate, owner_id: str) -> models.
         document_id=deck.document_id
     )
     db.add(db_deck)
-    db.commit()
+    if commit:
+        db.commit()
+    else:
+        db.flush()
     db.refresh(db_deck)
     logger.info(f"Created deck: {db_deck.title}")
     return db_deck
@@ -181,13 +546,57 @@ def get_deck(db: Session, deck_id: str) -> Optional[models.Deck]:
     """Get a deck by ID."""
     return db.query(models.Deck).filter(models.Deck.id == deck_id).first()
 
-def get_decks_by_owner(db: Session, owner_id: str, skip: int = 0, limit: int = 100) -> List[models.Deck]:
-    """Get decks by owner ID."""
-    return db.query(models.Deck).filter(models.Deck.owner_id == owner_id).offset(skip).limit(limit).all()
+def get_deck_by_document(db: Session, document_id: str) -> Optional[models.Deck]:
+    """Get the deck generated from a document."""
+    return db.query(models.Deck).filter(models.Deck.document_id == document_id).first()
+
+def load_deck_flashcards(
+    db: Session,
+    db_deck: models.Deck,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> List[models.Flashcard]:
+    """
+    Load the flashcards of a deck into deck.flashcards.
+
+    The cards are fetched with one indexed query ordered by (created_at, id)
+    and attached as the loaded collection, so serializing deck.flashcards
+    does not lazy load again. Without a limit every card is returned; pass a
+    limit (and the cursor of the previous page) to read a large deck page by
+    page.
+    """
+    flashcards = get_flashcards_by_deck(db, db_deck.id, limit=limit, cursor=cursor)
+    # Attach without flagging the collection as modified
+    set_committed_value(db_deck, "flashcards", flashcards)
+    return flashcards
+
+def get_deck_with_flashcards(
+    db: Session,
+    deck_id: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Optional[models.Deck]:
+    """Get a deck with its flashcards loaded (see load_deck_flashcards)."""
+    db_deck = get_deck(db, deck_id)
+    if db_deck:
+        load_deck_flashcards(db, db_deck, limit=limit, cursor=cursor)
+    return db_deck
 
-def get_public_decks(db: Session, skip: int = 0, limit: int = 100) -> List[models.Deck]:
-    """Get public decks."""
-    return db.query(models.Deck).filter(models.Deck.is_public == True).offset(skip).limit(limit).all()
+def get_decks_by_owner(db: Session, owner_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[models.Deck]:
+    """Get decks by owner ID, ordered by (created_at, id)."""
+    query = db.query(models.Deck).filter(models.Deck.owner_id == owner_id)
+    return paginate(
+        query, models.Deck.created_at, models.Deck.id, db.get_bind().dialect.name,
+        skip=skip, limit=limit, cursor=cursor
+    ).all()
+
+def get_public_decks(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[models.Deck]:
+    """Get public decks, ordered by (created_at, id)."""
+    query = db.query(models.Deck).filter(models.Deck.is_public == True)
+    return paginate(
+        query, models.Deck.created_at, models.Deck.id, db.get_bind().dialect.name,
+        skip=skip, limit=limit, cursor=cursor
+    ).all()
 
 def update_deck(db: Session, deck_id: str, deck_update: schemas.DeckUpdate) -> Optional[models.Deck]:
     """Update a deck."""
@@ -198,6 +607,7 @@ def update_deck(db: Session, deck_id: str, deck_update: schemas.DeckUpdate) -> O
             setattr(db_deck, key, value)
         db.commit()
         db.refresh(db_deck)
+        forget_deck_access(db, deck_id)
         logger.info(f"Updated deck: {db_deck.title}")
         return db_deck
     return None
@@ -208,6 +618,7 @@ def delete_deck(db: Session, deck_id: str) -> bool:
     if db_deck:
         db.delete(db_deck)
         db.commit()
+        forget_deck_access(db, deck_id)
         logger.info(f"Deleted deck: {db_deck.title}")
         return True
     return False
@@ -217,12 +628,139 @@ def share_deck(db: Session, deck_id: str, user_id: str) -> bool:
     db_deck = get_deck(db, deck_id)
     db_user = get_user(db, user_id)
     if db_deck and db_user:
-        db_deck.shared_with.append(db_user)
+        # Insert the association row directly instead of appending to
+        # deck.shared_with, which would load the whole share list
+        db.execute(
+            models.user_deck_association.insert().values(user_id=user_id, deck_id=deck_id)
+        )
         db.commit()
+        forget_deck_access(db, deck_id)
         logger.info(f"Shared deck {db_deck.title} with user {db_user.username}")
         return True
     return False
 
+def clone_deck(
+    db: Session,
+    deck_id: str,
+    owner_id: str,
+    title: Optional[str] = None,
+    description: Optional[str] = None,
+    document_id: Optional[str] = None
+) -> Optional[models.Deck]:
+    """
+    Copy a deck and its flashcards into a new private deck.
+
+    The cards are copied with a single INSERT ... SELECT that generates the
+    new UUIDs in the database, so no card passes through Python. Dialects
+    without a UUID function fall back to batched bulk inserts. Either way the
+    clone is created in one transaction.
+
+    Args:
+        db: Database session.
+        deck_id: ID of the deck to copy.
+        owner_id: ID of the user owning the copy.
+        title: Title of the copy, "Copy of <title>" by default.
+        description: Description of the copy, the source description by default.
+        document_id: Document the copy is generated from, if any.
+
+    Returns:
+        The new deck, or None if the source deck does not exist.
+    """
+    source = get_deck(db, deck_id)
+    if not source:
+        return None
+
+    db_deck = models.Deck(
+        id=str(uuid.uuid4()),
+        title=title or f"Copy of {source.title}",
+        description=description if description is not None else source.description,
+        is_public=False,
+        owner_id=owner_id,
+        document_id=document_id
+    )
+    try:
+        db.add(db_deck)
+        db.flush()
+        uuid_expression = models.sql_generate_uuid(db.get_bind().dialect.name)
+        if uuid_expression is not None:
+            result = db.execute(
+                insert(models.Flashcard).from_select(
+                    ["id", "question", "answer", "deck_id", "created_at"],
+                    select(
+                        uuid_expression,
+                        models.Flashcard.question,
+                        models.Flashcard.answer,
+                        literal(db_deck.id),
+                        models.Flashcard.created_at
+                    ).where(models.Flashcard.deck_id == deck_id)
+                )
+            )
+            copied = result.rowcount
+        else:
+            copied = 0
+            for batch in iter_flashcard_batches(db, deck_id):
+                copied += create_flashcards_bulk(db, [
+                    schemas.FlashcardCreate(question=row.question, answer=row.answer, deck_id=db_deck.id)
+                    for row in batch
+                ], commit=False, created_at=[row.created_at for row in batch])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    db.refresh(db_deck)
+    logger.info(f"Cloned deck {deck_id} into {db_deck.id} ({copied} flashcards)")
+    return db_deck
+
+# Seconds a deck access check is memoised on a session
+DECK_ACCESS_CACHE_TTL = 5.0
+DECK_ACCESS_CACHE_KEY = "deck_access"
+
+def deck_access_query(deck_id: str, user_id: str):
+    """Build an EXISTS clause that is true if the user owns, can see or was shared the deck."""
+    shared = exists().where(
+        models.user_deck_association.c.deck_id == models.Deck.id,
+        models.user_deck_association.c.user_id == user_id
+    )
+    return exists().where(
+        models.Deck.id == deck_id,
+        or_(models.Deck.owner_id == user_id, models.Deck.is_public == True, shared)
+    )
+
+def get_cached_deck_access(db, deck_id: str, user_id: str) -> Optional[bool]:
+    """Return a memoised access check from the session, or None if absent or expired."""
+    cached = db.info.get(DECK_ACCESS_CACHE_KEY, {}).get((deck_id, user_id))
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    return None
+
+def cache_deck_access(db, deck_id: str, user_id: str, allowed: bool) -> None:
+    """Memoise an access check on the session for DECK_ACCESS_CACHE_TTL seconds."""
+    cache = db.info.setdefault(DECK_ACCESS_CACHE_KEY, {})
+    cache[(deck_id, user_id)] = (time.monotonic() + DECK_ACCESS_CACHE_TTL, allowed)
+
+def forget_deck_access(db, deck_id: str) -> None:
+    """Drop memoised access checks for a deck after its visibility changed."""
+    cache = db.info.get(DECK_ACCESS_CACHE_KEY)
+    if cache:
+        for key in [key for key in cache if key[0] == deck_id]:
+            del cache[key]
+
+def user_can_read_deck(db: Session, deck_id: str, user_id: str) -> bool:
+    """
+    Check whether a user can read a deck.
+
+    A user can read decks they own, public decks and decks shared with them.
+    This runs a single EXISTS query instead of loading deck.shared_with, and
+    the result is memoised on the session (one per request) for
+    DECK_ACCESS_CACHE_TTL seconds.
+    """
+    allowed = get_cached_deck_access(db, deck_id, user_id)
+    if allowed is None:
+        allowed = bool(db.query(deck_access_query(deck_id, user_id)).scalar())
+        cache_deck_access(db, deck_id, user_id, allowed)
+    return allowed
+
 # Flashcard CRUD operations
 def create_flashcard(db: Session, flashcard: schemas.FlashcardCreate) -> models.Flashcard:
     """Create a new flashcard."""
@@ -238,13 +776,101 @@ def create_flashcard(db: Session, flashcard: schemas.FlashcardCreate) -> models.
     logger.info(f"Created flashcard in deck: {flashcard.deck_id}")
     return db_flashcard
 
+def create_flashcards_bulk(
+    db: Session,
+    flashcards: List[schemas.FlashcardCreate],
+    return_rows: bool = False,
+    commit: bool = True,
+    created_at: Optional[List[Optional[datetime]]] = None
+) -> Union[int, List[models.Flashcard]]:
+    """
+    Create many flashcards in a single transaction.
+
+    Rows are sent as one executemany batch instead of an INSERT, COMMIT and
+    SELECT per card.
+
+    Args:
+        db: Database session.
+        flashcards: Flashcards to create.
+        return_rows: Return the created rows (via INSERT ... RETURNING), in the order given,
+            instead of a count.
+        commit: Commit the transaction; pass False to let the caller commit.
+        created_at: Creation time of each flashcard, in the same order; the
+            current time is used where None or not given.
+
+    Returns:
+        The created flashcards if return_rows is True, otherwise the number created.
+    """
+    if not flashcards:
+        return [] if return_rows else 0
+
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "question": flashcard.question,
+            "answer": flashcard.answer,
+            "deck_id": flashcard.deck_id
+        }
+        for flashcard in flashcards
+    ]
+    if created_at is not None:
+        for row, timestamp in zip(rows, created_at):
+            if timestamp is not None:
+                row["created_at"] = timestamp
+    expire_on_commit = db.expire_on_commit
+    try:
+        if return_rows:
+            created = list(db.scalars(
+                insert(models.Flashcard).returning(models.Flashcard, sort_by_parameter_order=True), rows
+            ))
+            # RETURNING already loaded the rows; don't expire them and
+            # trigger one SELECT per flashcard on first attribute access
+            db.expire_on_commit = False
+        else:
+            db.execute(insert(models.Flashcard), rows)
+        if commit:
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+    logger.info(f"Created {len(rows)} flashcards in bulk")
+    return created if return_rows else len(rows)
+
+def iter_flashcard_batches(db: Session, deck_id: str, batch_size: int = 1000) -> Iterator[List[Any]]:
+    """
+    Yield the flashcards of a deck in batches of column rows.
+
+    Rows are ordered by (created_at, id) and fetched with yield_per (a
+    server-side cursor where the driver supports it) without building ORM
+    objects, so memory stays bounded by batch_size whatever the deck size.
+    """
+    columns = [column for column in models.Flashcard.__table__.columns]
+    result = db.execute(
+        select(*columns)
+        .where(models.Flashcard.deck_id == deck_id)
+        .order_by(models.Flashcard.created_at, models.Flashcard.id)
+        .execution_options(yield_per=batch_size)
+    )
+    try:
+        for batch in result.partitions():
+            yield batch
+    finally:
+        result.close()
+
 def get_flashcard(db: Session, flashcard_id: str) -> Optional[models.Flashcard]:
     """Get a flashcard by ID."""
     return db.query(models.Flashcard).filter(models.Flashcard.id == flashcard_id).first()
 
-def get_flashcards_by_deck(db: Session, deck_id: str, skip: int = 0, limit: int = 100) -> List[models.Flashcard]:
-    """Get flashcards by deck ID."""
-    return db.query(models.Flashcard).filter(models.Flashcard.deck_id == deck_id).offset(skip).limit(limit).all()
+def get_flashcards_by_deck(db: Session, deck_id: str, skip: int = 0, limit: Optional[int] = 100, cursor: Optional[str] = None) -> List[models.Flashcard]:
+    """Get flashcards by deck ID, ordered by (created_at, id)."""
+    query = db.query(models.Flashcard).filter(models.Flashcard.deck_id == deck_id)
+    return paginate(
+        query, models.Flashcard.created_at, models.Flashcard.id, db.get_bind().dialect.name,
+        skip=skip, limit=limit, cursor=cursor
+    ).all()
 
 def update_flashcard(db: Session, flashcard_id: str, flashcard_update: schemas.FlashcardUpdate) -> Optional[models.Flashcard]:
     """Update a flashcard."""
@@ -269,6 +895,23 @@ def delete_flashcard(db: Session, flashcard_id: str) -> bool:
         return True
     return False
 
+# Study session CRUD operations
+def get_study_sessions_by_user(db: Session, user_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[models.StudySession]:
+    """Get study sessions by user ID, ordered by (started_at, id)."""
+    query = db.query(models.StudySession).filter(models.StudySession.user_id == user_id)
+    return paginate(
+        query, models.StudySession.started_at, models.StudySession.id, db.get_bind().dialect.name,
+        skip=skip, limit=limit, cursor=cursor
+    ).all()
+
+def get_study_records_by_session(db: Session, session_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[models.StudyRecord]:
+    """Get study records by session ID, ordered by (created_at, id)."""
+    query = db.query(models.StudyRecord).filter(models.StudyRecord.session_id == session_id)
+    return paginate(
+        query, models.StudyRecord.created_at, models.StudyRecord.id, db.get_bind().dialect.name,
+        skip=skip, limit=limit, cursor=cursor
+    ).all()
+
 # Authentication functions
 def authenticate_user(db: Session, username: str, password: str) -> Optional[models.User]:
     """Authenticate a user by username and password."""
@@ -355,6 +998,7 @@ def revoke_all_user_tokens(db: Session, user_id: str) -> int:
         count += 1
 
     db.commit()
+    notify_user_changed(user_id)
     logger.info(f"Revoked {count} refresh tokens for user: {user_id}")
     return count
 
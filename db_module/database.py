@@ -2,7 +2,9 @@
 Database connection and session management for the flashcards application.
 """
 import os
-from sqlalchemy import create_engine
+from typing import Any, Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from loguru import logger
 from pathlib import Path
@@ -45,20 +47,147 @@ SQLALCHEMY_DATABASE_URL = os.getenv(
     "DATABASE_URL", "sqlite:///./flashcards.db"
 )
 
-# Create engine with proper settings for SQLite
-connect_args = {}
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    connect_args["check_same_thread"] = False
+# Connection pool settings (applied to server databases such as PostgreSQL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
 
-engine = create_engine(
+# SQLite pragmas set on every new connection.
+# WAL lets readers proceed while a writer holds the database, and
+# synchronous=NORMAL is durable across application crashes in WAL mode.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-64000")),  # negative value = KiB (64 MB)
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", "268435456")),  # 256 MB
+}
+
+def is_sqlite_url(database_url: str) -> bool:
+    """Check whether a database URL points to SQLite."""
+    return make_url(database_url).get_backend_name() == "sqlite"
+
+def get_engine_options(database_url: str) -> Dict[str, Any]:
+    """
+    Build create_engine keyword arguments for a database URL.
+
+    Args:
+        database_url: SQLAlchemy database URL.
+
+    Returns:
+        Pool settings for server databases, or SQLite connect_args.
+    """
+    if is_sqlite_url(database_url):
+        # SQLite picks its own pool class (StaticPool/QueuePool)
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+def set_sqlite_pragmas(dbapi_connection, pragmas: Dict[str, Any]):
+    """Apply PRAGMA statements to a raw SQLite DBAPI connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def register_sqlite_pragmas(engine: Engine, pragmas: Optional[Dict[str, Any]] = None):
+    """
+    Apply SQLite pragmas to every connection opened by an engine.
+
+    Args:
+        engine: Synchronous engine (use async_engine.sync_engine for async engines).
+        pragmas: Pragmas to set, defaults to SQLITE_PRAGMAS.
+    """
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        set_sqlite_pragmas(dbapi_connection, pragmas)
+
+def create_db_engine(database_url: str, pragmas: Optional[Dict[str, Any]] = None, **kwargs) -> Engine:
+    """
+    Create an engine using the configured pool or SQLite pragma profile.
+
+    Args:
+        database_url: SQLAlchemy database URL.
+        pragmas: SQLite pragmas overriding SQLITE_PRAGMAS.
+        **kwargs: Extra create_engine arguments.
+
+    Returns:
+        Configured SQLAlchemy engine.
+    """
+    options = get_engine_options(database_url)
+    options.update(kwargs)
+    db_engine = create_engine(database_url, **options)
+    if is_sqlite_url(database_url):
+        register_sqlite_pragmas(db_engine, pragmas)
+    return db_engine
+
+engine = create_db_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args=connect_args,
     echo=os.getenv("SQL_ECHO", "false").lower() == "true"
 )
 
 # Create sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers used for each synchronous backend
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Derive the async driver URL from a synchronous database URL.
+
+    Args:
+        database_url: SQLAlchemy URL using a synchronous driver.
+
+    Returns:
+        The same URL using the matching async driver
+        (aiosqlite for SQLite, asyncpg for PostgreSQL).
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend: {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+# Async engine and sessionmaker (optional: requires aiosqlite or asyncpg)
+try:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    ASYNC_SQLALCHEMY_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or get_async_database_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(
+        ASYNC_SQLALCHEMY_DATABASE_URL,
+        echo=os.getenv("SQL_ECHO", "false").lower() == "true",
+        **({} if is_sqlite_url(ASYNC_SQLALCHEMY_DATABASE_URL) else get_engine_options(ASYNC_SQLALCHEMY_DATABASE_URL))
+    )
+    if is_sqlite_url(ASYNC_SQLALCHEMY_DATABASE_URL):
+        register_sqlite_pragmas(async_engine.sync_engine)
+    # expire_on_commit=False so ORM objects stay readable after commit
+    # without an implicit (and, under asyncio, illegal) lazy refresh
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+    ASYNC_SUPPORT = True
+except (ImportError, ValueError) as e:
+    ASYNC_SQLALCHEMY_DATABASE_URL = None
+    async_engine = None
+    AsyncSessionLocal = None
+    ASYNC_SUPPORT = False
+    logger.warning(f"Async database driver not available - async sessions disabled: {str(e)}")
+
 # Create base class for models
 Base = declarative_base()
 
@@ -75,10 +204,34 @@ def get_db():
         db.close()
         logger.debug("Database session closed")
 
+async def get_async_db():
+    """
+    Async counterpart of get_db for FastAPI endpoints.
+    Yields an AsyncSession so queries do not block the event loop.
+    """
+    if not ASYNC_SUPPORT:
+        raise RuntimeError("Async database support is not available (install aiosqlite or asyncpg)")
+    async with AsyncSessionLocal() as db:
+        logger.debug("Async database session created")
+        yield db
+    logger.debug("Async database session closed")
+
+async def dispose_async_engine():
+    """
+    Close all pooled async connections.
+    Should be called when the application shuts down.
+    """
+    if async_engine is not None:
+        await async_engine.dispose()
+        logger.info("Async database engine disposed")
+
 def init_db():
     """
     Initialize the database by creating all tables.
     Should be called when the application starts.
+
+    Tables that already exist are left untouched; existing databases are
+    brought up to date with `alembic upgrade head` (see migrations/README).
     """
     logger.info(f"Initializing database at {SQLALCHEMY_DATABASE_URL}")
     Base.metadata.create_all(bind=engine)
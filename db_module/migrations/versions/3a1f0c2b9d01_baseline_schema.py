@@ -0,0 +1,153 @@
+"""baseline schema
+
+Revision ID: 3a1f0c2b9d01
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+Schema as created by init_db() before migrations were introduced.
+Databases created with init_db() can be marked as migrated with
+`alembic stamp 3a1f0c2b9d01` and then upgraded normally.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a1f0c2b9d01'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('username', sa.String(length=50), nullable=False),
+        sa.Column('hashed_password', sa.String(length=255), nullable=False),
+        sa.Column('full_name', sa.String(length=100), nullable=True),
+        sa.Column('role', sa.String(length=20), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+
+    op.create_table(
+        'documents',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('file_path', sa.String(length=512), nullable=False),
+        sa.Column('mime_type', sa.String(length=100), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('owner_id', sa.String(length=36), nullable=False),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'refresh_tokens',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('token', sa.String(length=255), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('revoked', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_refresh_tokens_token', 'refresh_tokens', ['token'], unique=True)
+
+    op.create_table(
+        'extracted_texts',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('document_id', sa.String(length=36), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('document_id')
+    )
+
+    op.create_table(
+        'decks',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('is_public', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('owner_id', sa.String(length=36), nullable=False),
+        sa.Column('document_id', sa.String(length=36), nullable=True),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id']),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'flashcards',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('question', sa.Text(), nullable=False),
+        sa.Column('answer', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('deck_id', sa.String(length=36), nullable=False),
+        sa.ForeignKeyConstraint(['deck_id'], ['decks.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'user_deck_association',
+        sa.Column('user_id', sa.String(length=36), nullable=True),
+        sa.Column('deck_id', sa.String(length=36), nullable=True),
+        sa.ForeignKeyConstraint(['deck_id'], ['decks.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'])
+    )
+
+    op.create_table(
+        'study_sessions',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('ended_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('deck_id', sa.String(length=36), nullable=False),
+        sa.ForeignKeyConstraint(['deck_id'], ['decks.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'study_records',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('ease_factor', sa.Float(), nullable=True),
+        sa.Column('interval', sa.Integer(), nullable=True),
+        sa.Column('is_correct', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('session_id', sa.String(length=36), nullable=False),
+        sa.Column('flashcard_id', sa.String(length=36), nullable=False),
+        sa.ForeignKeyConstraint(['flashcard_id'], ['flashcards.id']),
+        sa.ForeignKeyConstraint(['session_id'], ['study_sessions.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('study_records')
+    op.drop_table('study_sessions')
+    op.drop_table('user_deck_association')
+    op.drop_table('flashcards')
+    op.drop_table('decks')
+    op.drop_table('extracted_texts')
+    op.drop_index('ix_refresh_tokens_token', table_name='refresh_tokens')
+    op.drop_table('refresh_tokens')
+    op.drop_table('documents')
+    op.drop_index('ix_users_username', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
@@ -0,0 +1,44 @@
+"""add indexes for foreign-key filters
+
+Revision ID: 7c4e2d8a5b12
+Revises: 3a1f0c2b9d01
+Create Date: 2026-10-17 09:30:00.000000
+
+Indexes the hot list/filter columns so deck, flashcard, document and study
+listings no longer scan their whole table. The composite indexes also serve
+the (created_at, id) ordering of the listings.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4e2d8a5b12'
+down_revision = '3a1f0c2b9d01'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_flashcards_deck_id_created_at', 'flashcards', ['deck_id', 'created_at', 'id'])
+    op.create_index('ix_decks_owner_id_created_at', 'decks', ['owner_id', 'created_at', 'id'])
+    op.create_index('ix_decks_is_public_created_at', 'decks', ['is_public', 'created_at', 'id'])
+    op.create_index('ix_documents_owner_id_created_at', 'documents', ['owner_id', 'created_at', 'id'])
+    op.create_index('ix_study_sessions_user_id_started_at', 'study_sessions', ['user_id', 'started_at', 'id'])
+    op.create_index('ix_study_sessions_deck_id', 'study_sessions', ['deck_id'])
+    op.create_index('ix_study_records_session_id_created_at', 'study_records', ['session_id', 'created_at', 'id'])
+    op.create_index('ix_study_records_flashcard_id', 'study_records', ['flashcard_id'])
+    op.create_index('ix_refresh_tokens_user_id', 'refresh_tokens', ['user_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_refresh_tokens_user_id', table_name='refresh_tokens')
+    op.drop_index('ix_study_records_flashcard_id', table_name='study_records')
+    op.drop_index('ix_study_records_session_id_created_at', table_name='study_records')
+    op.drop_index('ix_study_sessions_deck_id', table_name='study_sessions')
+    op.drop_index('ix_study_sessions_user_id_started_at', table_name='study_sessions')
+    op.drop_index('ix_documents_owner_id_created_at', table_name='documents')
+    op.drop_index('ix_decks_is_public_created_at', table_name='decks')
+    op.drop_index('ix_decks_owner_id_created_at', table_name='decks')
+    op.drop_index('ix_flashcards_deck_id_created_at', table_name='flashcards')
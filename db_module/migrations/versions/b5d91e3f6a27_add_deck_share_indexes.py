@@ -0,0 +1,29 @@
+"""add indexes for deck share lookups
+
+Revision ID: b5d91e3f6a27
+Revises: 7c4e2d8a5b12
+Create Date: 2026-10-17 11:00:00.000000
+
+Deck access checks probe user_deck_association by (deck_id, user_id), and
+the shared-decks listing of a user filters it by user_id.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d91e3f6a27'
+down_revision = '7c4e2d8a5b12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_user_deck_association_deck_id_user_id', 'user_deck_association', ['deck_id', 'user_id'])
+    op.create_index('ix_user_deck_association_user_id', 'user_deck_association', ['user_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_deck_association_user_id', table_name='user_deck_association')
+    op.drop_index('ix_user_deck_association_deck_id_user_id', table_name='user_deck_association')
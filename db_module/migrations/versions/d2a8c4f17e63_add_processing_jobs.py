@@ -0,0 +1,50 @@
+"""add processing_jobs table
+
+Revision ID: d2a8c4f17e63
+Revises: b5d91e3f6a27
+Create Date: 2026-10-17 12:00:00.000000
+
+Document processing moves from in-process background tasks to a durable
+job queue read by a separate worker pool. Resumed jobs look up the deck
+already generated from their document, hence the decks.document_id index.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a8c4f17e63'
+down_revision = 'b5d91e3f6a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'processing_jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('stage', sa.String(length=50), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('run_after', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('lease_owner', sa.String(length=100), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('document_id', sa.String(length=36), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_processing_jobs_status_run_after', 'processing_jobs', ['status', 'run_after', 'created_at'])
+    op.create_index('ix_processing_jobs_document_id', 'processing_jobs', ['document_id'])
+    op.create_index('ix_decks_document_id', 'decks', ['document_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_decks_document_id', table_name='decks')
+    op.drop_index('ix_processing_jobs_document_id', table_name='processing_jobs')
+    op.drop_index('ix_processing_jobs_status_run_after', table_name='processing_jobs')
+    op.drop_table('processing_jobs')
@@ -0,0 +1,33 @@
+"""add documents.content_sha256
+
+Revision ID: e7b3f9a2c410
+Revises: d2a8c4f17e63
+Create Date: 2026-10-17 14:00:00.000000
+
+Uploads are stored under the SHA-256 of their content. The digest is kept
+on the document so that the OCR text and flashcards of an identical upload
+can be found and reused. Documents uploaded before this revision have no
+digest and are never matched.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3f9a2c410'
+down_revision = 'd2a8c4f17e63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.add_column(sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    op.create_index('ix_documents_content_sha256', 'documents', ['content_sha256'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_content_sha256', table_name='documents')
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_column('content_sha256')
@@ -0,0 +1,44 @@
+"""store keyset pagination timestamps with microseconds
+
+Revision ID: f4c6a8e1d935
+Revises: e7b3f9a2c410
+Create Date: 2026-10-17 16:00:00.000000
+
+SQLite keeps DateTime columns as text. Rows that took the CURRENT_TIMESTAMP
+server default were stored without a fractional part, while SQLAlchemy
+writes six fractional digits, and cursor pagination compares the text of
+both. The sort columns now get a client-side default; this revision rewrites
+the rows stored before it in the same form. Other databases store native
+timestamps and are left unchanged.
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c6a8e1d935'
+down_revision = 'e7b3f9a2c410'
+branch_labels = None
+depends_on = None
+
+SORT_COLUMNS = [
+    ('documents', 'created_at'),
+    ('decks', 'created_at'),
+    ('flashcards', 'created_at'),
+    ('study_sessions', 'started_at'),
+    ('study_records', 'created_at'),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table, column in SORT_COLUMNS:
+        op.execute(
+            f"UPDATE {table} SET {column} = {column} || '.000000' WHERE length({column}) = 19"
+        )
+
+
+def downgrade() -> None:
+    # The fractional digits are valid for the previous revision as well
+    pass
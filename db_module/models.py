@@ -3,19 +3,48 @@ SQLAlchemy models for the flashcards application.
 """
 from sqlalchemy import (
     Boolean, Column, ForeignKey, Integer, String,
-    Text, DateTime, Float, Table, Enum
+    Text, DateTime, Float, Table, Enum, Index
 )
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, literal_column
 import enum
 from .database import Base
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 def generate_uuid():
     """Generate a UUID string for use as a primary key."""
     return str(uuid.uuid4())
 
+def utcnow():
+    """
+    Current UTC time, naive like CURRENT_TIMESTAMP.
+
+    Used as the client-side default of the keyset pagination sort columns, so
+    that SQLite stores them in SQLAlchemy's text form with microseconds, the
+    form pagination binds cursor values in.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# SQL expressions generating a random UUID string per row, used by
+# INSERT ... SELECT statements that create many rows at once
+SQL_UUID_EXPRESSIONS = {
+    "sqlite": (
+        "lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-4' || "
+        "substr(hex(randomblob(2)), 2) || '-' || "
+        "substr('89ab', abs(random()) % 4 + 1, 1) || substr(hex(randomblob(2)), 2) || '-' || "
+        "hex(randomblob(6)))"
+    ),
+    "postgresql": "gen_random_uuid()::text",
+    "mysql": "uuid()",
+    "mariadb": "uuid()",
+}
+
+def sql_generate_uuid(dialect_name: str):
+    """Return a SQL expression generating a UUID string, or None if the dialect has none."""
+    expression = SQL_UUID_EXPRESSIONS.get(dialect_name)
+    return literal_column(expression) if expression else None
+
 class UserRole(enum.Enum):
     """User roles for authorization."""
     USER = "user"
@@ -30,12 +59,21 @@ class DocumentStatus(enum.Enum):
     FLASHCARD_COMPLETE = "flashcard_complete"
     ERROR = "error"
 
+class JobStatus(enum.Enum):
+    """Status of a document-processing job in the queue."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
 # Association table for many-to-many relationship between users and decks
 user_deck_association = Table(
     "user_deck_association",
     Base.metadata,
     Column("user_id", String(36), ForeignKey("users.id")),
     Column("deck_id", String(36), ForeignKey("decks.id")),
+    Index("ix_user_deck_association_deck_id_user_id", "deck_id", "user_id"),
+    Index("ix_user_deck_association_user_id", "user_id"),
 )
 
 class User(Base):
@@ -66,14 +104,21 @@ class User(Base):
 class Document(Base):
     """Document model for storing uploaded files."""
     __tablename__ = "documents"
+    __table_args__ = (
+        # Owner listings, ordered by creation date (id breaks ties)
+        Index("ix_documents_owner_id_created_at", "owner_id", "created_at", "id"),
+        # Identical uploads, whose OCR and flashcard results are reused
+        Index("ix_documents_content_sha256", "content_sha256"),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     filename = Column(String(255), nullable=False)
     file_path = Column(String(512), nullable=False)
     mime_type = Column(String(100), nullable=False)
+    content_sha256 = Column(String(64))
     status = Column(String(50), default=DocumentStatus.UPLOADED.value)
     error_message = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Foreign keys
@@ -82,6 +127,7 @@ class Document(Base):
     # Relationships
     owner = relationship("User", back_populates="documents")
     extracted_text = relationship("ExtractedText", back_populates="document", uselist=False)
+    processing_jobs = relationship("ProcessingJob", back_populates="document", cascade="all, delete-orphan")
     decks = relationship("Deck", back_populates="document")
 
 class ExtractedText(Base):
@@ -101,12 +147,19 @@ class ExtractedText(Base):
 class Deck(Base):
     """Deck of flashcards."""
     __tablename__ = "decks"
+    __table_args__ = (
+        # Owner listings and the public catalogue, ordered by creation date
+        Index("ix_decks_owner_id_created_at", "owner_id", "created_at", "id"),
+        Index("ix_decks_is_public_created_at", "is_public", "created_at", "id"),
+        # Deck generated from a document, looked up when processing resumes
+        Index("ix_decks_document_id", "document_id"),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     title = Column(String(255), nullable=False)
     description = Column(Text)
     is_public = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Foreign keys
@@ -127,11 +180,15 @@ class Deck(Base):
 class Flashcard(Base):
     """Flashcard with question and answer."""
     __tablename__ = "flashcards"
+    __table_args__ = (
+        # Cards of a deck, ordered by creation date
+        Index("ix_flashcards_deck_id_created_at", "deck_id", "created_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     question = Column(Text, nullable=False)
     answer = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Foreign keys
@@ -144,14 +201,18 @@ class Flashcard(Base):
 class StudySession(Base):
     """Study session tracking."""
     __tablename__ = "study_sessions"
+    __table_args__ = (
+        # A user's sessions, ordered by start date
+        Index("ix_study_sessions_user_id_started_at", "user_id", "started_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     ended_at = Column(DateTime(timezone=True))
 
     # Foreign keys
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
-    deck_id = Column(String(36), ForeignKey("decks.id"), nullable=False)
+    deck_id = Column(String(36), ForeignKey("decks.id"), nullable=False, index=True)
 
     # Relationships
     user = relationship("User", back_populates="study_sessions")
@@ -161,16 +222,20 @@ class StudySession(Base):
 class StudyRecord(Base):
     """Individual flashcard study record within a session."""
     __tablename__ = "study_records"
+    __table_args__ = (
+        # Records of a session, ordered by creation date
+        Index("ix_study_records_session_id_created_at", "session_id", "created_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     ease_factor = Column(Float, default=2.5)  # For spaced repetition algorithm
     interval = Column(Integer, default=0)  # Days until next review
     is_correct = Column(Boolean)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
 
     # Foreign keys
     session_id = Column(String(36), ForeignKey("study_sessions.id"), nullable=False)
-    flashcard_id = Column(String(36), ForeignKey("flashcards.id"), nullable=False)
+    flashcard_id = Column(String(36), ForeignKey("flashcards.id"), nullable=False, index=True)
 
     # Relationships
     session = relationship("StudySession", back_populates="records")
@@ -187,7 +252,7 @@ class RefreshToken(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Foreign keys
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False, index=True)
 
     # Relationships
     user = relationship("User", back_populates="refresh_tokens")
@@ -201,3 +266,29 @@ class RefreshToken(Base):
     def is_valid(self):
         """Check if the token is valid (not expired and not revoked)."""
         return not self.revoked and not self.is_expired
+
+class ProcessingJob(Base):
+    """Durable queue entry for processing an uploaded document."""
+    __tablename__ = "processing_jobs"
+    __table_args__ = (
+        # Claim order: runnable jobs by status and due time
+        Index("ix_processing_jobs_status_run_after", "status", "run_after", "created_at"),
+    )
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    status = Column(String(20), default=JobStatus.QUEUED.value, nullable=False)
+    stage = Column(String(50))  # DocumentStatus of the step being run
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_after = Column(DateTime(timezone=True), nullable=False)
+    lease_owner = Column(String(100))
+    lease_expires_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Foreign keys
+    document_id = Column(String(36), ForeignKey("documents.id"), nullable=False, index=True)
+
+    # Relationships
+    document = relationship("Document", back_populates="processing_jobs")
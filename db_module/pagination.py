@@ -0,0 +1,88 @@
+"""
+Keyset (cursor) pagination helpers.
+
+List queries are ordered by (created_at, id) and continue after the last row
+of the previous page instead of using OFFSET, so every page costs the same
+index seek regardless of depth. Cursors are opaque URL-safe strings.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import String, literal, tuple_
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(sort_value: datetime, row_id: str) -> str:
+    """Encode the sort key of a row into an opaque cursor."""
+    payload = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), str(row_id)
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+def _bind_sort_value(sort_value: datetime, dialect_name: str):
+    """
+    Bind a cursor timestamp so it compares like the stored value.
+
+    SQLite stores DateTime columns as text, which SQLAlchemy always writes
+    with six fractional digits (a whole second as ".000000"), so the cursor
+    value is rendered the same way before the text comparison.
+    """
+    if dialect_name != "sqlite":
+        return sort_value
+    return literal(sort_value.strftime("%Y-%m-%d %H:%M:%S.%f"), String)
+
+def paginate(
+    query,
+    sort_column,
+    id_column,
+    dialect_name: str,
+    skip: int = 0,
+    limit: Optional[int] = 100,
+    cursor: Optional[str] = None
+):
+    """
+    Order a Query/Select by (sort_column, id_column) and apply a page window.
+
+    Args:
+        query: ORM Query or Select to paginate.
+        sort_column: Timestamp column used as the primary sort key.
+        id_column: Primary key column breaking ties.
+        dialect_name: Name of the database dialect.
+        skip: Offset, only used without a cursor (backward compatibility).
+        limit: Maximum number of rows, or None for no limit.
+        cursor: Cursor returned with the previous page.
+
+    Returns:
+        The paginated query.
+    """
+    query = query.order_by(sort_column, id_column)
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(sort_column, id_column) > tuple_(_bind_sort_value(sort_value, dialect_name), row_id)
+        )
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+def next_cursor(items: List[Any], limit: int, sort_attr: str = "created_at") -> Optional[str]:
+    """Return the cursor of the page after items, or None if items is the last page."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(getattr(last, sort_attr), last.id)
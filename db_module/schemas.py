@@ -87,7 +87,7 @@ class DocumentBase(BaseModel):
     mime_type: str
 
 class DocumentCreate(DocumentBase):
-    pass
+    content_sha256: Optional[str] = None
 
 class DocumentUpdate(BaseModel):
     status: Optional[str] = None
@@ -96,6 +96,7 @@ class DocumentUpdate(BaseModel):
 class DocumentInDB(DocumentBase):
     id: str
     file_path: str
+    content_sha256: Optional[str] = None
     status: str
     error_message: Optional[str] = None
     owner_id: str
@@ -153,6 +154,9 @@ class Deck(DeckInDB):
 class DeckWithFlashcards(Deck):
     flashcards: List['Flashcard'] = []
 
+class DeckImportResult(Deck):
+    imported_count: int
+
 # Flashcard schemas
 class FlashcardBase(BaseModel):
     question: str
@@ -5,6 +5,7 @@ import pytest
 from db_module import crud, schemas, models
 from sqlalchemy.exc import IntegrityError
 import uuid
+from datetime import datetime, timedelta, timezone
 
 def test_create_user(db_session):
     """Test creating a user."""
@@ -104,6 +105,16 @@ def test_delete_user(db_session, test_user):
     result = crud.delete_user(db_session, non_existent_id)
     assert result is False
 
+def test_user_changes_are_reported(db_session, test_user, monkeypatch):
+    """Test that user updates, deletion and token revocation notify the listeners."""
+    changed = []
+    monkeypatch.setattr(crud, "user_change_listeners", [changed.append])
+    crud.update_user(db_session, test_user.id, schemas.UserUpdate(full_name="Updated Name"))
+    crud.revoke_all_user_tokens(db_session, test_user.id)
+    crud.delete_user(db_session, test_user.id)
+    crud.update_user(db_session, test_user.id, schemas.UserUpdate(full_name="Gone"))
+    assert changed == [test_user.id] * 3
+
 def test_create_document(db_session, test_user):
     """Test creating a document."""
     document_data = schemas.DocumentCreate(
@@ -195,6 +206,95 @@ def test_get_extracted_text_by_document(db_session, test_document, test_extracte
     extracted_text = crud.get_extracted_text_by_document(db_session, non_existent_id)
     assert extracted_text is None
 
+def test_create_document_with_job(db_session, test_user):
+    """Test that an upload is stored together with its queued job."""
+    document = crud.create_document_with_job(
+        db_session, schemas.DocumentCreate(filename="scan.png", mime_type="image/png"),
+        test_user.id, "/tmp/scan.png", max_attempts=5
+    )
+    assert document.status == models.DocumentStatus.UPLOADED.value
+    assert len(document.processing_jobs) == 1
+    job = document.processing_jobs[0]
+    assert job.status == models.JobStatus.QUEUED.value
+    assert job.attempts == 0
+    assert job.max_attempts == 5
+    assert crud.count_processing_jobs(db_session)[models.JobStatus.QUEUED.value] == 1
+
+def test_claim_processing_job(db_session, test_document):
+    """Test that a job is claimed once and leased to the claiming worker."""
+    job = crud.enqueue_processing_job(db_session, test_document.id)
+
+    claimed = crud.claim_processing_job(db_session, "worker-a", lease_seconds=60)
+    assert claimed.id == job.id
+    assert claimed.status == models.JobStatus.RUNNING.value
+    assert claimed.lease_owner == "worker-a"
+    assert claimed.attempts == 1
+
+    # A leased job is not handed to another worker
+    assert crud.claim_processing_job(db_session, "worker-b", lease_seconds=60) is None
+    assert crud.extend_job_lease(db_session, job.id, "worker-a", lease_seconds=60)
+    assert not crud.extend_job_lease(db_session, job.id, "worker-b", lease_seconds=60)
+
+    crud.update_job_stage(db_session, claimed, models.DocumentStatus.OCR_PROCESSING.value)
+    db_session.refresh(test_document)
+    assert test_document.status == models.DocumentStatus.OCR_PROCESSING.value
+
+    assert crud.complete_processing_job(db_session, job.id, "worker-a")
+    db_session.refresh(claimed)
+    assert claimed.status == models.JobStatus.SUCCEEDED.value
+    assert claimed.lease_owner is None
+
+def test_claim_processing_job_after_lease_expiry(db_session, test_document):
+    """Test that a job whose worker stopped renewing its lease is reclaimed."""
+    job = crud.enqueue_processing_job(db_session, test_document.id)
+    crud.claim_processing_job(db_session, "worker-a", lease_seconds=60)
+    job.lease_expires_at = datetime.now() - timedelta(seconds=1)
+    db_session.commit()
+
+    reclaimed = crud.claim_processing_job(db_session, "worker-b", lease_seconds=60)
+    assert reclaimed.id == job.id
+    assert reclaimed.lease_owner == "worker-b"
+    assert reclaimed.attempts == 2
+    # The old worker can no longer complete the job
+    assert not crud.complete_processing_job(db_session, job.id, "worker-a")
+
+def test_fail_processing_job_retries_then_fails(db_session, test_document):
+    """Test exponential retry scheduling and the final failure."""
+    job = crud.enqueue_processing_job(db_session, test_document.id, max_attempts=2)
+
+    crud.claim_processing_job(db_session, "worker-a", lease_seconds=60)
+    before = datetime.now()
+    retried = crud.fail_processing_job(db_session, job.id, "worker-a", "OCR timeout", retry_delay=30)
+    assert retried.status == models.JobStatus.QUEUED.value
+    assert retried.last_error == "OCR timeout"
+    assert retried.run_after >= before + timedelta(seconds=30)
+    # Not runnable until the retry delay has passed
+    assert crud.claim_processing_job(db_session, "worker-a", lease_seconds=60) is None
+
+    retried.run_after = datetime.now() - timedelta(seconds=1)
+    db_session.commit()
+    crud.claim_processing_job(db_session, "worker-a", lease_seconds=60)
+    failed = crud.fail_processing_job(db_session, job.id, "worker-a", "LLM error", retry_delay=30)
+    assert failed.status == models.JobStatus.FAILED.value
+    assert failed.attempts == 2
+    db_session.refresh(test_document)
+    assert test_document.status == models.DocumentStatus.ERROR.value
+    assert test_document.error_message == "LLM error"
+
+def test_fail_expired_processing_jobs(db_session, test_document):
+    """Test that a job lost on its last attempt fails instead of staying running."""
+    job = crud.enqueue_processing_job(db_session, test_document.id, max_attempts=1)
+    crud.claim_processing_job(db_session, "worker-a", lease_seconds=60)
+    job.lease_expires_at = datetime.now() - timedelta(seconds=1)
+    db_session.commit()
+
+    assert crud.claim_processing_job(db_session, "worker-b", lease_seconds=60) is None
+    assert crud.fail_expired_processing_jobs(db_session) == 1
+    db_session.refresh(job)
+    db_session.refresh(test_document)
+    assert job.status == models.JobStatus.FAILED.value
+    assert test_document.status == models.DocumentStatus.ERROR.value
+
 def test_create_deck(db_session, test_user, test_document):
     """Test creating a deck."""
     deck_data = schemas.DeckCreate(
@@ -219,6 +319,178 @@ def test_get_deck(db_session, test_deck):
     deck = crud.get_deck(db_session, non_existent_id)
     assert deck is None
 
+def _other_user(db_session):
+    return crud.create_user(db_session, schemas.UserCreate(
+        email="other@example.com", username="otheruser", password="Password123"
+    ))
+
+def test_user_can_read_deck(db_session, test_user, test_deck):
+    """Test deck access for owners, strangers, shared users and public decks."""
+    other = _other_user(db_session)
+    assert crud.user_can_read_deck(db_session, test_deck.id, test_user.id) is True
+    assert crud.user_can_read_deck(db_session, test_deck.id, other.id) is False
+    assert crud.user_can_read_deck(db_session, str(uuid.uuid4()), test_user.id) is False
+
+    # Sharing invalidates the memoised denial
+    assert crud.share_deck(db_session, test_deck.id, other.id) is True
+    assert crud.user_can_read_deck(db_session, test_deck.id, other.id) is True
+
+    stranger = crud.create_user(db_session, schemas.UserCreate(
+        email="stranger@example.com", username="stranger", password="Password123"
+    ))
+    assert crud.user_can_read_deck(db_session, test_deck.id, stranger.id) is False
+    crud.update_deck(db_session, test_deck.id, schemas.DeckUpdate(is_public=True))
+    assert crud.user_can_read_deck(db_session, test_deck.id, stranger.id) is True
+
+def test_user_can_read_deck_is_memoised(db_session, db_engine, test_deck):
+    """Test that repeated checks on one session run a single query until the TTL expires."""
+    from sqlalchemy import event
+    other = _other_user(db_session)
+    deck_id, other_id = test_deck.id, other.id
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        for _ in range(3):
+            assert crud.user_can_read_deck(db_session, deck_id, other_id) is False
+        assert len(statements) == 1
+        assert "EXISTS" in statements[0]
+
+        # Expired entries are checked again
+        key = (deck_id, other_id)
+        db_session.info[crud.DECK_ACCESS_CACHE_KEY][key] = (0, False)
+        crud.user_can_read_deck(db_session, deck_id, other_id)
+        assert len(statements) == 2
+    finally:
+        event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
+
+def test_get_deck_with_flashcards(db_session, test_deck):
+    """Test loading a deck with all of its flashcards, or one page of them."""
+    crud.create_flashcards_bulk(db_session, [
+        schemas.FlashcardCreate(question=f"Q{i}", answer=f"A{i}", deck_id=test_deck.id)
+        for i in range(150)
+    ])
+    deck = crud.get_deck_with_flashcards(db_session, test_deck.id)
+    all_ids = [card.id for card in deck.flashcards]
+    assert len(all_ids) == 150
+    assert deck not in db_session.dirty
+
+    page = crud.get_deck_with_flashcards(db_session, test_deck.id, limit=40)
+    assert [card.id for card in page.flashcards] == all_ids[:40]
+    assert crud.get_deck_with_flashcards(db_session, str(uuid.uuid4())) is None
+
+def test_iter_flashcard_batches(db_session, test_deck):
+    """Test reading a deck's flashcards in ordered batches."""
+    crud.create_flashcards_bulk(db_session, [
+        schemas.FlashcardCreate(question=f"Q{i}", answer=f"A{i}", deck_id=test_deck.id)
+        for i in range(250)
+    ])
+    batches = list(crud.iter_flashcard_batches(db_session, test_deck.id, batch_size=100))
+    assert [len(batch) for batch in batches] == [100, 100, 50]
+    ids = [row.id for batch in batches for row in batch]
+    assert ids == [card.id for card in crud.get_flashcards_by_deck(db_session, test_deck.id, limit=None)]
+
+def test_clone_deck(db_session, db_engine, test_deck, test_flashcard, monkeypatch):
+    """Test cloning a deck with a single INSERT ... SELECT."""
+    import re
+    from sqlalchemy import event
+    other = _other_user(db_session)
+    # Distinct creation times, so the deck order does not depend on the random ids
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    crud.create_flashcards_bulk(db_session, [
+        schemas.FlashcardCreate(question=f"Q{i}", answer=f"A{i}", deck_id=test_deck.id)
+        for i in range(500)
+    ], created_at=[start + timedelta(seconds=i) for i in range(500)])
+    deck_id, other_id = test_deck.id, other.id
+    inserts = []
+
+    def count_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO flashcards"):
+            inserts.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", count_inserts)
+    try:
+        clone = crud.clone_deck(db_session, deck_id, other_id)
+    finally:
+        event.remove(db_engine, "before_cursor_execute", count_inserts)
+
+    assert len(inserts) == 1 and "SELECT" in inserts[0]
+    assert clone.title == "Copy of Test Deck"
+    assert clone.owner_id == other_id
+    assert clone.is_public is False
+    cards = crud.get_flashcards_by_deck(db_session, clone.id, limit=None)
+    source = crud.get_flashcards_by_deck(db_session, deck_id, limit=None)
+    assert [(c.question, c.answer) for c in cards] == [(c.question, c.answer) for c in source]
+    assert not {c.id for c in cards} & {c.id for c in source}
+    uuid_re = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$")
+    assert all(uuid_re.match(c.id) for c in cards)
+
+    # Dialects without a UUID function copy the cards in bulk batches
+    monkeypatch.setattr(models, "SQL_UUID_EXPRESSIONS", {})
+    fallback = crud.clone_deck(db_session, deck_id, other_id, title="Fallback")
+    assert fallback.title == "Fallback"
+    fallback_cards = crud.get_flashcards_by_deck(db_session, fallback.id, limit=None)
+    assert [(c.question, c.answer) for c in fallback_cards] == [(c.question, c.answer) for c in source]
+
+    assert crud.clone_deck(db_session, str(uuid.uuid4()), other_id) is None
+
+def _document_with_content(db_session, owner_id, content_sha256):
+    return crud.create_document(db_session, schemas.DocumentCreate(
+        filename="syllabus.pdf", mime_type="application/pdf", content_sha256=content_sha256
+    ), owner_id, f"/uploads/{content_sha256}.pdf")
+
+def test_delete_document_deletes_file_with_last_document(db_session, test_user):
+    """Test that the file callback runs once no other document is stored in the file."""
+    digest = "c" * 64
+    first = _document_with_content(db_session, test_user.id, digest)
+    second = _document_with_content(db_session, test_user.id, digest)
+    deleted = []
+
+    assert crud.delete_document(db_session, first.id, delete_file=deleted.append)
+    assert deleted == []
+    assert crud.delete_document(db_session, second.id, delete_file=deleted.append)
+    assert deleted == [f"/uploads/{digest}.pdf"]
+    assert not crud.delete_document(db_session, second.id, delete_file=deleted.append)
+
+    def failing(path):
+        raise OSError("read-only file system")
+
+    third = _document_with_content(db_session, test_user.id, digest)
+    with pytest.raises(OSError):
+        crud.delete_document(db_session, third.id, delete_file=failing)
+    assert crud.get_document(db_session, third.id) is not None
+
+def test_find_results_by_content(db_session, test_user):
+    """Test matching identical documents, with decks limited to owned or public ones."""
+    other = _other_user(db_session)
+    digest = "a" * 64
+    original = _document_with_content(db_session, other.id, digest)
+    duplicate = _document_with_content(db_session, test_user.id, digest)
+    assert crud.count_documents_by_file_path(db_session, original.file_path) == 2
+
+    assert crud.find_extracted_text_by_content(db_session, digest, duplicate.id) is None
+    crud.create_extracted_text(db_session, schemas.ExtractedTextCreate(content="Syllabus", document_id=original.id))
+    # OCR text is shared across owners, but never matched to its own document
+    assert crud.find_extracted_text_by_content(db_session, digest, duplicate.id).content == "Syllabus"
+    assert crud.find_extracted_text_by_content(db_session, digest, original.id) is None
+    assert crud.find_extracted_text_by_content(db_session, "b" * 64, duplicate.id) is None
+
+    deck = crud.create_deck(db_session, schemas.DeckCreate(title="Syllabus", document_id=original.id), owner_id=other.id)
+    crud.create_flashcard(db_session, schemas.FlashcardCreate(question="Q", answer="A", deck_id=deck.id))
+    # Another user's private deck is not reused, their own or a public one is
+    assert crud.find_reusable_deck(db_session, digest, test_user.id, duplicate.id) is None
+    assert crud.find_reusable_deck(db_session, digest, other.id, duplicate.id).id == deck.id
+    crud.update_deck(db_session, deck.id, schemas.DeckUpdate(is_public=True))
+    assert crud.find_reusable_deck(db_session, digest, test_user.id, duplicate.id).id == deck.id
+
+    # Empty decks are not reused
+    empty = _document_with_content(db_session, test_user.id, "c" * 64)
+    crud.create_deck(db_session, schemas.DeckCreate(title="Empty", document_id=empty.id), owner_id=test_user.id)
+    assert crud.find_reusable_deck(db_session, "c" * 64, test_user.id, duplicate.id) is None
+
 def test_create_flashcard(db_session, test_deck):
     """Test creating a flashcard."""
     flashcard_data = schemas.FlashcardCreate(
@@ -241,3 +513,48 @@ def test_get_flashcards_by_deck(db_session, test_deck, test_flashcard):
     non_existent_id = str(uuid.uuid4())
     flashcards = crud.get_flashcards_by_deck(db_session, non_existent_id)
     assert len(flashcards) == 0
+
+def test_create_flashcards_bulk(db_session, test_deck):
+    """Test creating many flashcards in one batch."""
+    flashcards = [
+        schemas.FlashcardCreate(question=f"Question {i}", answer=f"Answer {i}", deck_id=test_deck.id)
+        for i in range(2500)
+    ]
+    count = crud.create_flashcards_bulk(db_session, flashcards)
+    assert count == 2500
+    assert len(crud.get_flashcards_by_deck(db_session, test_deck.id, limit=5000)) == 2500
+
+    # Empty input is a no-op
+    assert crud.create_flashcards_bulk(db_session, []) == 0
+    assert crud.create_flashcards_bulk(db_session, [], return_rows=True) == []
+
+def test_create_flashcards_bulk_single_statement(db_session, db_engine, test_deck):
+    """Test that a bulk insert is sent as a single executemany."""
+    from sqlalchemy import event
+    statements = []
+
+    def count_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO flashcards"):
+            statements.append(executemany)
+
+    event.listen(db_engine, "before_cursor_execute", count_inserts)
+    try:
+        crud.create_flashcards_bulk(db_session, [
+            schemas.FlashcardCreate(question=f"Q{i}", answer=f"A{i}", deck_id=test_deck.id)
+            for i in range(100)
+        ])
+    finally:
+        event.remove(db_engine, "before_cursor_execute", count_inserts)
+    assert statements == [True]
+
+def test_create_flashcards_bulk_return_rows(db_session, test_deck):
+    """Test returning the created flashcards from a bulk insert."""
+    flashcards = [
+        schemas.FlashcardCreate(question="What is 2 + 2?", answer="4", deck_id=test_deck.id),
+        schemas.FlashcardCreate(question="What is 3 + 3?", answer="6", deck_id=test_deck.id),
+    ]
+    created = crud.create_flashcards_bulk(db_session, flashcards, return_rows=True)
+    assert [card.question for card in created] == ["What is 2 + 2?", "What is 3 + 3?"]
+    assert all(card.id and card.deck_id == test_deck.id for card in created)
+    assert created[0].created_at is not None
+    assert crud.get_flashcard(db_session, created[1].id).answer == "6"
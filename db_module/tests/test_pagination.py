@@ -0,0 +1,105 @@
+"""
+Tests for keyset (cursor) pagination.
+"""
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from db_module import crud, schemas
+from db_module.pagination import encode_cursor, decode_cursor, next_cursor
+
+def _walk(fetch, limit):
+    """Follow cursors until the last page and return every row seen."""
+    rows, cursor = [], None
+    while True:
+        page = fetch(limit=limit, cursor=cursor)
+        rows.extend(page)
+        cursor = next_cursor(page, limit)
+        if cursor is None:
+            return rows
+
+def test_cursor_round_trip():
+    """Test that a cursor decodes to the values it was built from."""
+    value = datetime(2024, 5, 1, 12, 30, 45, 123456)
+    cursor = encode_cursor(value, "abc")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (value, "abc")
+
+def test_decode_invalid_cursor():
+    """Test that malformed cursors are rejected."""
+    for cursor in ["not-a-cursor", encode_cursor(datetime.now(), "x")[:-4], ""]:
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+def test_flashcard_cursor_walk_with_timestamp_ties(db_session, test_deck):
+    """Test walking all pages when many rows share the same created_at."""
+    cards = [
+        schemas.FlashcardCreate(question=f"Q{i}", answer=f"A{i}", deck_id=test_deck.id)
+        for i in range(23)
+    ]
+    crud.create_flashcards_bulk(db_session, cards)
+
+    def fetch(limit, cursor):
+        return crud.get_flashcards_by_deck(db_session, test_deck.id, limit=limit, cursor=cursor)
+
+    rows = _walk(fetch, limit=5)
+    ids = [row.id for row in rows]
+    assert len(ids) == 23
+    assert len(set(ids)) == 23
+    assert ids == [row.id for row in crud.get_flashcards_by_deck(db_session, test_deck.id)]
+
+def test_deck_cursor_walk_with_fractional_timestamps(db_session, test_user):
+    """Test walking pages when created_at values carry microseconds."""
+    base = datetime(2024, 1, 1, 8, 0, 0)
+    for i in range(7):
+        deck = crud.create_deck(db_session, schemas.DeckCreate(title=f"Deck {i}"), test_user.id)
+        deck.created_at = base + timedelta(seconds=i // 2, microseconds=250000 * (i % 2))
+    db_session.commit()
+
+    def fetch(limit, cursor):
+        return crud.get_decks_by_owner(db_session, test_user.id, limit=limit, cursor=cursor)
+
+    rows = _walk(fetch, limit=2)
+    assert [row.title for row in rows] == [f"Deck {i}" for i in range(7)]
+
+def test_deck_cursor_walk_with_whole_second_timestamp_on_page_boundary(db_session, test_user):
+    """Test that a page ending on a whole-second created_at is not repeated on the next page."""
+    base = datetime(2024, 1, 1, 8, 0, 0)
+    for i in range(5):
+        deck = crud.create_deck(db_session, schemas.DeckCreate(title=f"Deck {i}"), test_user.id)
+        deck.created_at = base + timedelta(seconds=i)
+    db_session.commit()
+
+    def fetch(limit, cursor):
+        return crud.get_decks_by_owner(db_session, test_user.id, limit=limit, cursor=cursor)
+
+    first = fetch(limit=2, cursor=None)
+    assert first[-1].created_at.microsecond == 0
+    rows = _walk(fetch, limit=2)
+    assert [row.title for row in rows] == [f"Deck {i}" for i in range(5)]
+
+def test_default_created_at_matches_cursor_form(db_engine, db_session, test_deck):
+    """Test that default timestamps are stored with microseconds, like bound cursor values."""
+    crud.create_flashcards_bulk(db_session, [
+        schemas.FlashcardCreate(question="Q", answer="A", deck_id=test_deck.id)
+    ])
+    if db_engine.dialect.name != "sqlite":
+        pytest.skip("text timestamps are specific to SQLite")
+    stored = db_session.execute(text("SELECT created_at FROM flashcards")).scalar_one()
+    assert len(stored) == len("2024-01-01 08:00:00.000000")
+
+def test_skip_limit_still_supported(db_session, test_deck):
+    """Test that offset pagination keeps working alongside cursors."""
+    cards = [
+        schemas.FlashcardCreate(question=f"Q{i}", answer=f"A{i}", deck_id=test_deck.id)
+        for i in range(6)
+    ]
+    crud.create_flashcards_bulk(db_session, cards)
+
+    all_cards = crud.get_flashcards_by_deck(db_session, test_deck.id)
+    page = crud.get_flashcards_by_deck(db_session, test_deck.id, skip=2, limit=3)
+    assert [c.id for c in page] == [c.id for c in all_cards[2:5]]
+
+def test_next_cursor_last_page():
+    """Test that a short page has no next cursor."""
+    assert next_cursor([], 10) is None
+    assert next_cursor([object()], 10) is None
@@ -0,0 +1,91 @@
+"""
+Query plan regression tests.
+
+Runs the list/filter queries issued by crud functions through SQLite's
+EXPLAIN QUERY PLAN and fails unless every table they filter is searched
+through an index, without any table scan or in-memory sort.
+"""
+import re
+
+import pytest
+from sqlalchemy import event
+from db_module import crud
+
+def capture_selects(db_engine, func, *args, **kwargs):
+    """Call a crud function and return the SELECT statements it executed."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        func(*args, **kwargs)
+    finally:
+        event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+INDEX_SEARCH = re.compile(r"^SEARCH (\w+) USING (?:COVERING )?INDEX ")
+
+def query_plan(db_session, statement, parameters):
+    """Return the detail column of a statement's EXPLAIN QUERY PLAN rows."""
+    connection = db_session.connection()
+    plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return [row[-1] for row in plan]
+
+def assert_index_plan(details, tables, name):
+    """Assert that a plan searches each table through an index and never scans or sorts."""
+    searched = {match.group(1) for match in map(INDEX_SEARCH.match, details) if match}
+    scans = [d for d in details if d.startswith("SCAN") and d != "SCAN CONSTANT ROW"]
+    sorts = [d for d in details if "TEMP B-TREE" in d]
+    assert not scans, f"{name} scans a table: {details}"
+    assert not sorts, f"{name} sorts in a temp b-tree: {details}"
+    assert set(tables) <= searched, f"{name} does not search {sorted(set(tables) - searched)} by index: {details}"
+
+CRUD_QUERIES = [
+    ("get_flashcards_by_deck", lambda ids: (ids["deck"],), ["flashcards"]),
+    ("get_decks_by_owner", lambda ids: (ids["user"],), ["decks"]),
+    ("get_public_decks", lambda ids: (), ["decks"]),
+    ("get_documents_by_owner", lambda ids: (ids["user"],), ["documents"]),
+    ("get_study_sessions_by_user", lambda ids: (ids["user"],), ["study_sessions"]),
+    ("get_study_records_by_session", lambda ids: (ids["session"],), ["study_records"]),
+    ("revoke_all_user_tokens", lambda ids: (ids["user"],), ["refresh_tokens"]),
+    ("user_can_read_deck", lambda ids: (ids["deck"], ids["user"]), ["decks", "user_deck_association"]),
+]
+
+@pytest.mark.parametrize("name,make_args,tables", CRUD_QUERIES, ids=[name for name, _, _ in CRUD_QUERIES])
+def test_crud_queries_use_indexes(db_engine, db_session, test_user, test_deck, test_flashcard, name, make_args, tables):
+    """Test that hot crud queries are served by an index."""
+    from db_module.models import StudySession
+    session = StudySession(user_id=test_user.id, deck_id=test_deck.id)
+    db_session.add(session)
+    db_session.commit()
+    ids = {"user": test_user.id, "deck": test_deck.id, "session": session.id}
+
+    statements = capture_selects(db_engine, getattr(crud, name), db_session, *make_args(ids))
+    assert statements, f"{name} issued no SELECT"
+    for statement, parameters in statements:
+        assert_index_plan(query_plan(db_session, statement, parameters), tables, name)
+
+PAGINATED_QUERIES = [name for name, _, _ in CRUD_QUERIES if name.startswith("get_")]
+
+@pytest.mark.parametrize("name", PAGINATED_QUERIES)
+def test_cursor_pages_use_index_order(db_engine, db_session, test_user, test_deck, name):
+    """Test that cursor pages seek the composite index without sorting."""
+    from datetime import datetime
+    from db_module.models import StudySession
+    from db_module.pagination import encode_cursor
+    session = StudySession(user_id=test_user.id, deck_id=test_deck.id)
+    db_session.add(session)
+    db_session.commit()
+    ids = {"user": test_user.id, "deck": test_deck.id, "session": session.id}
+    make_args, tables = {query[0]: query[1:] for query in CRUD_QUERIES}[name]
+    cursor = encode_cursor(datetime(2024, 1, 1), "00000000-0000-0000-0000-000000000000")
+
+    statements = capture_selects(
+        db_engine, getattr(crud, name), db_session, *make_args(ids), limit=10, cursor=cursor
+    )
+    assert statements, f"{name} issued no SELECT"
+    for statement, parameters in statements:
+        assert_index_plan(query_plan(db_session, statement, parameters), tables, name)
@@ -0,0 +1,95 @@
+"""
+Per-page OCR latency of the Tesseract engines.
+
+Renders pages of French text and recognizes them with each engine the way
+extract_text_with_confidence does (image_to_data once per page). The
+pytesseract engine starts the tesseract binary and loads the language
+data for every page; the tesserocr engine is initialized once, and its
+start-up cost is reported separately.
+
+Usage:
+    python -m ocr_service.benchmarks.ocr_engines --pages 20
+"""
+import argparse
+import os
+import statistics
+import textwrap
+import time
+from typing import Callable, List
+
+from PIL import Image, ImageDraw, ImageFont
+
+from ocr_service.src import ocr_engine
+from ocr_service.src.main import layout_text
+
+TEXT = (
+    "La mitose est le processus de division cellulaire au cours duquel une cellule mère "
+    "donne naissance à deux cellules filles génétiquement identiques. Elle se déroule en "
+    "quatre phases : la prophase, la métaphase, l'anaphase et la télophase. Pendant la "
+    "prophase, la chromatine se condense en chromosomes visibles au microscope. "
+)
+
+def render_page(lines: int, seed: int) -> Image.Image:
+    """A grayscale A4 page at 150 dpi with the given number of text lines."""
+    image = Image.new("L", (1240, 1754), color=255)
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 22)
+    except OSError:
+        font = ImageFont.load_default()
+    words = (TEXT * (lines // 3 + 1)).split()
+    words = words[seed % len(words):] + words[:seed % len(words)]
+    for number, line in enumerate(textwrap.wrap(" ".join(words), 90)[:lines]):
+        draw.text((80, 80 + number * 34), line, fill=0, font=font)
+    return image
+
+def percentile(values: List[float], pct: int) -> float:
+    if len(values) < 2:
+        return (values[0] if values else 0.0) * 1000
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1] * 1000
+
+def measure(recognize: Callable[[Image.Image], object], pages: List[Image.Image]) -> List[float]:
+    latencies = []
+    for page in pages:
+        start = time.perf_counter()
+        recognize(page)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page latency of the Tesseract engines")
+    parser.add_argument("--pages", type=int, default=20, help="Pages recognized per engine")
+    parser.add_argument("--lines", type=int, default=30, help="Text lines per page")
+    args = parser.parse_args()
+
+    pages = [render_page(args.lines, seed) for seed in range(args.pages)]
+    print(f"{args.pages} pages of {args.lines} lines, language {ocr_engine.OCR_LANGUAGE}")
+    print(f"{'engine':<12}{'init':>10}{'mean':>10}{'p50':>10}{'p99':>10}")
+
+    for name in ("pytesseract", "tesserocr"):
+        start = time.perf_counter()
+        if name == "tesserocr":
+            if not ocr_engine.TESSEROCR_AVAILABLE:
+                print(f"{name:<12}not installed")
+                continue
+            try:
+                engine = ocr_engine.TesserocrEngine(path=os.getenv("TESSDATA_PREFIX"))
+            except RuntimeError as e:
+                print(f"{name:<12}cannot start: {e}")
+                continue
+        else:
+            engine = ocr_engine.PytesseractEngine()
+        init = time.perf_counter() - start
+
+        try:
+            latencies = measure(lambda page: layout_text(engine.image_to_data(page)), pages)
+        except Exception as e:
+            print(f"{name:<12}failed: {e}")
+            continue
+        print(
+            f"{name:<12}{init * 1000:>8.0f}ms{statistics.mean(latencies) * 1000:>8.0f}ms"
+            f"{percentile(latencies, 50):>8.0f}ms{percentile(latencies, 99):>8.0f}ms"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Query
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -30,18 +31,29 @@ except ImportError:
         def labels(self, *args, **kwargs): return self
     logger.warning("Prometheus dependencies not available. Monitoring disabled.")
 from PIL import Image, ImageEnhance, ImageFilter
-import pytesseract, io
+import asyncio
+import io
+import json
+import math
+import mmap
 import os
+import shutil
+import tempfile
+import time
 import redis
 import cv2
 import numpy as np
-from typing import Dict, Any
+from collections import OrderedDict, deque
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from typing import Dict, Any, AsyncIterator, Callable, Deque, Iterator, List, Optional, Sequence, Union
 try:
     import fitz  # PyMuPDF for PDF support
     PDF_SUPPORT = True
 except ImportError:
     PDF_SUPPORT = False
     logger.warning("PyMuPDF not available - PDF support disabled")
+from .ocr_engine import get_engine
+from .ocr_pool import OCRPool, OCRPoolBusyError, OCRTaskError
 
 logger.add("logs/ocr_{time:YYYY-MM-DD}.log", rotation="1 day", retention="7 days", level="INFO")
 
@@ -51,6 +63,11 @@ redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
 # Check if we're in testing mode
 is_testing = os.getenv("TESTING", "false").lower() == "true"
 
+# OCR worker processes (0 runs OCR on a thread of the service process) and
+# requests allowed to wait for one before the service answers 503
+ocr_workers = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 1)))
+ocr_queue_size = int(os.getenv("OCR_QUEUE_SIZE", str(4 * max(1, ocr_workers))))
+
 # Initialize rate limiter with fallback for testing
 if is_testing:
     # Use memory storage for testing to avoid Redis dependency
@@ -124,10 +141,49 @@ def preprocess_image(image: Image.Image) -> Image.Image:
         logger.warning(f"Image preprocessing failed: {e}, using original image")
         return image
 
+def layout_text(ocr_data: Dict[str, List[Any]]) -> str:
+    """
+    Rebuild the page text from Tesseract word data.
+
+    Lays the words out the way image_to_string does: words of a line are
+    separated by a space, lines by a newline and paragraphs by a blank line.
+
+    Args:
+        ocr_data: Output of image_to_data as a dict
+
+    Returns:
+        The text of the page
+    """
+    words = ocr_data['text']
+    # Word data without layout columns is read as a single line
+    no_layout = [0] * len(words)
+    paragraphs: List[List[List[str]]] = []
+    current_paragraph = current_line = None
+    for word, block, paragraph, line in zip(
+        words,
+        ocr_data.get('block_num', no_layout),
+        ocr_data.get('par_num', no_layout),
+        ocr_data.get('line_num', no_layout)
+    ):
+        word = word.strip()
+        if not word:
+            continue
+        if (block, paragraph) != current_paragraph:
+            current_paragraph, current_line = (block, paragraph), None
+            paragraphs.append([])
+        if line != current_line:
+            current_line = line
+            paragraphs[-1].append([])
+        paragraphs[-1][-1].append(word)
+    return "\n\n".join("\n".join(" ".join(line) for line in lines) for lines in paragraphs)
+
 def extract_text_with_confidence(image: Image.Image, min_confidence: float = 0.0) -> Dict[str, Any]:
     """
     Extract text from image with confidence scores and optional filtering.
 
+    Tesseract runs once: the text is rebuilt from the word data rather than
+    recognized a second time with image_to_string.
+
     Args:
         image: PIL Image object
         min_confidence: Minimum confidence threshold (0-100). Words below this threshold will be filtered out.
@@ -135,40 +191,36 @@ def extract_text_with_confidence(image: Image.Image, min_confidence: float = 0.0
     Returns:
         Dictionary containing extracted text and confidence data
     """
+    engine = get_engine()
     try:
         # Get detailed OCR data with confidence scores
-        ocr_data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT, lang="fra")
-
-        # Extract text and calculate confidence with filtering
-        all_words = []
-        all_confidences = []
-        filtered_words = []
-        filtered_confidences = []
-        low_confidence_words = []
-
-        for i, word in enumerate(ocr_data['text']):
-            if word.strip():  # Only include non-empty words
-                confidence = int(ocr_data['conf'][i])
-                all_words.append(word)
-                all_confidences.append(confidence)
-
-                if confidence >= min_confidence:
-                    filtered_words.append(word)
-                    filtered_confidences.append(confidence)
-                else:
-                    low_confidence_words.append({"word": word, "confidence": confidence})
+        ocr_data = engine.image_to_data(image)
+
+        # Only include non-empty words
+        words = ocr_data['text']
+        present = np.fromiter((bool(word.strip()) for word in words), dtype=bool, count=len(words))
+        all_words = [word for word, keep in zip(words, present) if keep]
+        confidences = np.asarray(ocr_data['conf'], dtype=float)[present].astype(int)
+        kept = confidences >= min_confidence
+
+        filtered_words = [word for word, keep in zip(all_words, kept) if keep]
+        filtered_confidences = confidences[kept]
+        low_confidence_words = [
+            {"word": word, "confidence": int(confidence)}
+            for word, confidence, keep in zip(all_words, confidences, kept) if not keep
+        ]
 
         # Calculate confidence statistics
-        avg_confidence = sum(all_confidences) / len(all_confidences) if all_confidences else 0
-        filtered_avg_confidence = sum(filtered_confidences) / len(filtered_confidences) if filtered_confidences else 0
+        avg_confidence = float(confidences.mean()) if confidences.size else 0
+        filtered_avg_confidence = float(filtered_confidences.mean()) if filtered_confidences.size else 0
 
         # Categorize confidence levels
-        high_confidence_count = len([c for c in all_confidences if c >= 80])
-        medium_confidence_count = len([c for c in all_confidences if 50 <= c < 80])
-        low_confidence_count = len([c for c in all_confidences if c < 50])
+        high_confidence_count = int(np.count_nonzero(confidences >= 80))
+        medium_confidence_count = int(np.count_nonzero((confidences >= 50) & (confidences < 80)))
+        low_confidence_count = int(np.count_nonzero(confidences < 50))
 
         # Get full text (original and filtered)
-        full_text = pytesseract.image_to_string(image, lang="fra").strip()
+        full_text = layout_text(ocr_data)
         filtered_text = " ".join(filtered_words) if filtered_words else ""
 
         return {
@@ -176,8 +228,8 @@ def extract_text_with_confidence(image: Image.Image, min_confidence: float = 0.0
             "filtered_text": filtered_text,
             "words": all_words,
             "filtered_words": filtered_words,
-            "word_confidences": all_confidences,
-            "filtered_confidences": filtered_confidences,
+            "word_confidences": confidences.tolist(),
+            "filtered_confidences": filtered_confidences.tolist(),
             "average_confidence": round(avg_confidence, 2),
             "filtered_average_confidence": round(filtered_avg_confidence, 2),
             "word_count": len(all_words),
@@ -195,7 +247,7 @@ def extract_text_with_confidence(image: Image.Image, min_confidence: float = 0.0
     except Exception as e:
         logger.error(f"OCR with confidence failed: {e}")
         # Fallback to basic OCR
-        text = pytesseract.image_to_string(image, lang="fra").strip()
+        text = engine.image_to_string(image).strip()
         words = text.split()
         return {
             "text": text,
@@ -219,49 +271,372 @@ def extract_text_with_confidence(image: Image.Image, min_confidence: float = 0.0
             }
         }
 
-def extract_text_from_pdf(pdf_content: bytes) -> Dict[str, Any]:
+def ocr_image(contents: Union[bytes, memoryview], min_confidence: float = 0.0) -> Dict[str, Any]:
     """
-    Extract text from PDF document.
+    Preprocess an encoded image and extract its text with confidence scores.
 
     Args:
-        pdf_content: PDF file content as bytes
+        contents: Image file content
+        min_confidence: Minimum confidence threshold (0-100)
 
     Returns:
-        Dictionary containing extracted text from all pages
+        Dictionary containing extracted text and confidence data
+    """
+    image = Image.open(io.BytesIO(contents))
+    return extract_text_with_confidence(preprocess_image(image), min_confidence)
+
+# Uploads below this size are still held in memory by the spooled file
+MMAP_MIN_SIZE = 1024 * 1024
+
+def upload_size(file: UploadFile) -> int:
+    """
+    Size of an uploaded file in bytes, without reading it.
+
+    Args:
+        file: Uploaded file
+
+    Returns:
+        Size in bytes
+    """
+    if file.size is not None:
+        return file.size
+    position = file.file.tell()
+    size = file.file.seek(0, os.SEEK_END)
+    file.file.seek(position)
+    return size
+
+@contextmanager
+def upload_buffer(file: UploadFile, size: int) -> Iterator[Union[bytes, memoryview]]:
+    """
+    Give access to the content of an uploaded file.
+
+    Starlette spools large uploads to a temporary file. Such a file is
+    memory-mapped instead of read, so its content is not copied onto the heap.
+    Small uploads, or files that cannot be mapped, are read as bytes.
+
+    Args:
+        file: Uploaded file
+        size: Size of the file in bytes
+
+    Yields:
+        The file content as a bytes-like object, valid until the block exits
     """
-    if not PDF_SUPPORT:
-        raise HTTPException(status_code=501, detail="PDF support not available")
+    mapped = None
+    if size >= MMAP_MIN_SIZE:
+        try:
+            mapped = mmap.mmap(file.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError) as e:
+            logger.debug(f"Cannot memory-map upload {file.filename}: {e}")
+
+    if mapped is None:
+        file.file.seek(0)
+        yield file.file.read()
+        return
 
+    view = memoryview(mapped)
     try:
-        doc = fitz.open(stream=pdf_content, filetype="pdf")
+        yield view
+    finally:
+        view.release()
+        mapped.close()
+
+# A PDF page whose text layer has fewer characters than this and that
+# contains an image is taken for a scan and OCRed
+PDF_TEXT_MIN_CHARS = int(os.getenv("OCR_PDF_TEXT_MIN_CHARS", "20"))
+# Scanned pages are rasterized at the resolution of their scan, within
+# these bounds, and with at most this many pixels
+PDF_OCR_MIN_DPI = int(os.getenv("OCR_PDF_MIN_DPI", "150"))
+PDF_OCR_MAX_DPI = int(os.getenv("OCR_PDF_MAX_DPI", "300"))
+PDF_OCR_MAX_PIXELS = int(os.getenv("OCR_PDF_MAX_PIXELS", "25000000"))
+
+def raster_dpi(page: "fitz.Page") -> int:
+    """
+    Resolution to rasterize a scanned PDF page at.
+
+    The page is rendered at the resolution of its largest image, so OCR
+    sees the scanned pixels without resampling, kept between
+    PDF_OCR_MIN_DPI and PDF_OCR_MAX_DPI. Large pages get a lower
+    resolution to stay within PDF_OCR_MAX_PIXELS.
+
+    Args:
+        page: PDF page
 
-        all_text = []
-        page_texts = []
+    Returns:
+        Dots per inch
+    """
+    dpi = PDF_OCR_MAX_DPI
+    images = page.get_image_info()
+    if images:
+        largest = max(images, key=lambda image: abs(fitz.Rect(image["bbox"])))
+        width = fitz.Rect(largest["bbox"]).width
+        if width > 0:
+            dpi = min(dpi, max(PDF_OCR_MIN_DPI, round(largest["width"] * 72 / width)))
+    area = page.rect.width * page.rect.height / 72 ** 2  # square inches
+    if area > 0:
+        dpi = min(dpi, int(math.sqrt(PDF_OCR_MAX_PIXELS / area)))
+    return dpi
+
+def extract_pdf_page(page: "fitz.Page") -> Dict[str, Any]:
+    """
+    Extract the text of a PDF page from its text layer, or by OCR for a scan.
+
+    Args:
+        page: PDF page
+
+    Returns:
+        Dictionary with the page number, its text, the method used ("text" or
+        "ocr") and the time spent; for OCR also the resolution and the
+        average confidence
+    """
+    start = time.perf_counter()
+    text = page.get_text().strip()
+    result: Dict[str, Any] = {"page": page.number + 1, "method": "text"}
+
+    if len(text) < PDF_TEXT_MIN_CHARS and page.get_images():
+        dpi = raster_dpi(page)
+        pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+        image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+        ocr_result = extract_text_with_confidence(preprocess_image(image))
+        text = ocr_result["text"]
+        result.update(method="ocr", dpi=dpi, average_confidence=ocr_result["average_confidence"])
+
+    result["text"] = text
+    result["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+# PDFs each worker keeps open for the next pages of a streamed document
+PDF_OPEN_DOCUMENTS = 2
+_open_pdfs: "OrderedDict[str, Any]" = OrderedDict()
+
+@contextmanager
+def pdf_document(source: Union[str, bytes, memoryview]) -> Iterator["fitz.Document"]:
+    """
+    Open a PDF from its content, or from a file that stays open.
+
+    A streamed document reaches a worker one page per task. The files it
+    read last stay open, so a page does not parse the whole document again.
+
+    Args:
+        source: Path of the PDF file, or the PDF content
+
+    Yields:
+        The document
+    """
+    if not isinstance(source, str):
+        doc = fitz.open(stream=source, filetype="pdf")
+        try:
+            yield doc
+        finally:
+            doc.close()
+        return
+
+    doc = _open_pdfs.pop(source, None)
+    if doc is None:
+        doc = fitz.open(source)
+    _open_pdfs[source] = doc
+    while len(_open_pdfs) > PDF_OPEN_DOCUMENTS:
+        _open_pdfs.popitem(last=False)[1].close()
+    yield doc
+
+def pdf_page_count(source: Union[str, bytes, memoryview]) -> int:
+    """Number of pages of a PDF document."""
+    with pdf_document(source) as doc:
+        return len(doc)
+
+def extract_pdf_page_from(source: Union[str, bytes, memoryview], page_num: int) -> Dict[str, Any]:
+    """
+    Extract one page of a PDF document.
 
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            text = page.get_text()
-            page_texts.append({
-                "page": page_num + 1,
-                "text": text.strip()
-            })
-            all_text.append(text)
+    Args:
+        source: Path of the PDF file, or the PDF content
+        page_num: Zero-based page number
+
+    Returns:
+        The page as extract_pdf_page returns it
+    """
+    with pdf_document(source) as doc:
+        return extract_pdf_page(doc.load_page(page_num))
+
+def extract_text_from_pdf(
+    pdf_content: Union[bytes, memoryview],
+    pages: Optional[Sequence[int]] = None
+) -> Dict[str, Any]:
+    """
+    Extract text from PDF document, page by page from the text layer or by OCR.
+
+    Args:
+        pdf_content: PDF file content as bytes or a memoryview over the file
+        pages: Zero-based numbers of the pages to extract, all pages if None
 
+    Returns:
+        Dictionary containing extracted text from the pages
+    """
+    doc = fitz.open(stream=pdf_content, filetype="pdf")
+
+    try:
+        page_texts = [extract_pdf_page(doc.load_page(page_num)) for page_num in (pages or range(len(doc)))]
+    finally:
+        # Release the document's hold on a memory-mapped buffer
         doc.close()
 
-        combined_text = "\n\n".join(all_text).strip()
+    return pdf_result(page_texts)
 
-        return {
-            "text": combined_text,
-            "pages": page_texts,
-            "page_count": len(page_texts),
-            "total_characters": len(combined_text)
-        }
-    except Exception as e:
-        logger.error(f"PDF processing failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
+def pdf_result(page_texts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Assemble the result of a PDF from its pages, in page order."""
+    page_texts = sorted(page_texts, key=lambda page: page["page"])
+    combined_text = "\n\n".join(page["text"] for page in page_texts if page["text"])
 
-app = FastAPI(title="OCR Service")
+    return {
+        "text": combined_text,
+        "pages": page_texts,
+        "page_count": len(page_texts),
+        "total_characters": len(combined_text)
+    }
+
+def resolve_content_type(file: UploadFile) -> str:
+    """
+    Content type of an upload, guessed from the filename when not given.
+
+    Args:
+        file: Uploaded file
+
+    Returns:
+        The content type, or an empty string if it is unknown
+    """
+    content_type = file.content_type or ""
+    filename = (file.filename or "").lower()
+    if not content_type:
+        if filename.endswith('.pdf'):
+            content_type = 'application/pdf'
+        elif filename.endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff')):
+            content_type = 'image/unknown'
+    return content_type
+
+def ndjson_record(record: Dict[str, Any]) -> bytes:
+    """Encode one record of a newline-delimited JSON stream."""
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode()
+
+def sse_record(record: Dict[str, Any], event: str) -> bytes:
+    """Encode one record as a server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(record, ensure_ascii=False)}\n\n".encode()
+
+def busy_exception(exc: OCRPoolBusyError) -> HTTPException:
+    """503 response for a request turned away by a full OCR queue."""
+    return HTTPException(
+        status_code=503,
+        detail="Service OCR surchargé, réessayez plus tard",
+        headers={"Retry-After": str(math.ceil(exc.retry_after))}
+    )
+
+# Each worker loads its Tesseract engine when it starts
+ocr_pool = OCRPool(workers=ocr_workers, queue_size=ocr_queue_size, initializer=get_engine)
+
+async def extract_pdf_in_pool(pdf_content: Union[bytes, memoryview]) -> Dict[str, Any]:
+    """
+    Extract the text of a PDF with its pages spread over the OCR workers.
+
+    Each worker gets an interleaved share of the pages, so scanned pages
+    are spread evenly wherever they are in the document, and the pages are
+    put back in order.
+
+    Args:
+        pdf_content: PDF file content
+
+    Returns:
+        Dictionary containing extracted text from all pages
+
+    Raises:
+        OCRPoolBusyError: If the OCR queue is full
+        OCRTaskError: If the PDF cannot be read
+    """
+    shares = 1
+    if ocr_pool.workers > 1:
+        if ocr_pool.processes:
+            # Copied once here rather than for every share
+            pdf_content = bytes(pdf_content)
+        page_count = await ocr_pool.run(pdf_page_count, pdf_content)
+        shares = min(ocr_pool.workers, page_count)
+    if shares <= 1:
+        return await ocr_pool.run(extract_text_from_pdf, pdf_content)
+
+    results = await asyncio.gather(*(
+        ocr_pool.run(extract_text_from_pdf, pdf_content, range(first, page_count, shares))
+        for first in range(shares)
+    ))
+    return pdf_result([page for result in results for page in result["pages"]])
+
+async def run_when_free(function: Callable[..., Any], *args: Any) -> Any:
+    """Run a task on the OCR pool, waiting for room in its queue when it is full."""
+    while True:
+        try:
+            return await ocr_pool.run(function, *args)
+        except OCRPoolBusyError as e:
+            await asyncio.sleep(min(e.retry_after, 5.0))
+
+async def pdf_stream_source(file: UploadFile, resources: ExitStack) -> Union[str, bytes, memoryview]:
+    """
+    The content of an uploaded PDF, in the form the OCR workers read pages from.
+
+    Worker processes open the document from a temporary copy of the upload
+    instead of receiving it with every page. Released with resources.
+
+    Args:
+        file: Uploaded PDF
+        resources: Owner of the copy or of the buffer
+
+    Returns:
+        Path of the copy, or the content for workers running on a thread
+    """
+    if not ocr_pool.processes:
+        return resources.enter_context(upload_buffer(file, upload_size(file)))
+
+    def copy() -> str:
+        with tempfile.NamedTemporaryFile(prefix="ocr-", suffix=".pdf", delete=False) as spool:
+            file.file.seek(0)
+            shutil.copyfileobj(file.file, spool)
+        return spool.name
+
+    path = await run_in_threadpool(copy)
+    resources.callback(os.unlink, path)
+    return path
+
+async def pdf_page_records(source: Union[str, bytes, memoryview], page_count: int) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Extract the pages of a PDF on the OCR workers, in page order.
+
+    At most one page per worker is in flight, so memory does not grow with
+    the length of the document and the first page comes back as soon as it
+    is extracted.
+
+    Args:
+        source: PDF as returned by pdf_stream_source
+        page_count: Number of pages
+
+    Yields:
+        Page records with the page number, the page count, the text, the
+        method and the time spent
+    """
+    pending: Deque[asyncio.Future] = deque()
+    next_page = 0
+    try:
+        while pending or next_page < page_count:
+            while next_page < page_count and len(pending) < ocr_pool.workers:
+                pending.append(asyncio.ensure_future(run_when_free(extract_pdf_page_from, source, next_page)))
+                next_page += 1
+            page = await pending.popleft()
+            yield {"page": page["page"], "page_count": page_count, **page}
+    finally:
+        # Pages already on a worker still read the source, which is only
+        # released once they are done
+        await asyncio.gather(*pending, return_exceptions=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ocr_pool.start()
+    yield
+    ocr_pool.shutdown()
+
+app = FastAPI(title="OCR Service", lifespan=lifespan)
 
 # Add rate limiter state and exception handler
 app.state.limiter = limiter
@@ -332,7 +707,6 @@ async def extract_text(
     Returns:
         JSON response with extracted text, confidence scores, and filtering statistics
     """
-    import time
     start_time = time.time()
 
     logger.info("Received file {name} (content_type={ct})", name=file.filename, ct=file.content_type)
@@ -343,21 +717,13 @@ async def extract_text(
     # Start MLflow tracking for this OCR operation
     with ocr_tracker.track_ocr_operation("text_extraction"):
         try:
-            # Read file content
-            contents = await file.read()
-            file_size = len(contents)
+            # The content is read in place from the spooled upload, not copied
+            file_size = upload_size(file)
 
             # Determine file type from content_type or filename
-            content_type = file.content_type or ""
+            content_type = resolve_content_type(file)
             filename = file.filename or ""
 
-            # If content_type is None, try to determine from filename
-            if not content_type:
-                if filename.lower().endswith('.pdf'):
-                    content_type = 'application/pdf'
-                elif filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff')):
-                    content_type = 'image/unknown'
-
             # Log file metadata
             ocr_tracker.log_file_metadata(filename,
                                         "pdf" if content_type == 'application/pdf' else "image",
@@ -365,8 +731,15 @@ async def extract_text(
 
             # Handle PDF files
             if content_type == 'application/pdf':
+                if not PDF_SUPPORT:
+                    raise HTTPException(status_code=501, detail="PDF support not available")
                 logger.info(f"Processing PDF file: {file.filename}")
-                result = extract_text_from_pdf(contents)
+                with upload_buffer(file, file_size) as contents:
+                    try:
+                        result = await extract_pdf_in_pool(contents)
+                    except OCRTaskError as e:
+                        logger.error(f"PDF processing failed: {e}")
+                        raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
 
                 # Record Prometheus metrics
                 processing_time = time.time() - start_time
@@ -382,6 +755,7 @@ async def extract_text(
                     "pages": result["pages"],
                     "page_count": result["page_count"],
                     "total_characters": result["total_characters"],
+                    "ocr_page_count": sum(1 for page in result["pages"] if page.get("method") == "ocr"),
                     "status": "success"
                 }
 
@@ -389,12 +763,10 @@ async def extract_text(
             elif content_type.startswith('image/'):
                 logger.info(f"Processing image file: {file.filename}")
 
-                # Load and preprocess image
-                original_image = Image.open(io.BytesIO(contents))
-                processed_image = preprocess_image(original_image)
-
-                # Extract text with confidence scores and filtering
-                ocr_result = extract_text_with_confidence(processed_image, min_confidence)
+                # Preprocess and extract text with confidence scores and
+                # filtering on an OCR worker
+                with upload_buffer(file, file_size) as contents:
+                    ocr_result = await ocr_pool.run(ocr_image, contents, min_confidence)
 
                 # Log confidence metrics to MLflow
                 ocr_tracker.log_confidence_metrics(ocr_result, min_confidence)
@@ -442,6 +814,10 @@ async def extract_text(
                            (" et PDF" if PDF_SUPPORT else "")
                 )
 
+        except OCRPoolBusyError as e:
+            ocr_operations_total.labels(status="rejected_busy", file_type="unknown").inc()
+            ocr_active_requests.dec()
+            raise busy_exception(e)
         except HTTPException:
             # Decrement active requests for HTTP exceptions
             ocr_active_requests.dec()
@@ -453,6 +829,108 @@ async def extract_text(
             ocr_active_requests.dec()
             logger.exception("OCR failure")
             raise HTTPException(500, f"Erreur OCR : {e}")
+
+@app.post("/extract/stream")
+@limiter.limit("10/minute")
+async def extract_text_stream(
+    request: Request,
+    file: UploadFile = File(...)
+):
+    """
+    Extract text page by page as newline-delimited JSON or server-sent events.
+
+    Each page is sent as soon as it and the pages before it are extracted:
+        {"page": 1, "page_count": 12, "text": "...", "method": "ocr", ...}
+    and the stream ends with {"status": "success", "page_count": 12}. An
+    error after the response has started is reported as a final
+    {"status": "error", "detail": "..."} record. An image is one page.
+    PDF pages are extracted like by /extract, spread over the OCR workers.
+
+    With "Accept: text/event-stream" the same records are sent as "page",
+    "done" and "error" events.
+
+    Args:
+        file: Image or PDF file to process
+
+    Returns:
+        Streaming application/x-ndjson or text/event-stream response
+    """
+    content_type = resolve_content_type(file)
+    logger.info("Streaming text of {name} (content_type={ct})", name=file.filename, ct=content_type)
+    sse = "text/event-stream" in request.headers.get("accept", "")
+
+    def encode(record: Dict[str, Any], event: str) -> bytes:
+        return sse_record(record, event) if sse else ndjson_record(record)
+
+    if content_type == 'application/pdf':
+        if not PDF_SUPPORT:
+            raise HTTPException(status_code=501, detail="PDF support not available")
+        # FastAPI closes the upload once this handler returns, before the
+        # body is streamed, so the buffer or its copy is owned by the
+        # generator and released when it finishes
+        resources = ExitStack()
+        try:
+            source = await pdf_stream_source(file, resources)
+            page_count = await ocr_pool.run(pdf_page_count, source)
+        except OCRPoolBusyError as e:
+            resources.close()
+            ocr_operations_total.labels(status="rejected_busy", file_type="pdf").inc()
+            raise busy_exception(e)
+        except Exception as e:
+            resources.close()
+            ocr_operations_total.labels(status="error_processing", file_type="pdf").inc()
+            logger.error(f"PDF processing failed: {e}")
+            raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
+
+        async def records() -> AsyncIterator[bytes]:
+            ocr_active_requests.inc()
+            pages = pdf_page_records(source, page_count)
+            try:
+                async for page in pages:
+                    yield encode(page, "page")
+                ocr_operations_total.labels(status="success", file_type="pdf").inc()
+                yield encode({"status": "success", "page_count": page_count}, "done")
+            except Exception as e:
+                logger.exception("Streamed PDF extraction failed")
+                ocr_operations_total.labels(status="error_processing", file_type="pdf").inc()
+                yield encode({"status": "error", "detail": f"Error processing PDF: {str(e)}"}, "error")
+            finally:
+                await pages.aclose()
+                resources.close()
+                ocr_active_requests.dec()
+
+    elif content_type.startswith('image/'):
+        try:
+            with upload_buffer(file, upload_size(file)) as contents:
+                ocr_result = await ocr_pool.run(ocr_image, contents)
+        except OCRPoolBusyError as e:
+            ocr_operations_total.labels(status="rejected_busy", file_type="image").inc()
+            raise busy_exception(e)
+        except Exception as e:
+            ocr_operations_total.labels(status="error_processing", file_type="image").inc()
+            logger.exception("OCR failure")
+            raise HTTPException(500, f"Erreur OCR : {e}")
+        ocr_operations_total.labels(status="success", file_type="image").inc()
+
+        async def records() -> AsyncIterator[bytes]:
+            yield encode({"page": 1, "page_count": 1, "text": ocr_result["text"]}, "page")
+            yield encode({"status": "success", "page_count": 1}, "done")
+
+    else:
+        ocr_operations_total.labels(status="error_unsupported_format", file_type="unknown").inc()
+        raise HTTPException(
+            status_code=415,
+            detail=f"Format non supporté : {content_type}. Formats supportés: images (PNG, JPG, etc.)" +
+                   (" et PDF" if PDF_SUPPORT else "")
+        )
+
+    return StreamingResponse(
+        records(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        # Records are flushed as they come, not held by a proxy
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
@@ -0,0 +1,181 @@
+"""
+Tesseract engines for the OCR service.
+
+pytesseract runs the tesseract binary for every call: the image is
+written to a temporary file, the process starts, loads the fra
+traineddata, recognizes the page and writes its output to another file.
+With tesserocr, bindings to the Tesseract C++ API, the engine is
+initialized once per process and only the recognition itself is paid per
+page. tesserocr is used when it is installed and can load the language
+data; otherwise the service falls back to pytesseract.
+
+OCR_ENGINE selects the engine: "auto" (default), "tesserocr" or
+"pytesseract". TESSDATA_PREFIX points tesserocr to the traineddata files
+when it cannot find them by itself.
+"""
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import pytesseract
+from PIL import Image
+
+from .logger_config import logger
+
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+OCR_LANGUAGE = "fra"
+
+class OCREngine(ABC):
+    """Interface of a Tesseract engine."""
+
+    name = "base"
+
+    @abstractmethod
+    def image_to_data(self, image: Image.Image) -> Dict[str, List[Any]]:
+        """
+        Recognize the words of an image.
+
+        Args:
+            image: PIL Image object
+
+        Returns:
+            Columns of word data as pytesseract's image_to_data returns them
+            with Output.DICT: level, page_num, block_num, par_num, line_num,
+            word_num, left, top, width, height, conf and text
+        """
+
+    @abstractmethod
+    def image_to_string(self, image: Image.Image) -> str:
+        """
+        Recognize the text of an image.
+
+        Args:
+            image: PIL Image object
+
+        Returns:
+            The text, laid out in lines and paragraphs
+        """
+
+class PytesseractEngine(OCREngine):
+    """Engine running the tesseract binary once per call."""
+
+    name = "pytesseract"
+
+    def __init__(self, lang: str = OCR_LANGUAGE):
+        self.lang = lang
+
+    def image_to_data(self, image: Image.Image) -> Dict[str, List[Any]]:
+        return pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT, lang=self.lang)
+
+    def image_to_string(self, image: Image.Image) -> str:
+        return pytesseract.image_to_string(image, lang=self.lang)
+
+class TesserocrEngine(OCREngine):
+    """Engine keeping one initialized Tesseract API for the process."""
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str = OCR_LANGUAGE, path: Optional[str] = None):
+        """
+        Initialize the Tesseract API, loading the language data.
+
+        Args:
+            lang: Tesseract language
+            path: Directory of the traineddata files, found by Tesseract if None
+
+        Raises:
+            RuntimeError: If the API cannot be initialized
+        """
+        kwargs = {"lang": lang}
+        if path:
+            # tesserocr expects a trailing separator
+            kwargs["path"] = os.path.join(path, "")
+        self._api = tesserocr.PyTessBaseAPI(**kwargs)
+        # The API holds the current image and its results: one page at a time
+        self._lock = threading.Lock()
+
+    def image_to_data(self, image: Image.Image) -> Dict[str, List[Any]]:
+        columns = ("level", "page_num", "block_num", "par_num", "line_num", "word_num",
+                   "left", "top", "width", "height", "conf", "text")
+        data: Dict[str, List[Any]] = {column: [] for column in columns}
+        RIL = tesserocr.RIL
+        block = paragraph = line = word = 0
+
+        with self._lock:
+            self._api.SetImage(image)
+            self._api.Recognize()
+            iterator = self._api.GetIterator()
+            if iterator is None:
+                return data
+            for result in tesserocr.iterate_level(iterator, RIL.WORD):
+                # Number blocks, paragraphs, lines and words the way the
+                # tesseract binary does in its TSV output
+                if result.IsAtBeginningOf(RIL.BLOCK):
+                    block, paragraph = block + 1, 0
+                if result.IsAtBeginningOf(RIL.PARA):
+                    paragraph, line = paragraph + 1, 0
+                if result.IsAtBeginningOf(RIL.TEXTLINE):
+                    line, word = line + 1, 0
+                word += 1
+                left, top, right, bottom = result.BoundingBox(RIL.WORD)
+                row = (5, 1, block, paragraph, line, word, left, top, right - left, bottom - top,
+                       result.Confidence(RIL.WORD), result.GetUTF8Text(RIL.WORD) or "")
+                for column, value in zip(columns, row):
+                    data[column].append(value)
+            self._api.Clear()
+        return data
+
+    def image_to_string(self, image: Image.Image) -> str:
+        with self._lock:
+            self._api.SetImage(image)
+            text = self._api.GetUTF8Text()
+            self._api.Clear()
+        return text
+
+def create_engine(name: str = "auto") -> OCREngine:
+    """
+    Create a Tesseract engine.
+
+    Args:
+        name: "tesserocr", "pytesseract" or "auto" for tesserocr when it can be
+            initialized and pytesseract otherwise
+
+    Returns:
+        The engine
+    """
+    if name not in ("auto", "tesserocr", "pytesseract"):
+        raise ValueError(f"Unknown OCR engine: {name}")
+    if name != "pytesseract":
+        if TESSEROCR_AVAILABLE:
+            try:
+                return TesserocrEngine(path=os.getenv("TESSDATA_PREFIX"))
+            except RuntimeError as e:
+                logger.warning(f"Cannot initialize tesserocr ({e}), falling back to pytesseract")
+        else:
+            logger.warning("tesserocr not available, falling back to pytesseract")
+    return PytesseractEngine()
+
+_engine: Optional[OCREngine] = None
+_engine_pid: Optional[int] = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> OCREngine:
+    """
+    The engine of this process, created on first use.
+
+    A Tesseract API cannot be shared with a forked process, so each OCR
+    worker process creates its own.
+    """
+    global _engine, _engine_pid
+    with _engine_lock:
+        if _engine is None or _engine_pid != os.getpid():
+            _engine = create_engine(os.getenv("OCR_ENGINE", "auto"))
+            _engine_pid = os.getpid()
+            logger.info(f"OCR engine {_engine.name} ready in process {_engine_pid}")
+        return _engine
@@ -0,0 +1,184 @@
+"""
+CPU-bound OCR work off the event loop.
+
+Image preprocessing, Tesseract and PyMuPDF hold the CPU (and, for the
+Python parts, the GIL) for the whole request. Run inline in the async
+handlers they stall /health and every other request of the process.
+They run in a pool of worker processes instead, one per core, so
+throughput scales with the cores. At most OCR_QUEUE_SIZE tasks wait for a
+worker; past that, OCRPoolBusyError is raised and the endpoints answer 503
+with Retry-After, which the backend's OCR client honours.
+
+Workers are forked at startup, before requests start threads in the
+service, and share its already imported modules instead of importing the
+service again. With no workers the tasks run on a single thread of the
+service process, which tests use to patch the OCR functions.
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Tuple
+
+from .logger_config import logger
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+if PROMETHEUS_AVAILABLE:
+    ocr_queue_depth = Gauge(
+        'ocr_queue_depth',
+        'OCR tasks waiting for a worker'
+    )
+    ocr_tasks_in_progress = Gauge(
+        'ocr_tasks_in_progress',
+        'OCR tasks running on a worker'
+    )
+    ocr_queue_wait = Histogram(
+        'ocr_queue_wait_seconds',
+        'Time an OCR task waited for a worker',
+        buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    )
+    ocr_pool_rejections = Counter(
+        'ocr_pool_rejections_total',
+        'OCR tasks rejected because the queue was full'
+    )
+
+class OCRPoolBusyError(Exception):
+    """Raised when the OCR queue is full."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__("Too many OCR requests in progress, try again shortly")
+
+class OCRTaskError(Exception):
+    """Raised when an OCR task fails in a worker."""
+
+def _call(function: Callable[..., Any], *args: Any) -> Tuple[float, Any]:
+    """Run a task in a worker, returning when it started with its result."""
+    started = time.monotonic()
+    try:
+        return started, function(*args)
+    except Exception as e:
+        # Exceptions are sent back pickled and not all of them can be rebuilt,
+        # which would break the whole pool
+        raise OCRTaskError(f"{type(e).__name__}: {e}") from None
+
+class OCRPool:
+    """Bounded pool of worker processes for OCR tasks."""
+
+    def __init__(self, workers: int, queue_size: int, initializer: Optional[Callable[[], Any]] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            workers: Worker processes, 0 to run tasks on a thread of this process
+            queue_size: Tasks allowed to wait for a worker
+            initializer: Called in each worker when it starts
+        """
+        self.processes = workers > 0
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.initializer = initializer
+        self._executor = self._create_executor()
+        # Tasks admitted (queued or running), updated from the event loop only
+        self._admitted = 0
+        self._average = 1.0  # seconds per task
+
+    @property
+    def queued(self) -> int:
+        """Tasks waiting for a worker."""
+        return max(0, self._admitted - self.workers)
+
+    @property
+    def running(self) -> int:
+        """Tasks running on a worker."""
+        return min(self._admitted, self.workers)
+
+    def start(self) -> None:
+        """Fork the worker processes now rather than on the first request."""
+        if self.processes:
+            # One task per worker: the executor forks a process for each task
+            # submitted while none is idle
+            for future in [self._executor.submit(int) for _ in range(self.workers)]:
+                future.result()
+            logger.info(f"OCR pool started with {self.workers} worker processes")
+
+    def shutdown(self) -> None:
+        """Stop the workers, letting running tasks finish."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a task on a worker.
+
+        Memoryviews among the arguments are copied to bytes for worker
+        processes, which receive the arguments pickled.
+
+        Args:
+            function: Module-level function to run
+            args: Its arguments
+
+        Returns:
+            What the function returns
+
+        Raises:
+            OCRPoolBusyError: If the queue is full
+            OCRTaskError: If the task failed in a worker
+        """
+        if self.queued >= self.queue_size:
+            if PROMETHEUS_AVAILABLE:
+                ocr_pool_rejections.inc()
+            logger.warning(f"OCR queue full ({self.queued} waiting), rejecting task")
+            raise OCRPoolBusyError(self._average * (self._admitted / self.workers + 1))
+
+        if self.processes:
+            args = tuple(bytes(arg) if isinstance(arg, memoryview) else arg for arg in args)
+
+        submitted = time.monotonic()
+        self._admitted += 1
+        self._report()
+        executor = self._executor
+        try:
+            started, result = await asyncio.get_running_loop().run_in_executor(
+                executor, _call, function, *args
+            )
+        except BrokenProcessPool:
+            # A worker died (out of memory, a crash in Tesseract); the pool cannot
+            # be used anymore and is replaced for the next tasks
+            logger.error("OCR worker process died, restarting the pool")
+            self._replace(executor)
+            raise OCRTaskError("OCR worker process died") from None
+        finally:
+            self._admitted -= 1
+            self._report()
+
+        finished = time.monotonic()
+        if PROMETHEUS_AVAILABLE:
+            ocr_queue_wait.observe(max(0.0, started - submitted))
+        # Moving average of the cost of one task, for Retry-After
+        self._average += (finished - started - self._average) * 0.1
+        return result
+
+    def _create_executor(self) -> Executor:
+        if not self.processes:
+            return ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr", initializer=self.initializer)
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=self.initializer
+        )
+
+    def _replace(self, broken: Executor) -> None:
+        if self._executor is broken:
+            self._executor = self._create_executor()
+        broken.shutdown(wait=False)
+
+    def _report(self) -> None:
+        if PROMETHEUS_AVAILABLE:
+            ocr_queue_depth.set(self.queued)
+            ocr_tasks_in_progress.set(self.running)
@@ -10,6 +10,9 @@ from unittest.mock import Mock, patch
 # Set testing environment before importing app
 os.environ['TESTING'] = 'true'
 os.environ['REDIS_URL'] = 'memory://'
+# Run OCR with pytesseract on a thread of the test process, where it is patched
+os.environ['OCR_WORKERS'] = '0'
+os.environ['OCR_ENGINE'] = 'pytesseract'
 
 # Mock Redis for testing
 @pytest.fixture(autouse=True)
@@ -39,9 +42,9 @@ def mock_limiter():
 
         yield mock_limiter_instance
 
-# 1) TestClient fixture, scope module so we only build it once
+# 1) The OCR service modules, imported once under a single package name
 @pytest.fixture(scope="module")
-def client():
+def main_module():
     # Import app after mocking is set up
     import sys
     from pathlib import Path
@@ -53,22 +56,39 @@ def client():
 
     try:
         # Try Docker/CI path first
-        from src.main import app, limiter
+        import src.main as main
     except ImportError:
         try:
             # Fallback to local development path
-            from ocr_service.src.main import app, limiter
+            import ocr_service.src.main as main
         except ImportError:
             # Last resort - add parent directory and try again
             parent_dir = current_dir.parent
             if str(parent_dir) not in sys.path:
                 sys.path.insert(0, str(parent_dir))
-            from ocr_service.src.main import app, limiter
+            import ocr_service.src.main as main
+    return main
+
+@pytest.fixture(scope="module")
+def ocr_module(main_module):
+    """Import another module of the OCR service from the package of the app."""
+    import importlib
+
+    package = main_module.__name__.rpartition(".")[0]
+    return lambda name: importlib.import_module(f"{package}.{name}")
+
+# 2) TestClient fixture, scope module so we only build it once
+@pytest.fixture(scope="module")
+def client(main_module):
+    app, limiter = main_module.app, main_module.limiter
 
     # Patch the limiter instance directly
     original_limit = limiter.limit
     limiter.limit = lambda *args, **kwargs: lambda func: func
 
+    # Each test module starts with empty rate limit counters
+    limiter.reset()
+
     client = TestClient(app)
 
     # Restore after tests (though this won't be called in module scope)
@@ -76,7 +96,7 @@ def client():
 
     return client
 
-# 2) Autouse fixture to patch out real OCR: always return a dummy text
+# 3) Autouse fixture to patch out real OCR: always return a dummy text
 @pytest.fixture(autouse=True)
 def mock_tesseract(monkeypatch):
     """
@@ -100,7 +120,7 @@ def mock_tesseract(monkeypatch):
         lambda image, output_type=None, lang=None: mock_data
     )
 
-# 3) img_bytes fixture unchanged: reads your test.png
+# 4) img_bytes fixture unchanged: reads your test.png
 @pytest.fixture
 def img_bytes():
     fixtures_dir = Path(__file__).parent / "fixtures"
@@ -0,0 +1,59 @@
+"""
+Tests for the Tesseract engines.
+"""
+import os
+
+import pytest
+from PIL import Image, ImageDraw
+
+@pytest.fixture(scope="module")
+def ocr_engine(ocr_module):
+    return ocr_module("ocr_engine")
+
+def test_falls_back_to_pytesseract(ocr_engine, monkeypatch):
+    """Test that pytesseract is used when tesserocr is missing or cannot start."""
+    monkeypatch.setattr(ocr_engine, "TESSEROCR_AVAILABLE", False)
+    assert isinstance(ocr_engine.create_engine("auto"), ocr_engine.PytesseractEngine)
+
+    def broken(**kwargs):
+        raise RuntimeError("Failed to init API, possibly an invalid tessdata path")
+
+    monkeypatch.setattr(ocr_engine, "TESSEROCR_AVAILABLE", True)
+    monkeypatch.setattr(ocr_engine, "TesserocrEngine", broken)
+    assert isinstance(ocr_engine.create_engine("tesserocr"), ocr_engine.PytesseractEngine)
+    assert isinstance(ocr_engine.create_engine("pytesseract"), ocr_engine.PytesseractEngine)
+    with pytest.raises(ValueError):
+        ocr_engine.create_engine("easyocr")
+
+@pytest.mark.asyncio
+async def test_one_engine_per_process(ocr_engine, ocr_module):
+    """Test that the engine is kept for the process and each worker creates its own."""
+    assert ocr_engine.get_engine() is ocr_engine.get_engine()
+
+    pool = ocr_module("ocr_pool").OCRPool(workers=1, queue_size=1, initializer=ocr_engine.get_engine)
+    pool.start()
+    try:
+        engine = await pool.run(ocr_engine.get_engine)
+        assert engine.name == "pytesseract"
+    finally:
+        pool.shutdown()
+
+def test_tesserocr_matches_tesseract_layout(ocr_engine, main_module):
+    """Test that tesserocr word data rebuilds the text image_to_string returns."""
+    if not ocr_engine.TESSEROCR_AVAILABLE:
+        pytest.skip("tesserocr not available")
+    try:
+        engine = ocr_engine.TesserocrEngine(path=os.getenv("TESSDATA_PREFIX"))
+    except RuntimeError as e:
+        pytest.skip(f"Tesseract data not available: {e}")
+
+    image = Image.new("L", (600, 260), color=255)
+    draw = ImageDraw.Draw(image)
+    draw.text((20, 20), "Premier paragraphe du texte", fill=0)
+    draw.text((20, 40), "sur deux lignes", fill=0)
+    draw.text((20, 120), "Second paragraphe", fill=0)
+    image = image.resize((1800, 780))
+
+    data = engine.image_to_data(image)
+    assert set(data["level"]) <= {5}
+    assert main_module.layout_text(data) == engine.image_to_string(image).strip()
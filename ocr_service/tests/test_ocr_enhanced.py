@@ -6,6 +6,7 @@ from fastapi.testclient import TestClient
 from PIL import Image, ImageDraw, ImageFont
 import io
 import json
+import os
 from unittest.mock import patch, MagicMock
 
 # Use the client from conftest.py instead of creating our own
@@ -207,6 +208,81 @@ class TestOCREnhanced:
             assert data["total_characters"] == 25
             assert data["status"] == "success"
 
+    def test_large_pdf_is_memory_mapped(self, client):
+        """Test that a PDF spooled to disk is read through a memory map, not copied."""
+        try:
+            import fitz
+        except ImportError:
+            pytest.skip("PyMuPDF not available")
+        try:
+            import src.main as main_module
+        except ImportError:
+            import ocr_service.src.main as main_module
+
+        doc = fitz.open()
+        doc.new_page().insert_text((50, 50), "Test PDF content for OCR")
+        # Incompressible attachment so the upload is larger than the in-memory spool
+        doc.embfile_add("padding", os.urandom(2 * main_module.MMAP_MIN_SIZE))
+        pdf_data = doc.write()
+        doc.close()
+
+        buffers = []
+        original = main_module.extract_text_from_pdf
+
+        def spy(pdf_content, *args):
+            buffers.append(type(pdf_content))
+            return original(pdf_content, *args)
+
+        with patch.object(main_module, "extract_text_from_pdf", side_effect=spy):
+            response = client.post(
+                "/extract",
+                files={"file": ("big.pdf", pdf_data, "application/pdf")}
+            )
+
+        assert response.status_code == 200, response.text
+        assert "Test PDF content for OCR" in response.json()["text"]
+        assert buffers == [memoryview]
+
+    def test_pdf_stream(self, client):
+        """Test that the streaming endpoint sends one record per page, then a summary."""
+        try:
+            import fitz
+        except ImportError:
+            pytest.skip("PyMuPDF not available")
+
+        doc = fitz.open()
+        for number in range(3):
+            doc.new_page().insert_text((50, 50), f"Page number {number + 1}")
+        pdf_data = doc.write()
+        doc.close()
+
+        response = client.post(
+            "/extract/stream",
+            files={"file": ("notes.pdf", pdf_data, "application/pdf")}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [(r["page"], r["page_count"], r["text"]) for r in records[:-1]] == [
+            (n, 3, f"Page number {n}") for n in (1, 2, 3)
+        ]
+        assert records[-1] == {"status": "success", "page_count": 3}
+
+    def test_image_stream(self, client):
+        """Test that an image is streamed as a single page."""
+        response = client.post(
+            "/extract/stream",
+            files={"file": ("scan.png", create_test_image_with_text("Hi"), "image/png")}
+        )
+
+        assert response.status_code == 200
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert records == [
+            {"page": 1, "page_count": 1, "text": "texte factice OCR"},
+            {"status": "success", "page_count": 1},
+        ]
+
     def test_unsupported_file_type(self, client):
         """Test rejection of unsupported file types."""
         response = client.post(
@@ -261,24 +337,21 @@ class TestOCREnhanced:
 
         try:
             from src.main import extract_text_with_confidence
-            main_module = 'src.main'
         except ImportError:
             try:
                 from ocr_service.src.main import extract_text_with_confidence
-                main_module = 'ocr_service.src.main'
             except ImportError:
                 parent_dir = current_dir.parent
                 if str(parent_dir) not in sys.path:
                     sys.path.insert(0, str(parent_dir))
                 from ocr_service.src.main import extract_text_with_confidence
-                main_module = 'ocr_service.src.main'
 
         # Create a test image
         image = Image.new('RGB', (100, 50), color='white')
 
         # Mock pytesseract to raise an exception for confidence, but work for basic OCR
-        with patch(f'{main_module}.pytesseract.image_to_data') as mock_data, \
-             patch(f'{main_module}.pytesseract.image_to_string') as mock_string:
+        with patch('pytesseract.image_to_data') as mock_data, \
+             patch('pytesseract.image_to_string') as mock_string:
 
             mock_data.side_effect = Exception("OCR failed")
             mock_string.return_value = "fallback text"
@@ -292,6 +365,68 @@ class TestOCREnhanced:
             assert result["word_count"] == 2  # "fallback text" = 2 words
             assert result["filtered_word_count"] == 2
 
+    def test_confidence_extraction_single_pass(self):
+        """Test that the text rebuilt from word data matches the text of image_to_string."""
+        try:
+            import src.main
+            main_module = 'src.main'
+        except ImportError:
+            main_module = 'ocr_service.src.main'
+        from importlib import import_module
+        extract_text_with_confidence = import_module(main_module).extract_text_with_confidence
+
+        # image_to_data of a page with two blocks, the first with two
+        # paragraphs, one of them on two lines. Rows of levels 1-4 (page,
+        # block, paragraph, line) have no text and a confidence of -1
+        rows = [
+            (1, 0, 0, 0, 0, "", -1),
+            (2, 1, 0, 0, 0, "", -1),
+            (3, 1, 1, 0, 0, "", -1),
+            (4, 1, 1, 1, 0, "", -1),
+            (5, 1, 1, 1, 1, "La", 96),
+            (5, 1, 1, 1, 2, "mitose", 91),
+            (5, 1, 1, 1, 3, "divise", 88),
+            (4, 1, 1, 2, 0, "", -1),
+            (5, 1, 1, 2, 1, "la", 95),
+            (5, 1, 1, 2, 2, "cellule.", 42),
+            (3, 1, 2, 0, 0, "", -1),
+            (4, 1, 2, 1, 0, "", -1),
+            (5, 1, 2, 1, 1, "Prophase", 77),
+            (5, 1, 2, 1, 2, " ", 95),
+            (5, 1, 2, 1, 3, "d'abord", 63),
+            (2, 2, 0, 0, 0, "", -1),
+            (3, 2, 1, 0, 0, "", -1),
+            (4, 2, 1, 1, 0, "", -1),
+            (5, 2, 1, 1, 1, "Chapitre", 93),
+            (5, 2, 1, 1, 2, "2", 90),
+        ]
+        columns = ["level", "block_num", "par_num", "line_num", "word_num", "text", "conf"]
+        ocr_data = {name: [row[i] for row in rows] for i, name in enumerate(columns)}
+        # What Tesseract's image_to_string returns for the same page
+        page_text = "La mitose divise\nla cellule.\n\nProphase d'abord\n\nChapitre 2\n\f"
+
+        image = Image.new('RGB', (100, 50), color='white')
+        with patch('pytesseract.image_to_data', return_value=ocr_data), \
+             patch('pytesseract.image_to_string', return_value=page_text) as mock_string:
+            result = extract_text_with_confidence(image, min_confidence=50)
+
+        mock_string.assert_not_called()
+        assert result["text"] == page_text.strip()
+        assert result["words"] == ["La", "mitose", "divise", "la", "cellule.", "Prophase", "d'abord", "Chapitre", "2"]
+        assert result["word_confidences"] == [96, 91, 88, 95, 42, 77, 63, 93, 90]
+        assert result["filtered_text"] == "La mitose divise la Prophase d'abord Chapitre 2"
+        assert result["low_confidence_words"] == [{"word": "cellule.", "confidence": 42}]
+        assert result["average_confidence"] == 81.67
+        assert result["filtered_average_confidence"] == 86.62
+        assert result["confidence_stats"] == {
+            "high_confidence_count": 6,
+            "medium_confidence_count": 2,
+            "low_confidence_count": 1,
+            "total_words": 9,
+            "filtering_threshold": 50,
+            "words_filtered_out": 1
+        }
+
     def test_rate_limiting(self, client):
         """Test that basic requests work (rate limiting tested separately)."""
         # Create test image
@@ -0,0 +1,57 @@
+"""
+Tests for OCR on the bounded worker pool.
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+@pytest.fixture(scope="module")
+def ocr_pool(ocr_module):
+    return ocr_module("ocr_pool")
+
+@pytest.mark.asyncio
+async def test_tasks_run_in_worker_processes(ocr_pool):
+    """Test that tasks run in other processes, with memoryviews sent as bytes."""
+    pool = ocr_pool.OCRPool(workers=2, queue_size=2)
+    pool.start()
+    try:
+        assert await pool.run(os.getpid) != os.getpid()
+        assert await pool.run(len, memoryview(b"page")) == 4
+        with pytest.raises(ocr_pool.OCRTaskError, match="ZeroDivisionError"):
+            await pool.run(divmod, 1, 0)
+        assert pool.queued == 0 and pool.running == 0
+    finally:
+        pool.shutdown()
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects(ocr_pool):
+    """Test that tasks past the queue size are rejected while the workers are busy."""
+    pool = ocr_pool.OCRPool(workers=1, queue_size=1)
+    try:
+        blocked = [asyncio.ensure_future(pool.run(time.sleep, 0.3)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.running == 1
+        assert pool.queued == 1
+
+        with pytest.raises(ocr_pool.OCRPoolBusyError) as excinfo:
+            await pool.run(time.sleep, 0)
+        assert excinfo.value.retry_after > 0
+
+        await asyncio.gather(*blocked)
+        assert pool.queued == 0
+        assert await pool.run(pow, 2, 10) == 1024
+    finally:
+        pool.shutdown()
+
+def test_busy_pool_answers_503(client, main_module, ocr_pool, img_bytes, monkeypatch):
+    """Test that a full OCR queue turns requests away with Retry-After."""
+    async def busy(function, *args):
+        raise ocr_pool.OCRPoolBusyError(retry_after=2.3)
+
+    monkeypatch.setattr(main_module.ocr_pool, "run", busy)
+    for path in ("/extract", "/extract/stream"):
+        response = client.post(path, files={"file": ("test.png", img_bytes, "image/png")})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
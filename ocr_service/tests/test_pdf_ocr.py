@@ -0,0 +1,175 @@
+"""
+Tests for PDF extraction from text layers and scanned pages.
+"""
+import io
+import json
+import os
+
+import pytest
+from PIL import Image
+
+fitz = pytest.importorskip("fitz")
+
+@pytest.fixture(scope="module")
+def ocr_pool(ocr_module):
+    return ocr_module("ocr_pool")
+
+def add_scanned_page(doc, width_px: int, size=(595, 842)):
+    """Add a page holding only an image of the given pixel width, like a scan."""
+    page = doc.new_page(width=size[0], height=size[1])
+    image = Image.new("L", (width_px, int(width_px * size[1] / size[0])), color=255)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    page.insert_image(page.rect, stream=buffer.getvalue())
+    return page
+
+def add_text_page(doc, text: str):
+    doc.new_page().insert_text((50, 50), text)
+
+def test_raster_dpi_follows_the_scan(main_module):
+    """Test that scans are rasterized at their own resolution, within bounds."""
+    doc = fitz.open()
+    assert main_module.raster_dpi(add_scanned_page(doc, 1240)) == 150  # A4 at 150 dpi
+    assert main_module.raster_dpi(add_scanned_page(doc, 1654)) == 200
+    assert main_module.raster_dpi(add_scanned_page(doc, 600)) == main_module.PDF_OCR_MIN_DPI
+    assert main_module.raster_dpi(add_scanned_page(doc, 5000)) == main_module.PDF_OCR_MAX_DPI
+    # An A0 poster would be 140 million pixels at 300 dpi
+    poster = add_scanned_page(doc, 10000, size=(2384, 3370))
+    dpi = main_module.raster_dpi(poster)
+    assert dpi < main_module.PDF_OCR_MIN_DPI
+    assert (2384 * dpi / 72) * (3370 * dpi / 72) <= main_module.PDF_OCR_MAX_PIXELS
+    doc.close()
+
+def test_scanned_pages_are_ocred(client):
+    """Test that pages without a text layer are OCRed and the others are not."""
+    doc = fitz.open()
+    add_text_page(doc, "Chapitre 1 : la cellule et ses organites")
+    add_scanned_page(doc, 1240)
+    doc.new_page()  # blank
+    pdf_data = doc.write()
+    doc.close()
+
+    response = client.post("/extract", files={"file": ("notes.pdf", pdf_data, "application/pdf")})
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert [(page["page"], page["method"]) for page in data["pages"]] == [(1, "text"), (2, "ocr"), (3, "text")]
+    assert data["pages"][1]["text"] == "texte factice OCR"  # mocked Tesseract
+    assert data["pages"][1]["dpi"] == 150
+    assert data["pages"][1]["average_confidence"] == 90
+    assert all(page["duration_ms"] >= 0 for page in data["pages"])
+    assert data["text"] == "Chapitre 1 : la cellule et ses organites\n\ntexte factice OCR"
+    assert data["ocr_page_count"] == 1
+
+def test_pages_are_spread_over_workers(client, main_module, ocr_pool, monkeypatch):
+    """Test that a PDF is split between worker processes and put back in page order."""
+    doc = fitz.open()
+    for number in range(1, 8):
+        if number in (2, 5):
+            add_scanned_page(doc, 1240)
+        else:
+            add_text_page(doc, f"Page {number} du cours de biologie")
+    pdf_data = doc.write()
+    doc.close()
+
+    calls = []
+    pool = ocr_pool.OCRPool(workers=3, queue_size=3)
+    original_run = pool.run
+
+    async def run(function, *args):
+        calls.append(function.__name__)
+        return await original_run(function, *args)
+
+    monkeypatch.setattr(main_module, "ocr_pool", pool)
+    monkeypatch.setattr(pool, "run", run)
+    pool.start()
+    try:
+        response = client.post("/extract", files={"file": ("cours.pdf", pdf_data, "application/pdf")})
+    finally:
+        pool.shutdown()
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert calls == ["pdf_page_count"] + ["extract_text_from_pdf"] * 3
+    assert [page["page"] for page in data["pages"]] == list(range(1, 8))
+    assert [page["method"] for page in data["pages"]] == ["text", "ocr", "text", "text", "ocr", "text", "text"]
+    assert data["pages"][1]["text"] == "texte factice OCR"
+    assert data["pages"][6]["text"] == "Page 7 du cours de biologie"
+    assert data["page_count"] == 7
+
+def test_stream_ocrs_scanned_pages(client):
+    """Test that streamed pages are extracted like by /extract, in page order."""
+    doc = fitz.open()
+    add_scanned_page(doc, 1240)
+    add_text_page(doc, "Chapitre 2 : la division cellulaire")
+    pdf_data = doc.write()
+    doc.close()
+
+    response = client.post("/extract/stream", files={"file": ("scan.pdf", pdf_data, "application/pdf")})
+
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["page"], r["page_count"], r["method"], r["text"]) for r in records[:-1]] == [
+        (1, 2, "ocr", "texte factice OCR"),
+        (2, 2, "text", "Chapitre 2 : la division cellulaire"),
+    ]
+    assert records[-1] == {"status": "success", "page_count": 2}
+
+def test_stream_as_server_sent_events(client):
+    """Test that the stream is sent as events when the client asks for them."""
+    doc = fitz.open()
+    add_text_page(doc, "Chapitre 3 : la mitose en quatre phases")
+    pdf_data = doc.write()
+    doc.close()
+
+    response = client.post(
+        "/extract/stream",
+        files={"file": ("notes.pdf", pdf_data, "application/pdf")},
+        headers={"Accept": "text/event-stream"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+    assert [lines[0] for lines in events] == ["event: page", "event: done"]
+    assert json.loads(events[0][1][len("data: "):])["text"] == "Chapitre 3 : la mitose en quatre phases"
+    assert json.loads(events[1][1][len("data: "):]) == {"status": "success", "page_count": 1}
+
+def test_stream_keeps_one_page_per_worker_in_flight(client, main_module, ocr_pool, monkeypatch):
+    """Test that a long PDF is streamed in order without queueing all its pages."""
+    doc = fitz.open()
+    for number in range(1, 10):
+        if number % 4 == 0:
+            add_scanned_page(doc, 1240)
+        else:
+            add_text_page(doc, f"Page {number} du cours de biologie")
+    pdf_data = doc.write()
+    doc.close()
+
+    in_flight = []
+    sources = set()
+    pool = ocr_pool.OCRPool(workers=2, queue_size=8)
+    original_run = pool.run
+
+    async def run(function, *args):
+        sources.add(args[0])
+        in_flight.append(pool.queued + pool.running + 1)
+        return await original_run(function, *args)
+
+    monkeypatch.setattr(main_module, "ocr_pool", pool)
+    monkeypatch.setattr(pool, "run", run)
+    pool.start()
+    try:
+        response = client.post("/extract/stream", files={"file": ("cours.pdf", pdf_data, "application/pdf")})
+    finally:
+        pool.shutdown()
+
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["page"] for r in records[:-1]] == list(range(1, 10))
+    assert [r["method"] for r in records[:-1]] == ["text", "text", "text", "ocr"] * 2 + ["text"]
+    assert records[-1] == {"status": "success", "page_count": 9}
+    assert max(in_flight) <= pool.workers
+    # Worker processes read the pages from a temporary copy, removed at the end
+    (source,) = sources
+    assert isinstance(source, str) and not os.path.exists(source)